@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+ANN benchmark.
+Embeds a synthetic corpus, trains the IVF index and reports recall@10 and
+query latency against exact brute-force search for a range of nprobe values.
+
+    python benchmarks/bench_ann.py --chunks 20829 --nprobe 1 2 4 8 16 32
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from synthetic import make_chunks, make_queries
+from cortex.ann import IVFIndex
+from cortex.embeddings import get_embedder
+from cortex.vectors import VectorStore, write_vectors
+
+
+def timed_queries(fn, queries):
+    latencies, results = [], []
+    for q in queries:
+        start = time.perf_counter()
+        results.append(fn(q))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--chunks', type=int, default=20_829)
+    parser.add_argument('--queries', type=int, default=300)
+    parser.add_argument('--nlist', type=int, default=None)
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--quantize', action='store_true', help="store vectors as int8")
+    args = parser.parse_args()
+
+    embedder = get_embedder()
+    chunks = make_chunks(args.chunks)
+    matrix = embedder.embed([c['content'] for c in chunks])
+
+    start = time.perf_counter()
+    ann = IVFIndex.build(matrix, nlist=args.nlist)
+    print(f"{args.chunks:,} x {matrix.shape[1]} vectors, {ann.nlist} lists "
+          f"(trained in {time.perf_counter() - start:.1f}s)")
+
+    queries = embedder.embed(make_queries(args.queries))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_vectors(tmp, matrix, [c['id'] for c in chunks], embedder.name, quantize=args.quantize)
+        store = VectorStore.open(tmp)
+
+        exact, exact_ms = timed_queries(lambda q: store.search(q, 10), queries)
+        truth = [{row for row, _ in hits} for hits in exact]
+        print(f"  exact        recall@10 1.000   p50 {statistics.median(exact_ms):6.3f} ms   "
+              f"mean {statistics.mean(exact_ms):6.3f} ms")
+
+        for nprobe in args.nprobe:
+            approx, approx_ms = timed_queries(lambda q: ann.search(q, 10, nprobe), queries)
+            recall = np.mean([len(t & {row for row, _ in hits}) / len(t) for t, hits in zip(truth, approx)])
+            print(f"  nprobe={nprobe:<5} recall@10 {recall:.3f}   p50 {statistics.median(approx_ms):6.3f} ms   "
+                  f"mean {statistics.mean(approx_ms):6.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
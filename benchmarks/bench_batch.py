@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Batch search benchmark.
+Builds a synthetic corpus with its vector store, then runs the same queries
+through POST /search/batch at several batch sizes (cache disabled) and
+reports the cost per query, next to one GET /search/{source} per query.
+Batched results are checked against the per-query ones.
+
+    python benchmarks/bench_batch.py --queries 512 --sizes 1 8 64
+"""
+
+import argparse
+import os
+import time
+
+from synthetic import make_chunks, make_queries, synthetic_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--chunks', type=int, default=20_829)
+    parser.add_argument('--queries', type=int, default=512)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 8, 64])
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--mode', choices=['lexical', 'vector', 'hybrid'], default='hybrid')
+    args = parser.parse_args()
+    os.environ['QUERY_CACHE_SIZE'] = '0'
+
+    with synthetic_server({'ict': make_chunks(args.chunks)}) as server:
+        from fastapi.testclient import TestClient
+
+        queries = make_queries(args.queries)
+        with TestClient(server.app) as client:
+            start = time.perf_counter()
+            single = []
+            for query in queries:
+                response = client.get('/search/ict', params={'query': query, 'limit': args.limit,
+                                                             'mode': args.mode})
+                single.append(response.json()['results'])
+            per_query = (time.perf_counter() - start) * 1000 / len(queries)
+
+            print(f"{args.chunks:,} chunks, {len(queries)} queries, limit={args.limit}, mode={args.mode}")
+            print(f"  GET per query   {per_query:6.2f} ms/query")
+
+            for size in args.sizes:
+                batched = []
+                start = time.perf_counter()
+                for i in range(0, len(queries), size):
+                    items = [{'query': q, 'source': 'ict', 'limit': args.limit, 'mode': args.mode}
+                             for q in queries[i:i + size]]
+                    response = client.post('/search/batch', json=items)
+                    assert response.status_code == 200, response.text
+                    batched.extend(entry['results'] for entry in response.json()['results'])
+                per_query = (time.perf_counter() - start) * 1000 / len(queries)
+
+                same = sum([r['chunk_id'] for r in a] == [r['chunk_id'] for r in b]
+                           for a, b in zip(single, batched))
+                print(f"  batch of {size:<4}   {per_query:6.2f} ms/query  "
+                      f"({same}/{len(queries)} identical rankings)")
+
+
+if __name__ == "__main__":
+    main()
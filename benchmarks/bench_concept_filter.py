@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Concept-filtered search benchmark.
+Runs a full extraction of a synthetic corpus (fake supabase client) so the
+concept → chunk index is written with the other artifacts, loads the engine
+and compares searches restricted to one concept's chunks with unfiltered
+ones: p50 latency per mode and the share of the corpus each filter leaves.
+Filtered results are checked against the unfiltered ranking of the whole
+corpus with non-matching chunks dropped.
+
+    python benchmarks/bench_concept_filter.py --queries 200
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import tempfile
+import time
+
+from synthetic import extract_source, make_chunks, make_queries
+import cortex.artifacts
+from cortex.engine import load_engine
+
+
+def p50_ms(fn, queries):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--chunks', type=int, default=20_829)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--concepts', nargs='+', default=['liquidity', 'silver_bullet', 'turtle_soup'])
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            cortex.artifacts.DATA_DIR = os.path.join(tmp, 'cortex_data')
+            with contextlib.redirect_stdout(io.StringIO()):
+                extract_source('ict', make_chunks(args.chunks))
+            engine = load_engine('ict', os.path.join(tmp, 'ict_wisdom.json'))
+        finally:
+            os.chdir(cwd)
+        report(engine, args)
+
+
+def report(engine, args):
+    queries = make_queries(args.queries)
+    counts = engine.concepts.counts()
+    print(f"{len(engine.corpus):,} chunks, {len(counts)} concepts indexed, {len(queries)} queries, "
+          f"limit={args.limit} (p50)")
+    print(f"  {'filter':<16} {'chunks':>7} {'share':>6}   {'lexical':>9} {'vector':>9}")
+    print(f"  {'(none)':<16} {len(engine.corpus):>7,} {100:>5.0f}%   "
+          f"{p50_ms(lambda q: engine.search(q, args.limit, mode='lexical'), queries):7.2f}ms "
+          f"{p50_ms(lambda q: engine.search(q, args.limit, mode='vector', exact=True), queries):7.2f}ms")
+
+    for concept in args.concepts:
+        rows = engine.concept_rows([concept])
+        allowed = {int(engine.corpus.ids[doc]) for doc in rows}
+        for mode in ('lexical', 'vector'):
+            for query in queries[:20]:
+                filtered = engine.search(query, args.limit, mode=mode, concepts=[concept])
+                everything = engine.search(query, len(engine.corpus), mode=mode, exact=True)
+                expected = [r for r in everything if r['chunk_id'] in allowed][:args.limit]
+                # Ties at the cut-off may be broken either way; scores must agree
+                assert all(r['chunk_id'] in allowed for r in filtered), (concept, mode, query)
+                assert [r['similarity'] for r in filtered] == [r['similarity'] for r in expected], (concept, mode, query)
+
+        print(f"  {concept:<16} {counts[concept]:>7,} {100 * len(rows) / len(engine.corpus):>5.1f}%   "
+              f"{p50_ms(lambda q: engine.search(q, args.limit, mode='lexical', concepts=[concept]), queries):7.2f}ms "
+              f"{p50_ms(lambda q: engine.search(q, args.limit, mode='vector', concepts=[concept]), queries):7.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Concept matcher benchmark.
+Compares the original per-keyword substring loop in extract_ict_concepts
+with the compiled single-pass ConceptMatcher (trie regex, and the
+pyahocorasick automaton when installed) on a synthetic corpus.
+
+    python benchmarks/bench_concept_matcher.py --chunks 20000 200000
+"""
+
+import argparse
+import time
+
+from synthetic import make_chunks
+import extract_ict_wisdom
+from extract_ict_wisdom import CONCEPT_KEYWORDS, ConceptMatcher, extract_ict_concepts
+
+
+def legacy_extract_ict_concepts(chunks):
+    """The pre-matcher implementation, kept verbatim as the baseline."""
+    concepts = {concept: [] for concept in CONCEPT_KEYWORDS}
+    keywords = CONCEPT_KEYWORDS
+
+    for chunk in chunks:
+        content = chunk.get('content', '').lower()
+        source = chunk.get('source_transcript', 'unknown')
+
+        for concept, kws in keywords.items():
+            for kw in kws:
+                if kw.lower() in content:
+                    concepts[concept].append({
+                        'source': source,
+                        'chunk_id': chunk.get('id'),
+                        'excerpt': chunk.get('content', '')[:500]
+                    })
+                    break
+
+    concept_stats = {}
+    for concept, matches in concepts.items():
+        unique_sources = list(set([m['source'] for m in matches]))
+        concept_stats[concept] = {
+            'total_mentions': len(matches),
+            'unique_sources': len(unique_sources),
+            'sources': unique_sources[:20]
+        }
+
+    return concept_stats
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--chunks', type=int, nargs='+', default=[20_000, 200_000])
+    args = parser.parse_args()
+
+    matchers = {}
+    if extract_ict_wisdom.ahocorasick is not None:
+        matchers['automaton'] = ConceptMatcher()
+    automaton, extract_ict_wisdom.ahocorasick = extract_ict_wisdom.ahocorasick, None
+    matchers['regex'] = ConceptMatcher()
+    extract_ict_wisdom.ahocorasick = automaton
+
+    for n in args.chunks:
+        chunks = make_chunks(n)
+        legacy, legacy_s = timed(legacy_extract_ict_concepts, chunks)
+        print(f"{n:>8,} chunks  legacy    {legacy_s:7.2f}s")
+
+        for name, matcher in matchers.items():
+            compiled, compiled_s = timed(extract_ict_concepts, chunks, matcher)
+            assert compiled == legacy, f"{name} matcher output differs from the legacy loop"
+            print(f"{'':>15}  {name:<9} {compiled_s:7.2f}s  "
+                  f"speedup {legacy_s / compiled_s:4.1f}x  (output identical)")
+
+
+if __name__ == "__main__":
+    main()
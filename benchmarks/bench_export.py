@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Export memory benchmark.
+Writes the ict_wisdom.json export for a synthetic Cortex two ways, each in a
+fresh subprocess, and reports peak RSS: the legacy path (collect every chunk,
+organize_by_source, json.dump with indent=2) and the streaming path (pages
+into a ChunkSpool, write_export one transcript at a time). The two files
+are checked to hold the same transcripts and concept counts.
+
+It then times a whole run_extraction (export plus search artifacts) against
+a fake client and reports its peak RSS above the fake client's own table,
+which a real run does not hold.
+
+    python benchmarks/bench_export.py --chunks 20829 500000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from synthetic import iter_chunks, make_chunks
+from fake_supabase import FakeSupabase
+import extract_ict_wisdom
+from extract_ict_wisdom import ChunkSpool, TokenConceptMatcher, extract_ict_concepts, organize_by_source, write_export
+
+PAGE_SIZE = 1000
+
+
+def pages(n):
+    page = []
+    for chunk in iter_chunks(n):
+        page.append(chunk)
+        if len(page) == PAGE_SIZE:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+def export_legacy(n, path):
+    chunks = [chunk for page in pages(n) for chunk in page]
+    by_source = organize_by_source(chunks)
+    output = {
+        'extraction_info': {'total_chunks': len(chunks), 'total_sources': len(by_source)},
+        'concept_analysis': extract_ict_concepts(chunks),
+        'transcripts': by_source,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(output, f, indent=2, ensure_ascii=False)
+
+
+def export_streaming(n, path):
+    matcher = TokenConceptMatcher()
+    spool = ChunkSpool()
+    try:
+        for page in pages(n):
+            spool.add(page)
+            spool.match_concepts(page, matcher)
+        spool.db.commit()
+        sources = spool.source_counts()
+        info = {'total_chunks': sum(count for _, count in sources), 'total_sources': len(sources)}
+        write_export(path, info, spool.concept_stats(matcher.concepts), spool.transcripts())
+    finally:
+        spool.close()
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == 'darwin' else peak / 1024
+
+
+def child(mode, n, path):
+    """Run one export and print (seconds, peak RSS in MB) as JSON."""
+    if mode == 'extraction':
+        client = FakeSupabase(make_chunks(n))
+        baseline = peak_rss_mb()
+        os.chdir(os.path.dirname(path))
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            extract_ict_wisdom.run_extraction(client, extract_ict_wisdom.parse_args(['--output', path]))
+        print(json.dumps([time.perf_counter() - start, peak_rss_mb() - baseline]))
+        return
+
+    start = time.perf_counter()
+    {'legacy': export_legacy, 'streaming': export_streaming}[mode](n, path)
+    print(json.dumps([time.perf_counter() - start, peak_rss_mb()]))
+
+
+def run(mode, n, path):
+    out = subprocess.run([sys.executable, __file__, '--child', mode, str(n), path],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def summary(path):
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    counts = {c: (s['total_mentions'], s['unique_sources']) for c, s in data['concept_analysis'].items()}
+    return data['transcripts'], counts
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        child(sys.argv[2], int(sys.argv[3]), sys.argv[4])
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--chunks', type=int, nargs='+', default=[20_829, 500_000])
+    parser.add_argument('--no-verify', action='store_true', help="skip comparing the two files")
+    parser.add_argument('--no-extraction', action='store_true', help="skip the run_extraction measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.chunks:
+            paths = {mode: os.path.join(tmp, f'{mode}.json') for mode in ('legacy', 'streaming')}
+            results = {mode: run(mode, n, path) for mode, path in paths.items()}
+            size = os.path.getsize(paths['streaming']) / 1e6
+            print(f"{n:,} chunks ({size:,.0f} MB export)")
+            for mode, (seconds, peak_mb) in results.items():
+                print(f"  {mode:<10} {seconds:7.2f}s  peak RSS {peak_mb:8.1f} MB")
+            if not args.no_verify:
+                assert summary(paths['legacy']) == summary(paths['streaming']), "exports differ"
+            for path in paths.values():
+                os.remove(path)
+
+            if not args.no_extraction:
+                seconds, peak_mb = run('extraction', n, os.path.join(tmp, 'extraction.json'))
+                print(f"  {'extraction':<10} {seconds:7.2f}s  peak RSS {peak_mb:8.1f} MB above the fake table")
+
+
+if __name__ == "__main__":
+    main()
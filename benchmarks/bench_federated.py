@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Federated search benchmark.
+Extracts two synthetic sources with the generalised extractor (the second
+from another table via --table/--name), plus an off-topic source that
+mentions "liquidity" once, serves them from the in-process app and compares
+GET /search/all with searching each source in turn. Checks the merge matches
+sorting every source's results by similarity (fusing each source's lexical
+and vector results, in hybrid mode), that the off-topic mention never makes
+the merged top-k for "liquidity", and counts how often both topical sources
+appear in the merged lists.
+
+    python benchmarks/bench_federated.py --chunks 20829 8000 --queries 100
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+
+from synthetic import make_chunk_text, make_chunks, make_queries, synthetic_server
+from cortex.federated import fuse_top_k
+
+SOURCES = ('ict', 'vanessa')
+
+# Transcript speech with no ICT vocabulary but for one passing "liquidity"
+OFF_TOPIC = 'social'
+
+
+def off_topic_chunks(n):
+    rng = random.Random(7)
+    chunks = [{'id': i + 1, 'content': make_chunk_text(rng, keyword_rate=0), 'chunk_index': i % 27,
+               'source_transcript': f"Social Skills Episode {i // 27 + 1:04d}"} for i in range(n)]
+    chunks[n // 2]['content'] += ' and that is where the liquidity in the room is'
+    return chunks
+
+
+async def expected_results(client, params, names, limit, candidates):
+    """Similarities of the merged list, computed here from each source's own results."""
+    if params['mode'] != 'hybrid':
+        per_source = {name: (await client.get(f'/search/{name}', params=params)).json()['results']
+                      for name in names}
+        return sorted((result['similarity'] for results in per_source.values() for result in results),
+                      reverse=True)[:limit]
+    rankings = []
+    for mode in ('lexical', 'vector'):
+        stage = dict(params, mode=mode, limit=candidates)
+        rankings.append({name: (await client.get(f'/search/{name}', params=stage)).json()['results']
+                         for name in names})
+    return [r['similarity'] for r in fuse_top_k(rankings, limit, candidates)]
+
+
+async def p50_ms(client, requests):
+    samples = []
+    for urls in requests:
+        start = time.perf_counter()
+        for url, params in urls:
+            response = await client.get(url, params=params)
+            assert response.status_code == 200, response.text
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def run(server, args):
+    import httpx
+
+    server.load_engines()
+    queries = make_queries(args.queries)
+    async with httpx.AsyncClient(app=server.app, base_url='http://testserver') as client:
+        names = SOURCES + (OFF_TOPIC,)
+        mixed = 0
+        for query in queries[:20]:
+            params = {'query': query, 'limit': args.limit, 'mode': args.mode}
+            merged = (await client.get('/search/all', params=params)).json()
+            expected = await expected_results(client, params, names, args.limit, server.HYBRID_CANDIDATES)
+            assert expected == [r['similarity'] for r in merged['results']], query
+            mixed += {r['corpus'] for r in merged['results']} >= set(SOURCES)
+
+        for mode in ('lexical', 'vector', 'hybrid'):
+            for rerank in (False, True) if mode == 'hybrid' else (False,):
+                params = {'query': 'liquidity', 'limit': args.limit, 'mode': mode, 'rerank': rerank}
+                corpora = [r['corpus'] for r in (await client.get('/search/all', params=params)).json()['results']]
+                assert OFF_TOPIC not in corpora, f"off-topic mention ranked in {mode} (rerank={rerank}): {corpora}"
+
+        for name, value in (('cached', '1024'), ('uncached', '0')):
+            server.QUERY_CACHE.maxsize = int(value)
+            server.QUERY_CACHE.invalidate()
+            params = [{'query': q, 'limit': args.limit, 'mode': args.mode} for q in queries]
+            federated = [[('/search/all', p)] for p in params]
+            sequential = [[(f'/search/{s}', p) for s in SOURCES] for p in params]
+            if name == 'cached':
+                await p50_ms(client, federated)
+            federated, sequential = await p50_ms(client, federated), await p50_ms(client, sequential)
+            print(f"  {name:<9} /search/all p50 {federated:6.2f} ms   each source in turn {sequential:6.2f} ms")
+
+    print(f"  merged top-{args.limit} matched the per-source results for 20 queries; "
+          f"{mixed}/20 mixed results from both topical sources; "
+          f"the off-topic mention stayed out of every mode's top-{args.limit}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--chunks', type=int, nargs=2, default=[20_829, 8_000])
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--mode', choices=['lexical', 'vector', 'hybrid'], default='hybrid')
+    args = parser.parse_args()
+
+    os.environ['RELOAD_INTERVAL'] = '0'
+    sources = {name: make_chunks(n, seed=seed) for name, n, seed in zip(SOURCES, args.chunks, (0, 5))}
+    sources[OFF_TOPIC] = off_topic_chunks(2000)
+    with synthetic_server(sources, extract=True) as server:
+        print(f"{' + '.join(f'{n:,} {name}' for name, n in zip(SOURCES, args.chunks))} chunks, "
+              f"{args.queries} queries, mode={args.mode}, limit={args.limit}")
+        asyncio.run(run(server, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Chunk fetch benchmark.
+Compares the original OFFSET paging with select('*') against keyset paging
+with a column projection, using the in-memory fake supabase client. Rows
+carry an embedding column (as the real table does), and a second pass
+deletes rows mid-run to show OFFSET paging skipping rows. A last pass asks
+for pages larger than the server's row cap, which must not end the fetch.
+
+    python benchmarks/bench_fetch.py --chunks 20829 --page-size 1000
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import time
+
+from synthetic import make_chunks
+from fake_supabase import FakeSupabase
+from extract_ict_wisdom import fetch_all_chunks
+
+
+def legacy_fetch_all_chunks(supabase, batch_size):
+    """The pre-keyset implementation: OFFSET paging over select('*')."""
+    all_chunks = []
+    offset = 0
+    while True:
+        response = supabase.table('ict_chunks') \
+            .select('*') \
+            .range(offset, offset + batch_size - 1) \
+            .execute()
+        if not response.data:
+            break
+        all_chunks.extend(response.data)
+        if len(response.data) < batch_size:
+            break
+        offset += batch_size
+    return all_chunks
+
+
+def make_rows(n, dim):
+    rng = random.Random(3)
+    rows = make_chunks(n)
+    for row in rows:
+        row['embedding'] = [round(rng.uniform(-1, 1), 6) for _ in range(dim)]
+    return rows
+
+
+def measure(name, fetch, rows, **client_kwargs):
+    client = FakeSupabase(list(rows), **client_kwargs)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fetched = fetch(client)
+    seconds = time.perf_counter() - start
+    ids = [row['id'] for row in fetched]
+    print(f"  {name:<8} {seconds:6.2f}s  {client.requests:>4} requests  {client.rows_sent:>7,} rows  "
+          f"{client.bytes_sent / 1e6:8.2f} MB  missing {len(set(r['id'] for r in rows) - set(ids)):>4}  "
+          f"duplicated {len(ids) - len(set(ids)):>4}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--chunks', type=int, default=20_829)
+    parser.add_argument('--page-size', type=int, default=1000)
+    parser.add_argument('--embedding-dim', type=int, default=384)
+    parser.add_argument('--offset-cost', type=float, default=2e-6,
+                        help="simulated seconds per row skipped by OFFSET")
+    args = parser.parse_args()
+
+    rows = make_rows(args.chunks, args.embedding_dim)
+    legacy = lambda client: legacy_fetch_all_chunks(client, args.page_size)  # noqa: E731
+    keyset = lambda client: fetch_all_chunks(client, page_size=args.page_size)  # noqa: E731
+
+    print(f"{args.chunks:,} rows, page size {args.page_size}, {args.embedding_dim}-dim embedding column")
+    measure('offset', legacy, rows, offset_cost=args.offset_cost)
+    measure('keyset', keyset, rows, offset_cost=args.offset_cost)
+
+    # Delete a few early rows once the run is under way; "missing" excludes them
+    def delete_early_rows(client, query):
+        if client.requests == 2:
+            table = client.tables['ict_chunks']
+            client.tables['ict_chunks'] = [r for r in table if r['id'] % 100 != 7]
+
+    survivors = [r for r in rows if r['id'] % 100 != 7]
+    print("\nWith rows deleted after the second page:")
+    for name, fetch in (('offset', legacy), ('keyset', keyset)):
+        client = FakeSupabase(list(rows), on_request=delete_early_rows)
+        with contextlib.redirect_stdout(io.StringIO()):
+            fetched = fetch(client)
+        ids = [row['id'] for row in fetched]
+        missing = {r['id'] for r in survivors} - set(ids)
+        print(f"  {name:<8} surviving rows missed {len(missing):>4}  duplicated {len(ids) - len(set(ids)):>4}")
+
+    cap = args.page_size // 2
+    print(f"\nWith the server capping responses at {cap} rows:")
+    measure('keyset', keyset, rows, max_rows=cap)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Home page load test.
+Drives the ASGI app directly (no HTTP client in the loop, so the numbers are
+the server's own cost) and reports requests/sec and bytes on the wire per
+page view: the previous handler (returning the HTML_CONTENT string) against
+the precompressed one, for a first visit with each Accept-Encoding and for a
+repeat visit revalidating its ETag.
+
+    python benchmarks/bench_home.py --requests 5000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from fastapi.responses import HTMLResponse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+
+async def get(app, path, headers):
+    """Run one GET through the app; return (status, response headers, body bytes)."""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+        'root_path': '', 'server': ('testserver', 80), 'client': ('127.0.0.1', 1234),
+        'headers': [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    start = sent[0]
+    body = b''.join(m.get('body', b'') for m in sent[1:])
+    return start['status'], start['headers'], body
+
+
+async def measure(app, path, headers, requests, rounds=3):
+    best = 0.0
+    for _ in range(rounds):
+        began = time.perf_counter()
+        for _ in range(requests):
+            status, response_headers, body = await get(app, path, headers)
+        best = max(best, requests / (time.perf_counter() - began))
+    header_bytes = sum(len(k) + len(v) + 4 for k, v in response_headers)
+    encoding = dict(response_headers).get(b'content-encoding', b'-').decode()
+    return best, status, encoding, len(body), header_bytes
+
+
+async def run(args):
+    import main as server
+
+    @server.app.get("/legacy-home", response_class=HTMLResponse)
+    async def legacy_home():
+        return server.HTML_CONTENT
+
+    _, headers, _ = await get(server.app, '/', {'Accept-Encoding': 'gzip'})
+    etag = dict(headers)[b'etag'].decode()
+    cases = [
+        ('before (string)', '/legacy-home', {'Accept-Encoding': 'gzip, deflate, br'}),
+        ('identity', '/', {'Accept-Encoding': 'identity'}),
+        ('gzip', '/', {'Accept-Encoding': 'gzip, deflate'}),
+        ('br', '/', {'Accept-Encoding': 'gzip, deflate, br'}),
+        ('revalidate 304', '/', {'Accept-Encoding': 'gzip', 'If-None-Match': etag}),
+    ]
+    print(f"{args.requests:,} requests per case, best of 3 "
+          f"(brotli {'available' if 'br' in server.HOME_PAGE.variants else 'not installed'})")
+    for name, path, headers in cases:
+        rps, status, encoding, body_bytes, header_bytes = await measure(server.app, path, headers, args.requests)
+        print(f"  {name:<16} {rps:8,.0f} req/s  {status}  {encoding:<5} "
+              f"body {body_bytes:>6,} B  headers {header_bytes:>4} B")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['ICT_CORPUS'] = os.path.join(tmp, 'none.json')
+        os.environ['VANESSA_CORPUS'] = os.path.join(tmp, 'none.json')
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
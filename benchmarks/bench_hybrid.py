@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Hybrid search benchmark.
+Runs a full extraction of a synthetic corpus (fake supabase client), loads
+the engine and compares lexical, vector and hybrid search, with and without
+the re-rank stage:
+
+  * p50 latency per mode, and the p50 of each hybrid stage
+  * how the candidate budget trades latency for overlap with the widest budget
+  * phrase hit rate: the share of top results containing the query's ICT
+    phrase verbatim. A rough proxy only; the synthetic corpus has no
+    relevance judgements and favours exact-term matching.
+
+    python benchmarks/bench_hybrid.py --queries 200 --candidates 25 100 400
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import tempfile
+import time
+
+from synthetic import PHRASES, extract_source, make_chunks, make_queries
+import cortex.artifacts
+from cortex.engine import load_engine
+
+RUNS = [
+    ('lexical', {'mode': 'lexical'}),
+    ('vector', {'mode': 'vector'}),
+    ('hybrid', {'mode': 'hybrid'}),
+    ('hybrid+rerank', {'mode': 'hybrid', 'rerank': True}),
+]
+
+
+def query_phrase(query):
+    """The ICT phrase a synthetic query starts with (the longest that fits)."""
+    return max((p for p in PHRASES if query.startswith(p + ' ') or query == p), key=len)
+
+
+def run(engine, queries, limit, **options):
+    """Return (p50 ms, p50 ms per stage, phrase hit rate, top doc ids per query)."""
+    samples, stages, hits, tops = [], {}, 0, []
+    for query in queries:
+        timings = {}
+        start = time.perf_counter()
+        results = engine.search(query, limit, timings=timings, **options)
+        samples.append((time.perf_counter() - start) * 1000)
+        for stage, ms in timings.items():
+            stages.setdefault(stage, []).append(ms)
+        phrase = query_phrase(query)
+        hits += sum(phrase in r['content'].lower() for r in results)
+        tops.append([r['chunk_id'] for r in results])
+    stage_p50 = {stage[:-3]: statistics.median(ms) for stage, ms in stages.items()}
+    return statistics.median(samples), stage_p50, hits / (limit * len(queries)), tops
+
+
+def overlap(tops, reference):
+    """Mean share of the reference top results also found."""
+    return statistics.mean(len(set(a) & set(b)) / max(1, len(b)) for a, b in zip(tops, reference))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--chunks', type=int, default=20_829)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--candidates', type=int, nargs='+', default=[25, 100, 400])
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            cortex.artifacts.DATA_DIR = os.path.join(tmp, 'cortex_data')
+            with contextlib.redirect_stdout(io.StringIO()):
+                extract_source('ict', make_chunks(args.chunks))
+            engine = load_engine('ict', os.path.join(tmp, 'ict_wisdom.json'))
+        finally:
+            os.chdir(cwd)
+        report(engine, args)
+
+
+def report(engine, args):
+    queries = make_queries(args.queries)
+    print(f"{len(engine.corpus):,} chunks, {len(queries)} queries, limit={args.limit}, "
+          f"reranker {engine.reranker.name} (p50)")
+    for name, options in RUNS:
+        p50, stages, hit_rate, _ = run(engine, queries, args.limit, **options)
+        breakdown = '  '.join(f"{stage} {ms:.2f}" for stage, ms in stages.items())
+        print(f"  {name:<14} {p50:7.2f}ms  phrase hits {hit_rate:6.1%}   [{breakdown}]")
+
+    print(f"Candidate budget (overlap with the top {args.limit} at {max(args.candidates)} candidates)")
+    for rerank in (False, True):
+        runs = {n: run(engine, queries, args.limit, mode='hybrid', candidates=n, rerank=rerank)
+                for n in sorted(args.candidates)}
+        reference = runs[max(args.candidates)][3]
+        for n, (p50, _, hit_rate, tops) in runs.items():
+            label = f"{n}{' +rerank' if rerank else ''}"
+            print(f"  {label:<14} {p50:7.2f}ms  phrase hits {hit_rate:6.1%}  overlap {overlap(tops, reference):6.1%}")
+
+
+if __name__ == "__main__":
+    main()
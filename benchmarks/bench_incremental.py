@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Incremental extraction benchmark.
+Runs a full extraction against an in-memory fake of the supabase client,
+then adds and edits a weekly delta of rows and compares a full re-run with
+an --incremental run: wall time, requests, rows and bytes transferred. The
+incremental run is timed both with the previous run's artifacts and from a
+fresh checkout holding only the export. Both outputs are checked against the
+full re-run.
+
+    python benchmarks/bench_incremental.py --chunks 20829 --delta 500
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from synthetic import make_chunks
+from fake_supabase import FakeSupabase
+import extract_ict_wisdom
+
+
+def run(client, output, incremental):
+    args = extract_ict_wisdom.parse_args(
+        ['--output', output, '--watermark-column', 'updated_at'] + (['--incremental'] if incremental else []))
+    client.reset_counters()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        extract_ict_wisdom.run_extraction(client, args)
+    return time.perf_counter() - start, client.requests, client.rows_sent, client.bytes_sent
+
+
+def load(path):
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    counts = {c: (s['total_mentions'], s['unique_sources']) for c, s in data['concept_analysis'].items()}
+    return data['transcripts'], counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--chunks', type=int, default=20_829)
+    parser.add_argument('--delta', type=int, default=500, help="rows added this week (plus delta/10 edited)")
+    args = parser.parse_args()
+
+    rows = make_chunks(args.chunks + args.delta)
+    for row in rows:
+        row['updated_at'] = f"2026-01-01T00:00:{row['id']:09d}"
+    base, delta = rows[:args.chunks], rows[args.chunks:]
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            client = FakeSupabase(list(base))
+            run(client, 'ict_wisdom.json', incremental=False)
+            shutil.copy('ict_wisdom.json', 'checkout.json')
+
+            # The weekly delta: new rows plus a few edited ones
+            edited = base[::max(1, len(base) // max(1, args.delta // 10))][:args.delta // 10]
+            for row in edited:
+                row['content'] += ' silver bullet'
+                row['updated_at'] = '2026-02-01T00:00:00'
+            client.tables['ict_chunks'] = base + delta
+
+            results = {'incremental': run(client, 'ict_wisdom.json', incremental=True)}
+            # Artifacts are not committed: a new checkout has only the export
+            shutil.rmtree('cortex_data')
+            results['checkout'] = run(client, 'checkout.json', incremental=True)
+            results['full'] = run(client, 'full.json', incremental=False)
+            for path in ('ict_wisdom.json', 'checkout.json'):
+                assert load('full.json') == load(path), f"incremental output {path} differs from full run"
+        finally:
+            os.chdir(cwd)
+
+    print(f"{args.chunks:,} existing chunks, {args.delta:,} new, {args.delta // 10:,} edited")
+    for name, (seconds, requests, rows_sent, bytes_sent) in results.items():
+        print(f"  {name:<12} {seconds:6.2f}s  {requests:>4} requests  {rows_sent:>7,} rows  "
+              f"{bytes_sent / 1e6:7.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
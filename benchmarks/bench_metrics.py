@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Metrics and slow-query log check and benchmark.
+Serves a synthetic corpus from the in-process ASGI app, sends a mix of
+searches (including repeats, so the cache hits) and checks /metrics parses
+as Prometheus text with per-route and per-stage histograms, cache counters,
+index sizes and memory. With SLOW_QUERY_MS set low, checks slow requests are
+logged with their stage breakdown. Reports the middleware's cost per request
+(against a no-op ASGI app) and how long a scrape takes.
+
+    python benchmarks/bench_metrics.py --requests 500
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import time
+
+from synthetic import make_chunks, make_queries, synthetic_server
+from cortex.metrics import Counter, Histogram, RequestMetrics
+
+SAMPLE_RE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{(\w+="([^"\\]|\\.)*",?)*\})? [-+0-9.eInf]+$')
+
+
+async def middleware_cost(n):
+    """Microseconds per request added by RequestMetrics around a no-op app."""
+    async def noop(scope, receive, send):
+        await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def sent(message):
+        pass
+
+    wrapped = RequestMetrics(noop, Histogram('d', 'd', ('route',)), Counter('r', 'r', ('route', 'status')))
+    timings = {}
+    for name, app in (('bare', noop), ('metrics', wrapped)):
+        start = time.perf_counter()
+        for _ in range(n):
+            await app({'type': 'http', 'path': '/'}, None, sent)
+        timings[name] = (time.perf_counter() - start) / n * 1e6
+    return timings['metrics'] - timings['bare']
+
+
+async def run(server, args):
+    import httpx
+
+    server.load_engines()
+    queries = make_queries(args.requests // 4)
+    async with httpx.AsyncClient(app=server.app, base_url='http://testserver') as client:
+        for i in range(args.requests):
+            mode = ('lexical', 'vector', 'hybrid')[i % 3]
+            response = await client.get('/search/ict', params={'query': queries[i % len(queries)], 'mode': mode})
+            assert response.status_code == 200, response.text
+        await client.post('/search/batch', json=[{'query': q} for q in queries[:8]])
+        await client.get('/search/nope', params={'query': 'x'})
+
+        samples = []
+        for _ in range(20):
+            start = time.perf_counter()
+            response = await client.get('/metrics')
+            samples.append((time.perf_counter() - start) * 1000)
+        body = response.text
+
+    assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+    for line in body.splitlines():
+        assert line.startswith('# ') or SAMPLE_RE.match(line), line
+    for needle in ('cortex_request_duration_seconds_bucket{route="/search/{source}",le="+Inf"}',
+                   'cortex_requests_total{route="/search/{source}",status="404"}',
+                   'cortex_search_stage_duration_seconds_count{source="ict",mode="hybrid",stage="fusion"}',
+                   'cortex_search_stage_duration_seconds_count{source="ict",mode="lexical",stage="serialize"}',
+                   'cortex_query_cache_hit_ratio', 'cortex_index_chunks{source="ict"}',
+                   'cortex_index_vectors{source="ict"}', 'process_resident_memory_bytes'):
+        assert needle in body, needle
+
+    with open(server.SLOW_QUERIES.path, encoding='utf-8') as f:
+        slow = [json.loads(line) for line in f]
+    assert slow and slow[0]['route'] == '/search/{source}' and 'parse_ms' in slow[0]['timings'], slow[:1]
+
+    print(f"{args.requests} searches + 1 batch, {len(body.splitlines())} exposition lines, "
+          f"{len(body) / 1024:.1f} KiB")
+    print(f"  /metrics scrape       p50 {statistics.median(samples):6.2f} ms")
+    print(f"  middleware overhead   {await middleware_cost(20_000):6.2f} µs/request")
+    print(f"  slow-query log        {len(slow)} requests over {server.SLOW_QUERIES.threshold_ms} ms, e.g. "
+          f"{ {k: v for k, v in slow[-1].items() if k in ('route', 'query', 'mode', 'total_ms', 'timings')} }")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--chunks', type=int, default=20_829)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--slow-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    os.environ['SLOW_QUERY_MS'] = str(args.slow_ms)
+    os.environ['SLOW_QUERY_LOG'] = 'slow_queries.jsonl'  # in the server's temporary directory
+    with synthetic_server({'ict': make_chunks(args.chunks)}) as server:
+        asyncio.run(run(server, args))
+
+
+if __name__ == "__main__":
+    main()
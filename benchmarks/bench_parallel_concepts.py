@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Parallel concept analysis benchmark.
+Runs extract_ict_concepts over a large synthetic corpus in-process and in a
+ConceptPool of 1/2/4/8 worker processes, and checks every run produces the
+same per-concept chunk ids and concept_stats as the in-process matcher.
+Reports wall time (pool start-up excluded, and shown separately) and the
+speedup over in-process matching.
+
+    python benchmarks/bench_parallel_concepts.py --chunks 300000 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import time
+
+from synthetic import make_chunks
+from extract_ict_wisdom import ConceptPool, TokenConceptMatcher, match_concepts, summarize_concepts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--chunks', type=int, default=300_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.chunks)
+    source_of = {chunk['id']: chunk['source_transcript'] for chunk in chunks}
+
+    start = time.perf_counter()
+    expected = match_concepts(chunks, TokenConceptMatcher())
+    serial_s = time.perf_counter() - start
+    expected_stats = summarize_concepts(expected, source_of)
+
+    print(f"{args.chunks:,} chunks, {os.cpu_count()} CPU(s) available")
+    print(f"  in-process       {serial_s:7.2f}s")
+    for workers in args.workers:
+        start = time.perf_counter()
+        with ConceptPool(workers) as pool:
+            pool.hits(chunks[:workers])  # wait for every worker to start
+            started_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            concept_chunks = match_concepts(chunks, pool)
+            seconds = time.perf_counter() - start
+
+        assert concept_chunks == expected, f"{workers} workers: chunk ids differ"
+        assert summarize_concepts(concept_chunks, source_of) == expected_stats, f"{workers} workers: stats differ"
+        print(f"  {workers} worker(s)     {seconds:7.2f}s  speedup {serial_s / seconds:4.2f}x  "
+              f"(pool start {started_s:.2f}s, output identical)")
+
+
+if __name__ == "__main__":
+    main()
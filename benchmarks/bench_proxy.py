@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Upstream proxy check and benchmark.
+Starts a local stub upstream (uvicorn on a free port) and drives main.py's
+/api/* routes in process:
+
+  * proxied searches through the shared keep-alive pool against a client per
+    request (requests/sec, upstream TCP connections opened)
+  * /api/health page loads reach the upstream once per TTL
+  * a hanging upstream: requests time out, then the circuit opens and calls
+    fail fast, then a trial call closes it once the upstream recovers
+
+    python benchmarks/bench_proxy.py --requests 500 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+
+class StubUpstream:
+    """Minimal search backend: /, /health and /search/{source} with controllable delay."""
+
+    def __init__(self, latency=0.005):
+        from starlette.applications import Starlette
+        from starlette.responses import JSONResponse, PlainTextResponse
+        from starlette.routing import Route
+
+        self.latency = latency
+        self.hang = False
+        self.requests = 0
+        self.connections = set()
+
+        async def handle(request):
+            self.requests += 1
+            self.connections.add(tuple(request.scope['client']))
+            await asyncio.sleep(30 if self.hang else self.latency)
+            if request.url.path.startswith('/search/'):
+                query = request.query_params.get('query', '')
+                return JSONResponse({'query': query, 'results': [{'content': f'stub result for {query}'}]})
+            return PlainTextResponse('ok')
+
+        self.app = Starlette(routes=[
+            Route('/', handle), Route('/health', handle), Route('/search/{source}', handle),
+        ])
+
+    def start(self):
+        import uvicorn
+
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            self.port = s.getsockname()[1]
+        config = uvicorn.Config(self.app, host='127.0.0.1', port=self.port, log_level='error')
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return f'http://127.0.0.1:{self.port}'
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join()
+
+
+async def load(client, path, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            response = await client.get(path, params={'query': f'order block {i % 20}'})
+            assert response.status_code == 200, response.text
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+async def run(server, stub, args):
+    import httpx
+
+    @server.app.get("/unpooled/{path:path}")
+    async def unpooled(path: str, request: server.Request):
+        # What the proxy would cost without the shared pool
+        async with httpx.AsyncClient(base_url=server.UPSTREAM.base_url, timeout=10) as client:
+            response = await client.get('/' + path, params=request.query_params.multi_items())
+        return server.Response(response.content, media_type=response.headers.get('content-type'))
+
+    await server.UPSTREAM.start()
+    try:
+        async with httpx.AsyncClient(app=server.app, base_url='http://testserver', timeout=60) as client:
+            print(f"{args.requests} proxied searches, {args.concurrency} concurrent, "
+                  f"{stub.latency * 1000:.0f} ms upstream latency")
+            for name, path in (('client per request', '/unpooled/search/ict'), ('shared pool', '/api/search/ict')):
+                stub.connections.clear()
+                rps = await load(client, path, args.requests, args.concurrency)
+                print(f"  {name:<19} {rps:7,.0f} req/s  {len(stub.connections):>4} upstream connections")
+
+            before = stub.requests
+            for _ in range(100):
+                health = (await client.get('/api/health')).json()
+            print(f"  100 /api/health page loads → {stub.requests - before} upstream call(s), "
+                  f"status {health['status']}")
+
+            breaker = server.UPSTREAM.breaker
+            stub.hang = True
+            timings = []
+            for _ in range(breaker.failure_threshold + 3):
+                start = time.perf_counter()
+                response = await client.get('/api/search/ict', params={'query': 'fvg'})
+                timings.append((response.status_code, (time.perf_counter() - start) * 1000))
+            print("  hanging upstream: " + ", ".join(f"{code} {ms:.0f} ms" for code, ms in timings))
+            assert [code for code, _ in timings] == [504] * breaker.failure_threshold + [503] * 3
+            retry_after = response.headers.get('retry-after')
+            print(f"  circuit {breaker.state}, Retry-After {retry_after}s, {breaker.rejected} rejected without a call")
+
+            stub.hang = False
+            await asyncio.sleep(breaker.reset_timeout)
+            response = await client.get('/api/search/ict', params={'query': 'fvg'})
+            assert response.status_code == 200 and breaker.state == 'closed'
+            print(f"  after {breaker.reset_timeout:.1f}s: trial call {response.status_code}, circuit {breaker.state}")
+    finally:
+        await server.UPSTREAM.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.005, help="stub upstream seconds per request")
+    args = parser.parse_args()
+
+    stub = StubUpstream(args.latency)
+    os.environ.update({
+        'UPSTREAM_URL': stub.start(),
+        'UPSTREAM_TIMEOUT': '0.2',
+        'UPSTREAM_RESET_TIMEOUT': '1',
+        'UPSTREAM_HEALTH_TTL': '30',
+        'ICT_CORPUS': os.path.join(os.sep, 'nonexistent', 'ict.json'),
+        'VANESSA_CORPUS': os.path.join(os.sep, 'nonexistent', 'vanessa.json'),
+    })
+    try:
+        import main as server
+
+        asyncio.run(run(server, stub, args))
+    finally:
+        stub.hang = False
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Hot reload under load.
+Extracts a synthetic corpus (fake supabase client), serves it from the
+in-process ASGI app and keeps concurrent /search/ict requests running while a
+second, larger extraction rewrites the artifacts in place. The artifact
+watcher picks up the new manifest version and swaps the engine. Checks no
+request fails, that once the swap is visible every request is answered by the
+new version, and reports latency before, during and after the reload.
+
+    python benchmarks/bench_reload.py --chunks 20000 30000 --concurrent 16
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import threading
+import time
+
+from synthetic import extract_source, make_chunks, make_queries, synthetic_server
+from cortex.artifacts import read_manifest
+
+
+def percentiles(samples):
+    if not samples:
+        return "      -"
+    samples = sorted(samples)
+    return (f"p50 {statistics.median(samples):7.2f}ms  "
+            f"p99 {samples[min(len(samples) - 1, int(len(samples) * 0.99))]:7.2f}ms  n={len(samples)}")
+
+
+async def run(server, args):
+    import httpx
+
+    server.load_engines()
+    old_version = server.ENGINES['ict'].version
+    watcher = asyncio.create_task(server.watch_artifacts(args.interval))
+    queries = make_queries(200)
+    log, failures, stop = [], [], asyncio.Event()
+
+    async def client_loop(client, offset):
+        i = offset
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                response = await client.get('/search/ict', params={'query': queries[i % len(queries)], 'limit': 10})
+                if response.status_code != 200:
+                    failures.append(response.text)
+                else:
+                    log.append((start, (time.perf_counter() - start) * 1000, response.json()['version']))
+            except Exception as e:
+                failures.append(repr(e))
+            i += 1
+
+    async with httpx.AsyncClient(app=server.app, base_url='http://testserver', timeout=60) as client:
+        loops = [asyncio.create_task(client_loop(client, i)) for i in range(args.concurrent)]
+        await asyncio.sleep(args.settle)
+
+        extraction = threading.Thread(target=extract_source, args=('ict', make_chunks(args.chunks[1], seed=2)))
+        reload_started = time.perf_counter()
+        extraction.start()
+        while extraction.is_alive():
+            await asyncio.sleep(0.05)
+        new_version = read_manifest('ict')['version']
+        while server.ENGINES['ict'].version != new_version:
+            await asyncio.sleep(0.05)
+        swapped = time.perf_counter()
+        await asyncio.sleep(args.settle)
+        stop.set()
+        await asyncio.gather(*loops)
+        watcher.cancel()
+
+    before = [ms for t, ms, _ in log if t < reload_started]
+    during = [ms for t, ms, _ in log if reload_started <= t < swapped]
+    after = [ms for t, ms, _ in log if t >= swapped]
+    stale = [v for t, _, v in log if t >= swapped and v != new_version]
+    versions = {v: sum(1 for *_, seen in log if seen == v) for v in (old_version, new_version)}
+
+    report = [
+        f"{args.concurrent} concurrent clients, {args.chunks[0]:,} → {len(server.ENGINES['ict'].corpus):,} chunks, "
+        f"reload checked every {args.interval}s",
+        f"  requests {len(log) + len(failures):,}, failed {len(failures)}, "
+        f"answered by old/new version {versions[old_version]:,}/{versions[new_version]:,}",
+        f"  extraction + swap took {swapped - reload_started:.2f}s",
+        f"  before reload  {percentiles(before)}",
+        f"  during reload  {percentiles(during)}",
+        f"  after swap     {percentiles(after)}",
+    ]
+    assert not failures, failures[:3]
+    assert old_version != new_version
+    assert not stale, f"{len(stale)} requests started after the swap were answered by the old version"
+    return '\n'.join(report)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--chunks', type=int, nargs=2, default=[20_000, 30_000])
+    parser.add_argument('--concurrent', type=int, default=16)
+    parser.add_argument('--interval', type=float, default=0.2)
+    parser.add_argument('--settle', type=float, default=2.0)
+    args = parser.parse_args()
+    os.environ['QUERY_CACHE_SIZE'] = '0'
+    os.environ['RELOAD_INTERVAL'] = '0'
+
+    with synthetic_server({'ict': make_chunks(args.chunks[0], seed=1)}, extract=True) as server:
+        with contextlib.redirect_stdout(io.StringIO()):
+            report = asyncio.run(run(server, args))
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
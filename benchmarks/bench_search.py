@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Local search latency benchmark.
+Builds a synthetic corpus export and its prebuilt index, loads them the way
+main.py does and reports p50/p99 latency of /search/ict?limit=10 through the
+in-process ASGI app.
+
+    python benchmarks/bench_search.py --chunks 20829 --queries 500
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+
+from synthetic import make_chunks, make_queries, synthetic_server
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--chunks', type=int, default=20_829)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--mode', choices=['lexical', 'vector'], default='lexical')
+    parser.add_argument('--quantize', action='store_true', help="store vectors as int8")
+    parser.add_argument('--cache', type=int, default=0,
+                        help="query cache size (0 disables it and every query hits the index)")
+    parser.add_argument('--distinct', type=int, default=100,
+                        help="with --cache, draw queries Zipf-distributed from this many distinct ones")
+    args = parser.parse_args()
+    os.environ['QUERY_CACHE_SIZE'] = str(args.cache)
+
+    with synthetic_server({'ict': make_chunks(args.chunks)}, vectors=args.mode == 'vector',
+                          quantize=args.quantize) as server:
+        from fastapi.testclient import TestClient
+
+        if args.cache:
+            pool = make_queries(args.distinct)
+            weights = [1.0 / rank for rank in range(1, len(pool) + 1)]
+            queries = random.Random(2).choices(pool, weights, k=args.queries)
+        else:
+            queries = make_queries(args.queries)
+
+        with TestClient(server.app) as client:
+            latencies = []
+            for query in queries:
+                start = time.perf_counter()
+                response = client.get('/search/ict', params={'query': query, 'limit': args.limit, 'mode': args.mode})
+                latencies.append((time.perf_counter() - start) * 1000)
+                assert response.status_code == 200, response.text
+            cache = client.get('/cache/stats').json()
+
+    print(f"{args.chunks:,} chunks, {args.queries} queries, limit={args.limit}, mode={args.mode}"
+          f"{' (int8)' if args.quantize else ''}")
+    print(f"  p50 {statistics.median(latencies):6.2f} ms   p99 {percentile(latencies, 99):6.2f} ms   "
+          f"max {max(latencies):6.2f} ms")
+    if args.cache:
+        print(f"  cache size {args.cache}, {args.distinct} distinct queries (Zipf): "
+              f"hit rate {cache['hit_rate']:.1%}, {cache['evictions']} evictions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Request coalescing check and benchmark.
+Fires hundreds of concurrent identical /search requests at the in-process
+ASGI app (httpx.AsyncClient, cache disabled) with and without the
+single-flight layer, and checks every response is identical and that with
+coalescing the search runs once per burst and its stage timings are
+recorded once. Reports wall time and searches run.
+
+    python benchmarks/bench_singleflight.py --concurrent 500 --mode vector
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+
+from synthetic import make_chunks, synthetic_server
+
+
+class NoCoalescing:
+    """Drop-in for SingleFlight that runs every call."""
+
+    async def do(self, key, fn):
+        return await fn()
+
+    def stats(self):
+        return {}
+
+
+async def burst(client, engine, args):
+    calls = [0]
+    lock = threading.Lock()
+    search = engine.search
+
+    def counting_search(*a, **kw):
+        with lock:
+            calls[0] += 1
+        return search(*a, **kw)
+
+    engine.search = counting_search
+    try:
+        params = {'query': 'fair value gap in the kill zone', 'limit': args.limit, 'mode': args.mode}
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(
+            client.get('/search/ict', params=params) for _ in range(args.concurrent)))
+        seconds = time.perf_counter() - start
+    finally:
+        engine.search = search
+
+    assert all(r.status_code == 200 for r in responses), responses[0].text
+    # Bodies also carry per-request timings; the results themselves must match
+    bodies = {json.dumps(r.json()['results']) for r in responses}
+    assert len(bodies) == 1, "concurrent identical searches returned different results"
+    return seconds, calls[0]
+
+
+def stage_count(server, mode):
+    """Searches recorded in the stage histogram's 'results' series for 'ict'."""
+    series = server.SEARCH_STAGE_DURATION._series.get(('ict', mode, 'results'))
+    return series[2] if series else 0
+
+
+async def run(server, args):
+    import httpx
+
+    server.load_engines()
+    engine = server.ENGINES['ict']
+    async with httpx.AsyncClient(app=server.app, base_url='http://testserver') as client:
+        observed = stage_count(server, args.mode)
+        coalesced = await burst(client, engine, args)
+        stats = (await client.get('/cache/stats')).json()['single_flight']
+        assert coalesced[1] == 1, f"expected one search, ran {coalesced[1]}"
+        assert stats['coalesced'] == args.concurrent - 1, stats
+        observed = stage_count(server, args.mode) - observed
+        assert observed == 1, f"stage histogram recorded {observed} searches for one"
+
+        flights = server.SEARCH_FLIGHTS
+        server.SEARCH_FLIGHTS = NoCoalescing()
+        try:
+            independent = await burst(client, engine, args)
+        finally:
+            server.SEARCH_FLIGHTS = flights
+
+    print(f"{args.concurrent} concurrent identical requests, mode={args.mode}, limit={args.limit}")
+    for name, (seconds, calls) in (('independent', independent), ('single-flight', coalesced)):
+        print(f"  {name:<14} {seconds * 1000:8.0f} ms  {calls:>4} searches run")
+    print(f"  single-flight stats: {stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--chunks', type=int, default=20_829)
+    parser.add_argument('--concurrent', type=int, default=500)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--mode', choices=['lexical', 'vector'], default='vector')
+    args = parser.parse_args()
+    os.environ['QUERY_CACHE_SIZE'] = '0'
+
+    with synthetic_server({'ict': make_chunks(args.chunks)}, vectors=args.mode == 'vector') as server:
+        asyncio.run(run(server, args))
+
+
+if __name__ == "__main__":
+    main()
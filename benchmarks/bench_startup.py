@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Server cold start benchmark.
+Builds a synthetic export (indented JSON, as the extractor writes it), its
+BM25 index and the columnar corpus.bin, then starts fresh interpreters that
+import main.py and load the engines, once parsing the JSON and once
+memory-mapping corpus.bin. Reports time until the first search returns and
+peak RSS.
+
+    python benchmarks/bench_startup.py --chunks 20829 200000
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from synthetic import make_chunks
+from extract_ict_wisdom import build_search_index, organize_by_source, write_export
+import cortex.artifacts
+from cortex.artifacts import BM25_FILE, MANIFEST_FILE, artifact_path, write_manifest
+from cortex.corpus import CORPUS_FILE, corpus_from_transcripts, write_corpus
+
+
+def peak_rss_mb():
+    """Peak RSS of this process since exec.
+
+    ru_maxrss survives execve, so a child of this (large) parent would report
+    the parent's peak; /proc's VmHWM starts over with the new address space.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == 'darwin' else peak / 1024
+
+
+def child():
+    """Load main.py's engines, run one search and print timings as JSON."""
+    start = time.perf_counter()
+    import main as server
+    imported = time.perf_counter()
+    server.load_engines()
+    loaded = time.perf_counter()
+    server.ENGINES['ict'].search('fair value gap', 10)
+    searched = time.perf_counter()
+    print(json.dumps({
+        'import': imported - start,
+        'load': loaded - imported,
+        'first_search': searched - loaded,
+        'peak_mb': peak_rss_mb(),
+        'corpus': type(server.ENGINES['ict'].corpus).__name__,
+    }))
+
+
+def run(tmp, export_path):
+    env = dict(os.environ, CORTEX_DATA=tmp, ICT_CORPUS=export_path, VANESSA_CORPUS=os.path.join(tmp, 'none'))
+    repo = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), '--child'], cwd=repo, env=env,
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    if sys.argv[1:] == ['--child']:
+        child()
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--chunks', type=int, nargs='+', default=[20_829, 200_000])
+    args = parser.parse_args()
+
+    for n in args.chunks:
+        with tempfile.TemporaryDirectory() as tmp:
+            cortex.artifacts.DATA_DIR = tmp
+            chunks = make_chunks(n)
+            by_source = organize_by_source(chunks)
+            del chunks
+            corpus = corpus_from_transcripts(by_source, 'ict')
+            build_search_index('ict', corpus.contents)
+            export_path = os.path.join(tmp, 'ict_wisdom.json')
+            write_export(export_path, {'total_chunks': len(corpus)}, {}, by_source.items())
+            corpus_path = artifact_path('ict', CORPUS_FILE)
+            write_corpus(corpus_path, zip(corpus.ids, corpus.sources, corpus.chunk_indexes, corpus.contents))
+            del by_source, corpus
+
+            print(f"{n:,} chunks: export {os.path.getsize(export_path) / 1e6:.0f} MB, "
+                  f"corpus.bin {os.path.getsize(corpus_path) / 1e6:.0f} MB")
+            write_manifest('ict', [CORPUS_FILE, BM25_FILE])
+            results = {'columnar': run(tmp, export_path)}
+            # Without a manifest listing corpus.bin the server falls back to parsing the export
+            os.remove(artifact_path('ict', MANIFEST_FILE))
+            results['json'] = run(tmp, export_path)
+            for name in ('json', 'columnar'):
+                r = results[name]
+                ready = r['load'] + r['first_search']
+                print(f"  {name:<9} load {r['load'] * 1000:7.0f} ms  first search {r['first_search'] * 1000:5.1f} ms  "
+                      f"ready {ready * 1000:7.0f} ms (+{r['import'] * 1000:.0f} ms imports)  "
+                      f"peak RSS {r['peak_mb']:7.1f} MB  [{r['corpus']}]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Streaming search benchmark.
+Serves a synthetic corpus (BM25 index + vector store) with uvicorn on a free
+port and reads /search/ict/stream over a real HTTP connection, reporting p50
+time to the first result card, to the re-ranked list and to the end of the
+stream, next to the non-streaming GET /search/ict latency (cache disabled).
+The re-ranked list is checked against GET /search/ict in hybrid mode.
+
+    python benchmarks/bench_stream.py --queries 200
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+from synthetic import make_chunks, make_queries, synthetic_server
+
+
+def serve(app):
+    import uvicorn
+
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='error'))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread, f'http://127.0.0.1:{port}'
+
+
+def stream_timings(client, query, limit):
+    """Return ms until the first 'result', the 'rerank' and the 'done' event, and the re-ranked results."""
+    marks, reranked = {}, None
+    start = time.perf_counter()
+    with client.stream('GET', '/search/ict/stream', params={'query': query, 'limit': limit}) as response:
+        event = None
+        for line in response.iter_lines():
+            if line.startswith('event: '):
+                event = line[7:]
+            elif line.startswith('data: ') and event not in marks:
+                marks[event] = (time.perf_counter() - start) * 1000
+                if event in ('rerank', 'done'):
+                    data = json.loads(line[6:])
+                    if event == 'rerank':
+                        reranked = data['results']
+    return marks, reranked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--chunks', type=int, default=20_829)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--embedder', default=None, help="embedder spec, e.g. sentence-transformers:all-MiniLM-L6-v2")
+    args = parser.parse_args()
+    os.environ['QUERY_CACHE_SIZE'] = '0'
+
+    kwargs = {'embedder_spec': args.embedder} if args.embedder else {}
+    with synthetic_server({'ict': make_chunks(args.chunks)}, **kwargs) as server:
+        import httpx
+
+        uvicorn_server, thread, base_url = serve(server.app)
+        try:
+            marks, plain = [], {'lexical': [], 'hybrid': []}
+            with httpx.Client(base_url=base_url, timeout=30) as client:
+                for query in make_queries(args.queries):
+                    query_marks, reranked = stream_timings(client, query, args.limit)
+                    marks.append(query_marks)
+                    for mode in plain:
+                        start = time.perf_counter()
+                        response = client.get('/search/ict', params={'query': query, 'limit': args.limit,
+                                                                     'mode': mode})
+                        plain[mode].append((time.perf_counter() - start) * 1000)
+                    assert reranked == response.json()['results'], f"stream differs from hybrid search: {query!r}"
+        finally:
+            uvicorn_server.should_exit = True
+            thread.join()
+
+    def p50(samples):
+        return statistics.median(samples)
+
+    print(f"{args.chunks:,} chunks, {args.queries} queries, limit={args.limit}, "
+          f"embedder {args.embedder or 'default'} (p50 over HTTP)")
+    print(f"  stream  first result {p50([m['result'] for m in marks if 'result' in m]):6.2f} ms  "
+          f"re-ranked {p50([m['rerank'] for m in marks if 'rerank' in m]):6.2f} ms  "
+          f"done {p50([m['done'] for m in marks]):6.2f} ms")
+    print(f"  GET     lexical {p50(plain['lexical']):6.2f} ms  hybrid {p50(plain['hybrid']):6.2f} ms")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
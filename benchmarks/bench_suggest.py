@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Suggestion latency benchmark.
+Builds a synthetic corpus and its index, then requests /suggest for every
+prefix of a set of queries (as if typed one key at a time) through the
+in-process ASGI app, reporting p50/p99 latency end to end and for the
+prefix lookup alone.
+
+    python benchmarks/bench_suggest.py --queries 200
+"""
+
+import argparse
+import random
+import statistics
+import string
+import time
+
+from synthetic import make_chunks, make_queries, synthetic_server
+from cortex.suggest import PrefixIndex
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--chunks', type=int, default=20_829)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--vocab', type=int, default=200_000,
+                        help="size of a random vocabulary for a worst-case prefix lookup check")
+    args = parser.parse_args()
+
+    with synthetic_server({'ict': make_chunks(args.chunks)}, vectors=False) as server:
+        from fastapi.testclient import TestClient
+
+        prefixes = [query[:i] for query in make_queries(args.queries) for i in range(1, len(query) + 1)]
+        with TestClient(server.app) as client:
+            index = server.ENGINES['ict'].suggestions
+            started = time.perf_counter()
+            built = type(index).build(server.ENGINES['ict'].lexical)
+            build_ms = (time.perf_counter() - started) * 1000
+
+            lookup, http = [], []
+            for prefix in prefixes:
+                start = time.perf_counter()
+                index.suggest(prefix)
+                lookup.append((time.perf_counter() - start) * 1000)
+
+                start = time.perf_counter()
+                response = client.get('/suggest', params={'q': prefix})
+                http.append((time.perf_counter() - start) * 1000)
+                assert response.status_code == 200, response.text
+
+            sample = client.get('/suggest', params={'q': 'fair v'}).json()['suggestions']
+
+    print(f"{args.chunks:,} chunks, {len(built.terms.keys):,} terms + {len(built.concepts.keys)} concept phrases "
+          f"(built in {build_ms:.1f} ms), {len(prefixes):,} prefixes")
+    print(f"  lookup    p50 {statistics.median(lookup):6.3f} ms   p99 {percentile(lookup, 99):6.3f} ms")
+    print(f"  /suggest  p50 {statistics.median(http):6.3f} ms   p99 {percentile(http, 99):6.3f} ms")
+    print(f"  'fair v' → {[s['text'] for s in sample]}")
+
+    # The synthetic transcripts reuse a small vocabulary; check lookups stay
+    # fast when one-letter prefixes cover tens of thousands of terms
+    rng = random.Random(0)
+    words = list({''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 12))) for _ in range(args.vocab)})
+    big = PrefixIndex(words, [rng.randint(1, 5000) for _ in words])
+    lookup = []
+    for prefix in [p for word in rng.sample(words, 2000) for p in (word[:1], word[:2], word[:3])]:
+        start = time.perf_counter()
+        big.complete(prefix)
+        lookup.append((time.perf_counter() - start) * 1000)
+    print(f"  {len(words):,}-term vocabulary, 1-3 letter prefixes: "
+          f"p50 {statistics.median(lookup):6.3f} ms   p99 {percentile(lookup, 99):6.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Whole-word concept matching benchmark.
+Compares the substring ConceptMatcher (pyahocorasick automaton when
+installed, and the trie regex) with TokenConceptMatcher:
+
+  * precision and recall on a small hand-labeled sample of transcript-style
+    sentences, including words that merely contain a short keyword
+  * how many chunk→concept hits each reports on a synthetic corpus
+  * extract_ict_concepts wall time on that corpus
+
+    python benchmarks/bench_token_matcher.py --chunks 20000 200000
+"""
+
+import argparse
+import time
+
+from synthetic import make_chunks
+import extract_ict_wisdom
+from extract_ict_wisdom import ConceptMatcher, TokenConceptMatcher, extract_ict_concepts
+
+# (sentence, concepts it is about), labeled by hand
+LABELED = [
+    ("Take a note of where the quote was when the vote came out", set()),
+    ("I promote patience, remote trading is not a devotion", set()),
+    ("The dollar index is the first thing I check", set()),
+    ("Our draw on liquidity is the old high, that's the DOL", {'draw_on_liquidity', 'liquidity'}),
+    ("Don't be afraid of the braid in price", set()),
+    ("They raid the stops above the equal highs", {'raid', 'liquidity'}),
+    ("It's a hassle to trade through the news", set()),
+    ("Sell side liquidity, SSL, rests below the lows", {'liquidity'}),
+    ("My boss at the firm never understood it", set()),
+    ("We had a clean BOS to the upside", {'market_structure'}),
+    ("That's a strange move, arrange your levels beforehand", set()),
+    ("Price consolidates in a range before expansion", {'consolidation', 'expansion'}),
+    ("The fiber optic cable moves the data", set()),
+    ("Draw your fib from the swing high to the swing low", {'fibonacci', 'swing_points'}),
+    ("He was the idol of every trader in the room", set()),
+    ("AMD is accumulation manipulation distribution", {
+        'amd', 'power_of_three', 'accumulation', 'manipulation', 'distribution'}),
+    ("I entered on the OTE between the .62 and .79 levels", {'optimal_trade_entry'}),
+    ("The price was 0.625 and then 1.795", set()),
+    ("Look for bearish order blocks after the breaker", {'order_blocks', 'breaker_blocks'}),
+    ("Fair value gaps get filled in the New York open", {'fair_value_gaps', 'new_york_session'}),
+    ("Buy-side liquidity was taken during the London open", {'liquidity', 'london_session'}),
+    ("The silver bullet setup in the killzone", {'silver_bullet', 'killzones'}),
+    ("A Judas swing at midnight sets up the day", {'judas_swing', 'midnight_open'}),
+    ("The algorithms reprice to premium arrays", {'algorithmically_delivered', 'premium_discount'}),
+    ("I was discounted from the mentorship fee", {'ict_mentorship'}),
+    ("Macro times like 9:50 to 10:10", {'macro_time'}),
+    ("The pivotal moment of the session", set()),
+    ("Use the pivots as support", {'pivot_points'}),
+    ("Institutional order flow points higher", {'institutional_order_flow'}),
+    ("Breakers and mitigation blocks are different", {'breaker_blocks', 'mitigation_blocks'}),
+    ("A unicorn is a breaker overlapping a fair value gap", {
+        'unicorn_model', 'breaker_blocks', 'fair_value_gaps'}),
+    ("The 2022 model uses displacement and an FVG", {'model_2022', 'displacement', 'fair_value_gaps'}),
+    ("He is a devoted student of the market structure", {'market_structure'}),
+    ("Stop runs happen before the real move", {'stop_hunt'}),
+    ("The coach stops runs when it rains", set()),
+    ("The turtle soup raid on the Asian range", {'turtle_soup', 'raid', 'asian_session', 'consolidation'}),
+    ("Central bank dealer range, CBDR, is small today", {'cbdr', 'consolidation'}),
+    ("The NWOG and NDOG are reference points", {'nwog', 'ndog', 'new_week_opening_gap', 'new_day_opening_gap'}),
+    ("Equilibrium is the 50% of the dealing range", {'equilibrium', 'consolidation'}),
+    ("He ordered blocks of wood for his workshop", set()),
+    ("The judas is in the open", {'judas_swing'}),
+    ("Juda was a common name in those days", set()),
+    ("Price ran the equal highs before the open", {'liquidity'}),
+]
+
+
+def score(matcher):
+    """Micro-averaged (precision, recall) over the labeled (sentence, concept) pairs."""
+    tp = fp = fn = 0
+    for sentence, gold in LABELED:
+        found = matcher.match(sentence)
+        tp += len(found & gold)
+        fp += len(found - gold)
+        fn += len(gold - found)
+    return tp / max(1, tp + fp), tp / max(1, tp + fn)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--chunks', type=int, nargs='+', default=[20_000, 200_000])
+    args = parser.parse_args()
+
+    matchers = {}
+    if extract_ict_wisdom.ahocorasick is not None:
+        matchers['substring (automaton)'] = ConceptMatcher()
+    automaton, extract_ict_wisdom.ahocorasick = extract_ict_wisdom.ahocorasick, None
+    matchers['substring (regex)'] = ConceptMatcher()
+    extract_ict_wisdom.ahocorasick = automaton
+    matchers['token'] = TokenConceptMatcher()
+
+    print(f"Labeled sample: {len(LABELED)} sentences, "
+          f"{sum(len(gold) for _, gold in LABELED)} concept labels")
+    for name, matcher in matchers.items():
+        precision, recall = score(matcher)
+        print(f"  {name:<22} precision {precision:6.1%}  recall {recall:6.1%}")
+
+    for n in args.chunks:
+        chunks = make_chunks(n)
+        print(f"{n:,} synthetic chunks")
+        for name, matcher in matchers.items():
+            start = time.perf_counter()
+            stats = extract_ict_concepts(chunks, matcher)
+            seconds = time.perf_counter() - start
+            mentions = sum(s['total_mentions'] for s in stats.values())
+            print(f"  {name:<22} {seconds:7.2f}s  {mentions:>9,} concept hits")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+In-memory stand-in for the supabase client.
+Implements the table().select().gt().order().range()/limit().execute() chain
+used by extract_ict_wisdom.py and counts requests, rows and JSON bytes sent.
+"""
+
+import json
+import random
+import threading
+import time
+
+
+class TransientError(ConnectionError):
+    """Injected request failure (e.g. a dropped connection or a 503)."""
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class FakeQuery:
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.columns = None
+        self.want_count = False
+        self.filters = []
+        self.order_by = None
+        self.start = 0
+        self.stop = None
+
+    def select(self, columns='*', count=None):
+        self.columns = None if columns.strip() == '*' else [c.strip() for c in columns.split(',')]
+        self.want_count = count == 'exact'
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row[column] > value)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row[column] >= value)
+        return self
+
+    def lte(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row[column] <= value)
+        return self
+
+    def order(self, column, desc=False):
+        self.order_by = (column, desc)
+        return self
+
+    def range(self, start, end):
+        self.start, self.stop = start, end + 1
+        return self
+
+    def limit(self, n):
+        self.stop = self.start + n
+        return self
+
+    def execute(self):
+        return self.client._execute(self)
+
+
+class FakeSupabase:
+    """Serves rows from memory.
+
+    ``latency`` seconds are added per request, plus ``offset_cost`` seconds
+    per row skipped by an OFFSET (as the database has to walk past them).
+    A ``failure_rate`` fraction of requests raise TransientError after the
+    latency. ``max_rows`` caps every response like PostgREST's db-max-rows. ``on_request`` is called before each request, e.g. to mutate
+    the table. Safe to call from several threads.
+    """
+
+    def __init__(self, rows, table='ict_chunks', latency=0.0, offset_cost=0.0, on_request=None,
+                 failure_rate=0.0, seed=0, max_rows=None):
+        self.tables = {table: rows}
+        self.max_rows = max_rows
+        self.latency = latency
+        self.offset_cost = offset_cost
+        self.on_request = on_request
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.requests = 0
+        self.failures = 0
+        self.rows_sent = 0
+        self.bytes_sent = 0
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def _execute(self, query):
+        if self.on_request:
+            self.on_request(self, query)
+        if self.latency or self.offset_cost:
+            time.sleep(self.latency + self.offset_cost * query.start)
+        with self._lock:
+            if self.failure_rate and self._rng.random() < self.failure_rate:
+                self.failures += 1
+                raise TransientError("injected failure")
+
+        rows = [row for row in self.tables[query.table] if all(f(row) for f in query.filters)]
+        if query.order_by:
+            column, desc = query.order_by
+            rows.sort(key=lambda row: row[column], reverse=desc)
+        count = len(rows) if query.want_count else None
+        rows = rows[query.start:query.stop]
+        if self.max_rows is not None:
+            rows = rows[:self.max_rows]
+        if query.columns:
+            rows = [{c: row.get(c) for c in query.columns} for row in rows]
+
+        size = len(json.dumps(rows))
+        with self._lock:
+            self.requests += 1
+            self.rows_sent += len(rows)
+            self.bytes_sent += size
+        return FakeResponse(rows, count)
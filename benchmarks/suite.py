@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite.
+Runs the extraction and search benchmarks that matter for regressions on a
+synthetic corpus shaped like the real one (776 transcripts of 27 chunks,
+ICT vocabulary from the concept keywords), with fixed seeds:
+
+  * fetch_all_chunks against a fake client adding per-request latency,
+    sequentially and with concurrent pages
+  * organize_by_source, extract_ict_concepts and the JSON export
+  * /search/{source} (lexical, vector, hybrid) and /search/batch served by
+    the in-process app under concurrent load, with the result cache off
+
+Each measurement is repeated and the median kept. Results are written as
+JSON (commit, machine, settings, every sample) so two commits can be
+compared; --compare exits non-zero when a metric got worse by more than
+--threshold.
+
+    python benchmarks/suite.py
+    python benchmarks/suite.py --compare benchmarks/results/<commit>.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from synthetic import REAL_CHUNKS_PER_TRANSCRIPT, REAL_TRANSCRIPTS, make_chunks, make_queries, synthetic_server
+from fake_supabase import FakeSupabase
+from extract_ict_wisdom import (TokenConceptMatcher, extract_ict_concepts, fetch_all_chunks, organize_by_source,
+                                write_export)
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+SEARCH_MODES = ('lexical', 'vector', 'hybrid')
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def timed(fn, repeat):
+    """Run ``fn`` ``repeat`` times; return (seconds per run, last return value)."""
+    samples, value = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            value = fn()
+        samples.append(time.perf_counter() - start)
+    return samples, value
+
+
+class Results:
+    def __init__(self):
+        self.metrics = {}
+
+    def add(self, name, samples, unit='s', higher_is_better=False):
+        self.metrics[name] = {
+            'value': round(statistics.median(samples), 6),
+            'unit': unit,
+            'higher_is_better': higher_is_better,
+            'samples': [round(s, 6) for s in samples],
+        }
+        print(f"  {name:<36} {self.metrics[name]['value']:>12,.4f} {unit}")
+
+
+def bench_extraction(results, chunks, args):
+    for concurrency in (1, args.fetch_concurrency):
+        client = FakeSupabase(chunks, latency=args.fetch_latency)
+        samples, _ = timed(lambda: fetch_all_chunks(client, concurrency=concurrency, total=len(chunks)),
+                           args.repeat)
+        results.add(f'fetch_all_chunks.concurrency_{concurrency}', samples)
+
+    samples, transcripts = timed(lambda: organize_by_source(chunks), args.repeat)
+    results.add('organize_by_source', samples)
+
+    samples, concept_stats = timed(lambda: extract_ict_concepts(chunks, TokenConceptMatcher()), args.repeat)
+    results.add('extract_ict_concepts', samples)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'ict_wisdom.json')
+        info = {'total_chunks': len(chunks), 'source': 'synthetic'}
+        samples, _ = timed(lambda: write_export(path, info, concept_stats, transcripts.items()), args.repeat)
+        results.add('json_export', samples)
+        results.add('json_export.size', [os.path.getsize(path) / 1e6], unit='MB')
+
+
+async def load(client, requests, concurrency):
+    """Send (method, url, body) requests with ``concurrency`` in flight; return (latencies, wall seconds)."""
+    latencies, pending = [], iter(requests)
+
+    async def worker():
+        for method, url, body in pending:
+            start = time.perf_counter()
+            response = await client.request(method, url, params=body if method == 'GET' else None,
+                                            json=body if method == 'POST' else None)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                raise RuntimeError(f"{url}: {response.status_code} {response.text[:200]}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start
+
+
+async def bench_search(results, server, args):
+    import httpx
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        server.load_engines()
+    queries = make_queries(args.queries)
+    async with httpx.AsyncClient(app=server.app, base_url='http://testserver', timeout=60) as client:
+        workloads = {f'search.{mode}': [('GET', '/search/ict', {'query': q, 'limit': 10, 'mode': mode})
+                                        for q in queries] for mode in SEARCH_MODES}
+        batches = [queries[i:i + 16] for i in range(0, len(queries), 16)]
+        workloads['search.batch16'] = [('POST', '/search/batch', [{'query': q} for q in batch]) for batch in batches]
+
+        await load(client, workloads['search.lexical'][:20], 1)  # warm up
+        for name, requests in workloads.items():
+            runs = [await load(client, requests, args.concurrency) for _ in range(args.repeat)]
+            results.add(f'{name}.p50', [statistics.median(run) * 1000 for run, _ in runs], unit='ms')
+            results.add(f'{name}.p99', [sorted(run)[int(len(run) * 0.99)] * 1000 for run, _ in runs], unit='ms')
+            results.add(f'{name}.throughput', [len(run) / wall for run, wall in runs], unit='req/s',
+                        higher_is_better=True)
+
+
+def compare(old, new, threshold):
+    """Print metric changes between two result files; return the names that regressed."""
+    print(f"\nComparing {old.get('commit')} → {new.get('commit')} (threshold {threshold:.0%})")
+    regressed = []
+    for name, metric in new['metrics'].items():
+        before = old['metrics'].get(name)
+        if before is None or not before['value']:
+            continue
+        change = (metric['value'] - before['value']) / before['value']
+        worse = -change if metric['higher_is_better'] else change
+        flag = ''
+        if worse > threshold:
+            flag = '  ⚠️ regression'
+            regressed.append(name)
+        elif worse < -threshold:
+            flag = '  ✅ improvement'
+        print(f"  {name:<36} {before['value']:>12,.4f} → {metric['value']:>12,.4f} {metric['unit']:<6} "
+              f"{change:+7.1%}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--transcripts', type=int, default=REAL_TRANSCRIPTS)
+    parser.add_argument('--chunks-per-transcript', type=int, default=REAL_CHUNKS_PER_TRANSCRIPT)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--fetch-latency', type=float, default=0.05, help="seconds added per fake request")
+    parser.add_argument('--fetch-concurrency', type=int, default=4)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8, help="search requests in flight")
+    parser.add_argument('--only', choices=['extraction', 'search'])
+    parser.add_argument('--output', help="results file (default benchmarks/results/<commit>.json)")
+    parser.add_argument('--compare', help="earlier results file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.15, help="relative change counted as a regression")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    chunks = make_chunks(args.transcripts * args.chunks_per_transcript, args.chunks_per_transcript)
+    print(f"{len(chunks):,} chunks in {args.transcripts} transcripts, commit {commit}, "
+          f"{os.cpu_count()} CPU(s), median of {args.repeat}")
+    results = Results()
+
+    if args.only != 'search':
+        bench_extraction(results, chunks, args)
+
+    if args.only != 'extraction':
+        os.environ.update(QUERY_CACHE_SIZE='0', RELOAD_INTERVAL='0', SLOW_QUERY_MS='0')
+        with synthetic_server({'ict': chunks}) as server:
+            asyncio.run(bench_search(results, server, args))
+
+    report = {
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'cpus': os.cpu_count()},
+        'settings': vars(args),
+        'metrics': results.metrics,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit or 'results'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results → {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressed = compare(json.load(f), report, args.threshold)
+        if regressed:
+            print(f"⚠️ {len(regressed)} metric(s) regressed: {', '.join(regressed)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Synthetic Cortex corpus for benchmarks.
+Generates chunk rows shaped like the `ict_chunks` table, with ICT vocabulary
+sprinkled through filler transcript speech, and serves them from the app.
+"""
+
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+import extract_ict_wisdom  # noqa: E402
+from extract_ict_wisdom import (CONCEPT_KEYWORDS, build_search_index, build_vector_store,  # noqa: E402
+                                organize_by_source, write_export)
+import cortex.artifacts  # noqa: E402
+from cortex.corpus import corpus_from_transcripts  # noqa: E402
+from fake_supabase import FakeSupabase  # noqa: E402
+
+FILLER = (
+    "so what we're going to do today is look at how price action moves when "
+    "the market opens and i want you to pay attention to where the old highs "
+    "and lows are sitting because that is where the stops are resting and "
+    "the algorithm is going to reach for them before it runs in the other "
+    "direction you see this every single week if you just sit on your hands "
+    "and wait for the setup to come to you instead of forcing trades"
+).split()
+
+PHRASES = [kw for kws in CONCEPT_KEYWORDS.values() for kw in kws]
+
+# Concepts a transcript keeps coming back to; real episodes are topical
+TOPIC_CONCEPTS = 4
+
+# Shape of the real ict_chunks table: 776 transcripts of about 27 chunks each
+REAL_TRANSCRIPTS = 776
+REAL_CHUNKS_PER_TRANSCRIPT = 27
+
+
+def make_topic(rng):
+    """Return the keyword phrases of a few concepts for one transcript."""
+    concepts = rng.sample(list(CONCEPT_KEYWORDS), TOPIC_CONCEPTS)
+    return [kw for concept in concepts for kw in CONCEPT_KEYWORDS[concept]]
+
+
+def make_chunk_text(rng, topic=None, words=180, keyword_rate=0.03):
+    """Return one chunk of transcript-like text."""
+    out = rng.choices(FILLER, k=words)
+    for _ in range(round(words * keyword_rate)):
+        out[rng.randrange(words)] = rng.choice(topic if topic and rng.random() < 0.8 else PHRASES)
+    return ' '.join(out)
+
+
+def iter_chunks(n, chunks_per_source=27, seed=0):
+    """Yield ``n`` synthetic chunk rows ordered by id, without holding them all."""
+    rng = random.Random(seed)
+    for i in range(n):
+        if i % chunks_per_source == 0:
+            topic = make_topic(rng)
+        yield {
+            'id': i + 1,
+            'content': make_chunk_text(rng, topic),
+            'chunk_index': i % chunks_per_source,
+            'source_transcript': f"ICT Mentorship Episode {i // chunks_per_source + 1:04d}",
+        }
+
+
+def make_chunks(n, chunks_per_source=27, seed=0):
+    """Return ``n`` synthetic chunk rows ordered by id."""
+    return list(iter_chunks(n, chunks_per_source, seed))
+
+
+def make_queries(n, seed=1):
+    """Return ``n`` short queries: a concept phrase plus a few filler words."""
+    rng = random.Random(seed)
+    return [' '.join([rng.choice(PHRASES)] + rng.sample(FILLER, rng.randint(0, 3))) for _ in range(n)]
+
+
+def extract_source(name, chunks, **client_options):
+    """Run the extractor for source ``name`` against a fake client serving ``chunks`` as '<name>_chunks'."""
+    table = f'{name}_chunks'
+    client = FakeSupabase(chunks, table=table, **client_options)
+    extract_ict_wisdom.run_extraction(client, extract_ict_wisdom.parse_args(['--table', table, '--name', name]))
+
+
+def build_source(name, chunks, vectors=True, **vector_options):
+    """Write ``chunks`` as source ``name``'s <name>_wisdom.json export plus BM25 (and vector) artifacts."""
+    transcripts = organize_by_source(chunks)
+    write_export(f'{name}_wisdom.json', {'total_chunks': len(chunks), 'source': 'synthetic'}, {},
+                 transcripts.items())
+    corpus = corpus_from_transcripts(transcripts, name)
+    build_search_index(corpus.name, corpus.contents)
+    if vectors:
+        build_vector_store(corpus.name, corpus.ids, corpus.contents, **vector_options)
+
+
+@contextlib.contextmanager
+def synthetic_server(sources, extract=False, vectors=True, **vector_options):
+    """Serve ``{name: chunks}`` from a temporary directory and yield the imported ``main`` module.
+
+    Each source's export and artifacts are built directly (``build_source``)
+    or, with ``extract``, by running the extractor (``extract_source``). The
+    directory is the working directory while the context is open, so relative
+    paths land in it. main reads its settings when imported: set any other
+    environment variables before entering.
+    """
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            cortex.artifacts.DATA_DIR = os.path.join(tmp, 'cortex_data')
+            paths = {name: os.path.join(tmp, f'{name}_wisdom.json') for name in ('ict', 'vanessa', *sources)}
+            os.environ.update(ICT_CORPUS=paths.pop('ict'), VANESSA_CORPUS=paths.pop('vanessa'),
+                              CORTEX_CORPORA=','.join(f'{name}={path}' for name, path in paths.items()))
+            with contextlib.redirect_stdout(io.StringIO()):
+                for name, chunks in sources.items():
+                    if extract:
+                        extract_source(name, chunks)
+                    else:
+                        build_source(name, chunks, vectors, **vector_options)
+                import main
+            yield main
+        finally:
+            os.chdir(cwd)
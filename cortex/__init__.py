@@ -0,0 +1,4 @@
+"""
+The Cortex search engine
+Local, in-process retrieval over the corpus exported by extract_ict_wisdom.py.
+"""
@@ -0,0 +1,127 @@
+"""
+Approximate nearest neighbours
+IVF index over a VectorStore: a spherical k-means coarse quantizer assigns
+every row to one of ``nlist`` inverted lists, and a query scores only the
+rows in its ``nprobe`` closest lists. The index keeps its own copy of the
+vectors grouped by list, so each probed list is one contiguous slice.
+"""
+
+import math
+import os
+
+import numpy as np
+
+from cortex.vectors import save_array, top_k
+
+IVF_FILE = 'ivf.npz'
+IVF_VECTORS_FILE = 'ivf_vectors.npy'
+
+# Lists probed by IVFIndex.search when the caller does not say. Engines never
+# rely on it: they search exactly unless a request passes its own nprobe, as
+# on the synthetic corpus recall@10 at 200k rows is 0.63 at nprobe 32 and
+# still only 0.76 at 128 (benchmarks/bench_ann.py)
+DEFAULT_NPROBE = 32
+
+# Rows assigned to centroids per matrix product while training
+ASSIGN_BLOCK_ROWS = 16384
+
+
+def _assign(matrix, centroids):
+    """Return the closest centroid (by cosine) for every row."""
+    labels = np.empty(matrix.shape[0], dtype=np.int32)
+    for start in range(0, matrix.shape[0], ASSIGN_BLOCK_ROWS):
+        block = matrix[start:start + ASSIGN_BLOCK_ROWS]
+        labels[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return labels
+
+
+def spherical_kmeans(matrix, k, iterations=20, seed=0):
+    """Cluster unit vectors into ``k`` groups; returns (centroids, labels)."""
+    rng = np.random.default_rng(seed)
+    data = np.asarray(matrix, dtype=np.float32)
+    n = data.shape[0]
+    centroids = data[np.sort(rng.choice(n, size=k, replace=False))].copy()
+
+    labels = _assign(data, centroids)
+    for _ in range(iterations):
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, data)
+        norms = np.linalg.norm(sums, axis=1)
+        empty = norms == 0
+        # Re-seed empty lists from random rows so every list stays in use
+        if empty.any():
+            sums[empty] = data[rng.choice(n, size=int(empty.sum()), replace=False)]
+            norms[empty] = np.linalg.norm(sums[empty], axis=1)
+            norms[norms == 0] = 1.0
+        centroids = sums / norms[:, None]
+
+        new_labels = _assign(data, centroids)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+
+    return centroids.astype(np.float32), labels
+
+
+class IVFIndex:
+    """Inverted lists of row ids keyed by their nearest centroid."""
+
+    def __init__(self, centroids, list_offsets, list_rows, list_vectors, nprobe=DEFAULT_NPROBE):
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_rows = list_rows
+        self.list_vectors = list_vectors
+        self.nprobe = nprobe
+
+    @classmethod
+    def build(cls, matrix, nlist=None, iterations=20, seed=0, nprobe=DEFAULT_NPROBE):
+        """Train the coarse quantizer on ``matrix`` and bucket every row."""
+        n = matrix.shape[0]
+        nlist = min(n, nlist or max(1, int(4 * math.sqrt(n))))
+        centroids, labels = spherical_kmeans(matrix, nlist, iterations, seed)
+
+        order = np.argsort(labels, kind='stable').astype(np.int32)
+        counts = np.bincount(labels, minlength=nlist)
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        list_vectors = np.ascontiguousarray(np.asarray(matrix, dtype=np.float32)[order])
+        return cls(centroids, offsets, order, list_vectors, nprobe)
+
+    def save(self, path):
+        """Write the quantizer to ``path`` and the grouped vectors beside it."""
+        save_array(os.path.join(os.path.dirname(path), IVF_VECTORS_FILE), self.list_vectors)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, centroids=self.centroids, list_offsets=self.list_offsets,
+                     list_rows=self.list_rows, nprobe=np.int64(self.nprobe))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load an index; the grouped vectors are memory-mapped."""
+        list_vectors = np.load(os.path.join(os.path.dirname(path), IVF_VECTORS_FILE), mmap_mode='r')
+        with np.load(path) as data:
+            return cls(data['centroids'], data['list_offsets'], data['list_rows'],
+                       list_vectors, int(data['nprobe']))
+
+    @property
+    def nlist(self):
+        return self.centroids.shape[0]
+
+    def __len__(self):
+        return len(self.list_rows)
+
+    def probe(self, query_vector, nprobe=None):
+        """Ids of the ``nprobe`` lists whose centroids are closest to the query."""
+        nprobe = min(self.nlist, nprobe or self.nprobe)
+        if nprobe >= self.nlist:
+            return np.arange(self.nlist)
+        return np.argpartition(-(self.centroids @ query_vector), nprobe - 1)[:nprobe]
+
+    def search(self, query_vector, limit=10, nprobe=None):
+        """Return approximate top ``limit`` (row, similarity) pairs."""
+        q = np.asarray(query_vector, dtype=np.float32)
+        offsets = self.list_offsets
+        spans = [(offsets[i], offsets[i + 1]) for i in self.probe(q, nprobe)]
+        scores = np.concatenate([self.list_vectors[a:b] @ q for a, b in spans])
+        positions = np.concatenate([np.arange(a, b) for a, b in spans])
+        return [(int(self.list_rows[positions[i]]), score) for i, score in top_k(scores, limit)]
@@ -0,0 +1,59 @@
+"""
+Index artifacts
+Where the extractor writes, and the server looks for, prebuilt per-source
+search artifacts, and the manifest that versions each complete set.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+# Root directory for prebuilt artifacts, one subdirectory per source
+DATA_DIR = os.environ.get("CORTEX_DATA", "cortex_data")
+
+BM25_FILE = 'bm25.idx'
+
+# Version of a source's artifact set and the size of each file in it
+MANIFEST_FILE = 'manifest.json'
+
+
+def source_dir(source, data_dir=None):
+    """Return the artifact directory for ``source``."""
+    return os.path.join(data_dir or DATA_DIR, source)
+
+
+def artifact_path(source, filename, data_dir=None):
+    """Return the path of one artifact file for ``source``."""
+    return os.path.join(source_dir(source, data_dir), filename)
+
+
+def write_manifest(source, filenames, data_dir=None, **info):
+    """Record the version of ``source``'s artifacts; written last, after every file it lists.
+
+    Servers poll the manifest to hot-reload, and only load a version once
+    every listed file has its recorded size.
+    """
+    files = {}
+    for filename in filenames:
+        path = artifact_path(source, filename, data_dir)
+        if os.path.exists(path):
+            files[filename] = os.path.getsize(path)
+    stamp = datetime.now(timezone.utc)
+    digest = hashlib.sha1(json.dumps(files, sort_keys=True).encode()).hexdigest()[:8]
+    manifest = dict(info, version=f"{stamp:%Y%m%dT%H%M%S%f}-{digest}", created=stamp.isoformat(), files=files)
+    path = artifact_path(source, MANIFEST_FILE, data_dir)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+    return manifest
+
+
+def read_manifest(source, data_dir=None):
+    """Return ``source``'s artifact manifest, or None."""
+    path = artifact_path(source, MANIFEST_FILE, data_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
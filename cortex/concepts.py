@@ -0,0 +1,128 @@
+"""
+ICT concepts
+The concept vocabulary shared by the extractor (concept analysis) and the
+server (search suggestions), and the concept → chunk index the extractor
+persists so searches can be restricted to chunks mentioning a concept.
+"""
+
+import os
+
+import numpy as np
+
+CONCEPT_INDEX_FILE = 'concepts.npz'
+
+# Keywords mapping for each ICT concept
+CONCEPT_KEYWORDS = {
+    'power_of_three': ['power of three', 'po3', 'accumulation manipulation distribution'],
+    'order_blocks': ['order block', 'bullish order block', 'bearish order block'],
+    'fair_value_gaps': ['fair value gap', 'fvg', 'imbalance'],
+    'liquidity': ['liquidity', 'buy side liquidity', 'sell side liquidity', 'bsl', 'ssl', 'equal highs', 'equal lows'],
+    'market_structure': ['market structure', 'bos', 'break of structure', 'choch', 'change of character'],
+    'optimal_trade_entry': ['optimal trade entry', 'ote', '.62', '.705', '.79'],
+    'silver_bullet': ['silver bullet'],
+    'judas_swing': ['judas swing', 'judas'],
+    'turtle_soup': ['turtle soup'],
+    'breaker_blocks': ['breaker block', 'breaker'],
+    'mitigation_blocks': ['mitigation block', 'mitigation'],
+    'killzones': ['killzone', 'kill zone'],
+    'asian_session': ['asian session', 'asian range'],
+    'london_session': ['london session', 'london open', 'london close'],
+    'new_york_session': ['new york session', 'ny session', 'new york open'],
+    'midnight_open': ['midnight open', 'midnight'],
+    'true_day': ['true day'],
+    'weekly_profiles': ['weekly profile', 'weekly range'],
+    'monthly_profiles': ['monthly profile', 'monthly range'],
+    'quarterly_shifts': ['quarterly shift'],
+    'institutional_order_flow': ['institutional order flow', 'institutional'],
+    'smart_money': ['smart money'],
+    'displacement': ['displacement'],
+    'imbalance': ['imbalance'],
+    'inefficiency': ['inefficiency'],
+    'premium_discount': ['premium', 'discount'],
+    'equilibrium': ['equilibrium'],
+    'swing_points': ['swing high', 'swing low'],
+    'pivot_points': ['pivot'],
+    'time_and_price': ['time and price'],
+    'fibonacci': ['fibonacci', 'fib'],
+    'pd_arrays': ['pd array'],
+    'draw_on_liquidity': ['draw on liquidity', 'dol'],
+    'raid': ['raid', 'liquidity raid'],
+    'stop_hunt': ['stop hunt', 'stop run'],
+    'manipulation': ['manipulation'],
+    'accumulation': ['accumulation'],
+    'distribution': ['distribution'],
+    'expansion': ['expansion'],
+    'retracement': ['retracement'],
+    'consolidation': ['consolidation', 'range'],
+    'propulsion_block': ['propulsion block'],
+    'rejection_block': ['rejection block'],
+    'volume_imbalance': ['volume imbalance'],
+    'opening_range_gap': ['opening range gap'],
+    'new_week_opening_gap': ['new week opening gap', 'nwog'],
+    'new_day_opening_gap': ['new day opening gap', 'ndog'],
+    'consequent_encroachment': ['consequent encroachment'],
+    'model_2022': ['2022 model', 'model 2022'],
+    'unicorn_model': ['unicorn'],
+    'ict_mentorship': ['mentorship'],
+    'amd': ['amd'],
+    'cbdr': ['cbdr', 'central bank dealer range'],
+    'nwog': ['nwog'],
+    'ndog': ['ndog'],
+    'macro_time': ['macro', ':50', ':10'],
+    'algorithmically_delivered': ['algorithm', 'algorithmically'],
+    'seek_and_destroy': ['seek and destroy'],
+    'standard_deviation': ['standard deviation'],
+}
+
+
+def write_concept_index(path, concept_chunks):
+    """Persist {concept: [chunk id, ...]} as one sorted int64 id array per concept."""
+    names = list(concept_chunks)
+    arrays = [np.unique(np.asarray(concept_chunks[name], dtype=np.int64)) for name in names]
+    offsets = np.concatenate([[0], np.cumsum([len(a) for a in arrays], dtype=np.int64)]).astype(np.int64)
+    chunk_ids = np.concatenate(arrays) if arrays else np.empty(0, dtype=np.int64)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        np.savez(f, concepts=np.array(names, dtype=str), offsets=offsets, chunk_ids=chunk_ids)
+    os.replace(tmp, path)
+
+
+class ConceptIndex:
+    """The chunks mentioning each concept, as sorted doc positions in one corpus."""
+
+    def __init__(self, names, offsets, chunk_ids, corpus_ids):
+        ids = np.asarray(corpus_ids, dtype=np.int64)
+        order = np.argsort(ids, kind='stable')
+        at = np.searchsorted(ids[order], chunk_ids)
+        found = at < len(ids)
+        found[found] = ids[order[at[found]]] == chunk_ids[found]
+        docs = np.full(len(chunk_ids), -1, dtype=np.int64)
+        docs[found] = order[at[found]]
+        # Ids the extractor saw that are not in this corpus
+        self.missing = int(len(chunk_ids) - found.sum())
+
+        self.names = [str(name) for name in names]
+        self._rows = {}
+        for i, name in enumerate(self.names):
+            span = docs[offsets[i]:offsets[i + 1]]
+            self._rows[name] = np.sort(span[span >= 0])
+
+    @classmethod
+    def load(cls, path, corpus_ids):
+        """Load an index written by ``write_concept_index`` for a corpus's ids."""
+        with np.load(path) as data:
+            return cls(data['concepts'], data['offsets'], data['chunk_ids'], corpus_ids)
+
+    def __contains__(self, name):
+        return name in self._rows
+
+    def counts(self):
+        """Number of chunks mentioning each concept."""
+        return {name: len(self._rows[name]) for name in self.names}
+
+    def rows(self, concepts):
+        """Sorted doc positions of chunks that mention every one of ``concepts``."""
+        rows = None
+        for name in concepts:
+            rows = self._rows[name] if rows is None else np.intersect1d(rows, self._rows[name], assume_unique=True)
+        return rows
@@ -0,0 +1,190 @@
+"""
+Corpus loading
+Flattens the per-transcript export of extract_ict_wisdom.py into parallel
+columns so indexes can refer to chunks by their position (doc id).
+
+The extractor also writes the same columns as one binary file (corpus.bin):
+a UTF-8 text blob sliced by offsets, int64 ids and chunk indexes, int32
+source ids into a string table. Servers memory-map it and decode a chunk's
+text only when a result needs it, instead of parsing the JSON export.
+"""
+
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+CORPUS_FILE = 'corpus.bin'
+CORPUS_MAGIC = b'CXCORP\x01\n'
+
+# Preamble after the magic: header offset and length
+_PREAMBLE = struct.Struct('<QQ')
+
+# chunk_index value stored for chunks that have none
+NULL_CHUNK_INDEX = -2 ** 63
+
+
+class Corpus:
+    """Chunks in export order: by transcript, then by chunk_index."""
+
+    def __init__(self, name, ids, contents, sources, chunk_indexes):
+        self.name = name
+        self.ids = ids
+        self.contents = contents
+        self.sources = sources
+        self.chunk_indexes = chunk_indexes
+
+    def __len__(self):
+        return len(self.contents)
+
+    def result(self, doc, similarity):
+        """Return the search result dict for one chunk."""
+        return {
+            'content': self.contents[doc],
+            'source_transcript': self.sources[doc],
+            'similarity': round(float(similarity), 4),
+            'chunk_id': self.ids[doc],
+            'chunk_index': self.chunk_indexes[doc],
+        }
+
+
+def corpus_from_transcripts(transcripts, name):
+    """Flatten organize_by_source() output into a Corpus."""
+    ids, contents, sources, chunk_indexes = [], [], [], []
+    for source, transcript in transcripts.items():
+        for chunk in transcript.get('chunks', []):
+            ids.append(chunk.get('id'))
+            contents.append(chunk.get('content') or '')
+            sources.append(source)
+            chunk_indexes.append(chunk.get('chunk_index'))
+
+    return Corpus(name, ids, contents, sources, chunk_indexes)
+
+
+def load_corpus(path, name=None):
+    """Load an ict_wisdom.json style export into a Corpus."""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+
+    return corpus_from_transcripts(data.get('transcripts', {}), name or path)
+
+
+def write_corpus(path, rows):
+    """Write (id, source, chunk_index, content) rows, in doc order, to a corpus.bin file.
+
+    Text is streamed to the file as rows arrive; only the small per-chunk
+    columns are held until the end.
+    """
+    ids, offsets, source_ids, chunk_indexes = [], [0], [], []
+    source_table = {}
+
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(CORPUS_MAGIC)
+        f.write(_PREAMBLE.pack(0, 0))
+        text_start = f.tell()
+        for chunk_id, source, chunk_index, content in rows:
+            f.write((content or '').encode('utf-8'))
+            ids.append(chunk_id)
+            offsets.append(f.tell() - text_start)
+            source_ids.append(source_table.setdefault(source, len(source_table)))
+            chunk_indexes.append(NULL_CHUNK_INDEX if chunk_index is None else chunk_index)
+
+        columns = {}
+        for name, values, dtype in (
+            ('ids', ids, '<i8'),
+            ('offsets', offsets, '<i8'),
+            ('chunk_indexes', chunk_indexes, '<i8'),
+            ('source_ids', source_ids, '<i4'),
+        ):
+            f.write(b'\0' * (-f.tell() % 8))
+            columns[name] = [f.tell(), len(values), dtype]
+            f.write(np.asarray(values, dtype=dtype).tobytes())
+
+        header = json.dumps({
+            'count': len(ids),
+            'text_start': text_start,
+            'columns': columns,
+            'sources': list(source_table),
+        }, ensure_ascii=False).encode('utf-8')
+        header_offset = f.tell()
+        f.write(header)
+        f.seek(len(CORPUS_MAGIC))
+        f.write(_PREAMBLE.pack(header_offset, len(header)))
+    os.replace(tmp, path)
+
+
+class TextColumn:
+    """Chunk texts decoded on demand from a memory-mapped UTF-8 blob."""
+
+    def __init__(self, buffer, start, offsets):
+        self.buffer = buffer
+        self.start = start
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, doc):
+        begin = self.start + int(self.offsets[doc])
+        end = self.start + int(self.offsets[doc + 1])
+        return self.buffer[begin:end].decode('utf-8')
+
+    def __iter__(self):
+        return (self[doc] for doc in range(len(self)))
+
+
+class SourceColumn:
+    """Per-chunk source names looked up through the string table."""
+
+    def __init__(self, source_ids, names):
+        self.source_ids = source_ids
+        self.names = names
+
+    def __len__(self):
+        return len(self.source_ids)
+
+    def __getitem__(self, doc):
+        return self.names[self.source_ids[doc]]
+
+    def __iter__(self):
+        return (self.names[i] for i in self.source_ids)
+
+
+class MappedCorpus(Corpus):
+    """A Corpus backed by a memory-mapped corpus.bin file."""
+
+    def result(self, doc, similarity):
+        chunk_index = int(self.chunk_indexes[doc])
+        return {
+            'content': self.contents[doc],
+            'source_transcript': self.sources[doc],
+            'similarity': round(float(similarity), 4),
+            'chunk_id': int(self.ids[doc]),
+            'chunk_index': None if chunk_index == NULL_CHUNK_INDEX else chunk_index,
+        }
+
+
+def open_corpus(path, name=None):
+    """Memory-map a corpus.bin file written by ``write_corpus``."""
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if buffer[:len(CORPUS_MAGIC)] != CORPUS_MAGIC:
+        raise ValueError(f"{path} is not a corpus file")
+    header_offset, header_len = _PREAMBLE.unpack_from(buffer, len(CORPUS_MAGIC))
+    header = json.loads(buffer[header_offset:header_offset + header_len].decode('utf-8'))
+
+    columns = {
+        column: np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+        for column, (offset, count, dtype) in header['columns'].items()
+    }
+    return MappedCorpus(
+        name or path,
+        columns['ids'],
+        TextColumn(buffer, header['text_start'], columns['offsets']),
+        SourceColumn(columns['source_ids'], header['sources']),
+        columns['chunk_indexes'],
+    )
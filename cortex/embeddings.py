@@ -0,0 +1,81 @@
+"""
+Embedders
+Turn text into unit-length float32 vectors. The hashing embedder is
+deterministic and dependency-free (used by default and in benchmarks);
+sentence-transformers models plug in when that package is installed.
+"""
+
+import functools
+import math
+import zlib
+from collections import Counter
+
+import numpy as np
+
+from cortex.lexical import tokenize
+
+DEFAULT_EMBEDDER = 'hashing:256'
+
+# Hashed features remembered; bounded because query features never stop arriving
+BUCKET_CACHE_SIZE = 1 << 16
+
+
+@functools.lru_cache(maxsize=BUCKET_CACHE_SIZE)
+def _bucket(feature, dim):
+    """(column, sign) a feature hashes to."""
+    h = zlib.crc32(feature.encode('utf-8'))
+    return h % dim, -1.0 if h & 0x80000000 else 1.0
+
+
+class HashingEmbedder:
+    """Signed feature hashing of unigrams and bigrams into ``dim`` buckets."""
+
+    def __init__(self, dim=256):
+        self.dim = dim
+        self.name = f'hashing:{dim}'
+
+    def embed(self, texts):
+        """Return a (len(texts), dim) float32 matrix of unit vectors."""
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            features = Counter(tokens)
+            features.update(f'{a} {b}' for a, b in zip(tokens, tokens[1:]))
+            vec = out[row]
+            for feature, count in features.items():
+                col, sign = _bucket(feature, self.dim)
+                vec[col] += sign * (1.0 + math.log(count))
+        return normalize(out)
+
+
+class SentenceTransformerEmbedder:
+    """Local sentence-transformers model (optional dependency)."""
+
+    def __init__(self, model_name):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f'sentence-transformers:{model_name}'
+
+    def embed(self, texts):
+        vectors = self.model.encode(list(texts), batch_size=64, convert_to_numpy=True)
+        return normalize(vectors.astype(np.float32))
+
+
+def normalize(matrix):
+    """L2-normalise rows in place (zero rows stay zero)."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+def get_embedder(spec=None):
+    """Return an embedder from a spec like 'hashing:256' or 'sentence-transformers:<model>'."""
+    kind, _, arg = (spec or DEFAULT_EMBEDDER).partition(':')
+    if kind == 'hashing':
+        return HashingEmbedder(int(arg) if arg else 256)
+    if kind == 'sentence-transformers':
+        return SentenceTransformerEmbedder(arg)
+    raise ValueError(f"Unknown embedder '{spec}'")
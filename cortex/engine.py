@@ -0,0 +1,308 @@
+"""
+Search engine
+Bundles one source's corpus with its indexes and answers queries against them.
+"""
+
+import hashlib
+import os
+import time
+
+import numpy as np
+
+from cortex.ann import IVF_FILE, IVFIndex
+from cortex.artifacts import BM25_FILE, MANIFEST_FILE, artifact_path, read_manifest, source_dir
+from cortex.concepts import CONCEPT_INDEX_FILE, ConceptIndex
+from cortex.corpus import CORPUS_FILE, load_corpus, open_corpus
+from cortex.embeddings import get_embedder
+from cortex.hybrid import RRF_K, get_reranker, reciprocal_rank_fusion
+from cortex.lexical import BM25Index
+from cortex.suggest import SuggestIndex
+from cortex.vectors import META_FILE, VectorStore
+
+SEARCH_MODES = ('lexical', 'vector', 'hybrid')
+
+# Candidates each index contributes to a hybrid search (and the re-rank depth)
+HYBRID_CANDIDATES = 100
+
+
+class StageTimer:
+    """Adds the milliseconds spent in each stage to a ``timings`` dict (if given)."""
+
+    def __init__(self, timings):
+        self.timings = timings
+        self.last = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        if self.timings is not None:
+            key = f'{stage}_ms'
+            self.timings[key] = round(self.timings.get(key, 0.0) + (now - self.last) * 1000, 3)
+        self.last = now
+
+
+class SearchEngine:
+    """Everything needed to search one source."""
+
+    def __init__(self, name, corpus, lexical, vectors=None, embedder=None, ann=None, concepts=None,
+                 reranker=None, version=None):
+        self.name = name
+        self.version = version
+        self.corpus = corpus
+        self.lexical = lexical
+        self.vectors = vectors
+        self.embedder = embedder
+        self.ann = ann
+        self.concepts = concepts
+        self.reranker = reranker or get_reranker()
+        self.suggestions = SuggestIndex.build(lexical)
+
+    @property
+    def modes(self):
+        """Search modes this source's artifacts support."""
+        return SEARCH_MODES if self.vectors is not None else ('lexical',)
+
+    @property
+    def default_mode(self):
+        return 'hybrid' if self.vectors is not None else 'lexical'
+
+    def check_concepts(self, concepts):
+        """Raise ValueError unless every one of ``concepts`` can be filtered on."""
+        if concepts and self.concepts is None:
+            raise ValueError(f"'{self.name}' has no concept index")
+        unknown = [name for name in concepts or () if name not in self.concepts]
+        if unknown:
+            raise ValueError(f"Unknown concept(s) for '{self.name}': {', '.join(unknown)}")
+
+    def concept_rows(self, concepts):
+        """Sorted doc ids of chunks mentioning all ``concepts`` (None when unfiltered)."""
+        if not concepts:
+            return None
+        self.check_concepts(concepts)
+        return self.concepts.rows(concepts)
+
+    def use_ann(self, nprobe=None, exact=False):
+        """Whether vector search goes through the IVF index.
+
+        Only when the request picks an ``nprobe``: no fixed default keeps
+        recall close to exact search across corpus sizes.
+        """
+        return self.ann is not None and not exact and nprobe is not None
+
+    def vector_search(self, query_vector, limit=10, nprobe=None, exact=False, rows=None):
+        """Top (doc, cosine) pairs, through the IVF index when ``use_ann`` says so.
+
+        A ``rows`` filter is scored exactly; it is already a fraction of the
+        corpus. A zero query vector (nothing left to embed) matches nothing.
+        """
+        if not np.any(query_vector):
+            return []
+        if rows is not None:
+            return self.vectors.search(query_vector, limit, rows=rows)
+        if self.use_ann(nprobe, exact):
+            return self.ann.search(query_vector, limit, nprobe)
+        return self.vectors.search(query_vector, limit)
+
+    def vector_search_batch(self, query_vectors, limits, nprobe=None, exact=False, rows=None):
+        """``vector_search`` for several queries; exact searches share one matrix-matrix product."""
+        if self.use_ann(nprobe, exact) and rows is None:
+            batch_hits = [self.ann.search(q, limit, nprobe) for q, limit in zip(query_vectors, limits)]
+        else:
+            batch_hits = self.vectors.search_batch(query_vectors, limits, rows)
+        return [hits if np.any(q) else [] for q, hits in zip(query_vectors, batch_hits)]
+
+    def hybrid_search(self, query, query_vector, limit=10, candidates=HYBRID_CANDIDATES, rerank=False,
+                      nprobe=None, exact=False, rows=None, timings=None, vector_hits=None, lexical_hits=None):
+        """Top (doc, score) pairs from both indexes, fused by reciprocal rank.
+
+        Each index contributes its top ``candidates`` (at least ``limit``),
+        which bounds the work whatever the corpus size; ``vector_hits`` may be passed in when the
+        vector stage already ran (for a whole batch), and ``lexical_hits``
+        when the lexical one did (in a staged search). With ``rerank`` the
+        best ``candidates`` of the fused list are re-scored by the engine's
+        reranker.
+        """
+        candidates = max(candidates or HYBRID_CANDIDATES, limit)
+        timer = StageTimer(timings)
+        if lexical_hits is None:
+            lexical_hits = self.lexical.search(query, candidates, rows)
+            timer.lap('lexical')
+        if vector_hits is None:
+            vector_hits = self.vector_search(query_vector, candidates, nprobe, exact, rows)
+            timer.lap('vector')
+        fused = reciprocal_rank_fusion([lexical_hits, vector_hits], RRF_K)[:candidates]
+        timer.lap('fusion')
+        if rerank and fused:
+            fused = self.reranker.rerank(self, query, query_vector, [doc for doc, _ in fused])
+            timer.lap('rerank')
+        return fused[:limit]
+
+    def search(self, query, limit=10, explain=False, mode=None, nprobe=None, exact=False, concepts=None,
+               candidates=HYBRID_CANDIDATES, rerank=False, timings=None):
+        """Return result dicts for the top ``limit`` chunks."""
+        return self.search_batch([query], [limit], explain, mode, nprobe, exact, concepts,
+                                 candidates, rerank, timings)[0]
+
+    def search_batch(self, queries, limits, explain=False, mode=None, nprobe=None, exact=False, concepts=None,
+                     candidates=HYBRID_CANDIDATES, rerank=False, timings=None):
+        """Return one result list per query, in order.
+
+        In vector and hybrid modes all queries are embedded in one call and,
+        for exact search, scored with a single matrix-matrix product; hybrid
+        then fuses each query's candidates with its lexical hits. ``concepts``
+        restricts every query to chunks that mention all of them; the
+        candidate set is intersected before anything is scored. Milliseconds
+        per stage are added to ``timings`` when a dict is passed.
+        """
+        mode = mode or self.default_mode
+        timer = StageTimer(timings)
+        rows = self.concept_rows(concepts)
+        if rows is not None and not len(rows):
+            return [[] for _ in queries]
+        if mode in ('vector', 'hybrid'):
+            query_vectors = self.embedder.embed(list(queries))
+            timer.lap('embed')
+        if mode == 'hybrid':
+            candidates = candidates or HYBRID_CANDIDATES
+            vector_batch = self.vector_search_batch(query_vectors, [max(candidates, limit) for limit in limits],
+                                                    nprobe, exact, rows)
+            timer.lap('vector')
+            batch_hits = [self.hybrid_search(query, q, limit, candidates, rerank, nprobe, exact, rows, timings,
+                                             vector_hits)
+                          for query, q, limit, vector_hits in zip(queries, query_vectors, limits, vector_batch)]
+            timer = StageTimer(timings)
+        elif mode == 'vector':
+            batch_hits = self.vector_search_batch(query_vectors, limits, nprobe, exact, rows)
+            batch_hits = [[(doc, max(score, 0.0)) for doc, score in hits] for hits in batch_hits]
+            timer.lap('vector')
+        else:
+            batch_hits = [self.lexical.search(query, limit, rows) for query, limit in zip(queries, limits)]
+            timer.lap('lexical')
+
+        batch_results = []
+        for query, hits in zip(queries, batch_hits):
+            results = []
+            for doc, similarity in hits:
+                result = self.corpus.result(doc, similarity)
+                if explain:
+                    result['explain'] = self.lexical.explain(query, doc)
+                results.append(result)
+            batch_results.append(results)
+        timer.lap('results')
+        return batch_results
+
+    def staged_search(self, query, limit=10, nprobe=None, candidates=HYBRID_CANDIDATES, rerank=False,
+                      concepts=None):
+        """Yield (stage, results) as ranking progresses.
+
+        The lexical pass comes first. When the source has vectors, its
+        candidates are fused with the nearest vectors by ``hybrid_search``
+        (re-ranked by the engine's reranker with ``rerank``) and yielded as
+        the 'hybrid' stage, which replaces the first and is what ``search``
+        returns in hybrid mode.
+        """
+        rows = self.concept_rows(concepts)
+        if rows is not None and not len(rows):
+            yield 'lexical', []
+            return
+        candidates = max(candidates or HYBRID_CANDIDATES, limit)
+        lexical_hits = self.lexical.search(query, candidates, rows)
+        yield 'lexical', [self.corpus.result(doc, similarity) for doc, similarity in lexical_hits[:limit]]
+        if self.vectors is None:
+            return
+
+        query_vector = self.embedder.embed([query])[0]
+        hits = self.hybrid_search(query, query_vector, limit, candidates, rerank, nprobe, rows=rows,
+                                  lexical_hits=lexical_hits)
+        yield 'hybrid', [self.corpus.result(doc, score) for doc, score in hits]
+
+
+def corpus_available(name, corpus_path, data_dir=None):
+    """Whether a source has a JSON export or a columnar corpus to serve."""
+    return os.path.exists(corpus_path) or os.path.exists(artifact_path(name, CORPUS_FILE, data_dir))
+
+
+def artifact_version(name, corpus_path, data_dir=None):
+    """Version of the artifacts a load would serve now, or None while they are incomplete.
+
+    That is the manifest's version once every file it lists has its recorded
+    size; without a manifest, a fingerprint of the export's and artifact
+    files' sizes and modification times.
+    """
+    manifest = read_manifest(name, data_dir)
+    if manifest is not None:
+        for filename, size in manifest['files'].items():
+            path = artifact_path(name, filename, data_dir)
+            if not os.path.exists(path) or os.path.getsize(path) != size:
+                return None
+        return manifest['version']
+
+    paths = [corpus_path]
+    directory = source_dir(name, data_dir)
+    if os.path.isdir(directory):
+        paths += sorted(os.path.join(directory, f) for f in os.listdir(directory)
+                        if f != MANIFEST_FILE and not f.endswith('.tmp'))
+    stats = [(path, os.stat(path)) for path in paths if os.path.isfile(path)]
+    if not stats:
+        return None
+    fingerprint = ';'.join(f'{path}:{st.st_size}:{st.st_mtime_ns}' for path, st in stats)
+    return 'files-' + hashlib.sha1(fingerprint.encode()).hexdigest()[:12]
+
+
+def _load_corpus(name, corpus_path, data_dir=None, version=None):
+    """Memory-map the columnar corpus when it is part of the complete artifact set ``version``.
+
+    That is when the manifest lists corpus.bin and every listed file is in
+    place (or there is no JSON export to parse instead). File times are not
+    compared: a fresh clone or copy gives every file a new one.
+    """
+    mapped_path = artifact_path(name, CORPUS_FILE, data_dir)
+    if os.path.exists(mapped_path):
+        if not os.path.exists(corpus_path):
+            return open_corpus(mapped_path, name)
+        manifest = read_manifest(name, data_dir)
+        if manifest is not None and CORPUS_FILE in manifest['files'] and manifest['version'] == version:
+            return open_corpus(mapped_path, name)
+        print(f"⚠️ {mapped_path} is not in a complete artifact manifest; parsing the JSON export")
+    return load_corpus(corpus_path, name)
+
+
+def load_engine(name, corpus_path, data_dir=None, reranker=None):
+    """Load a source's corpus and its prebuilt index (building it if missing)."""
+    version = artifact_version(name, corpus_path, data_dir)
+    corpus = _load_corpus(name, corpus_path, data_dir, version)
+
+    lexical = None
+    index_path = artifact_path(name, BM25_FILE, data_dir)
+    if os.path.exists(index_path):
+        lexical = BM25Index.load(index_path)
+        if len(lexical) != len(corpus):
+            print(f"⚠️ {index_path} covers {len(lexical):,} chunks, corpus has {len(corpus):,}; rebuilding")
+            lexical = None
+    if lexical is None:
+        lexical = BM25Index.build(corpus.contents)
+
+    vectors, embedder, ann = None, None, None
+    vector_dir = source_dir(name, data_dir)
+    if os.path.exists(os.path.join(vector_dir, META_FILE)):
+        vectors = VectorStore.open(vector_dir)
+        if not np.array_equal(vectors.ids, np.asarray(corpus.ids, dtype=np.int64)):
+            print(f"⚠️ Vectors in {vector_dir} do not match the corpus; vector search disabled")
+            vectors = None
+        else:
+            embedder = get_embedder(vectors.embedder)
+
+    ivf_path = artifact_path(name, IVF_FILE, data_dir)
+    if vectors is not None and os.path.exists(ivf_path):
+        ann = IVFIndex.load(ivf_path)
+        if len(ann) != len(vectors):
+            print(f"⚠️ {ivf_path} covers {len(ann):,} rows, vectors have {len(vectors):,}; using exact search")
+            ann = None
+
+    concepts = None
+    concept_path = artifact_path(name, CONCEPT_INDEX_FILE, data_dir)
+    if os.path.exists(concept_path):
+        concepts = ConceptIndex.load(concept_path, corpus.ids)
+        if concepts.missing:
+            print(f"⚠️ {concept_path} lists {concepts.missing:,} chunk ids the corpus does not have")
+
+    return SearchEngine(name, corpus, lexical, vectors, embedder, ann, concepts, reranker, version)
@@ -0,0 +1,56 @@
+"""
+Federated search
+Merges the ranked result lists of several sources into one top-k list.
+Lists are only merged on scores every source computes on one scale: lexical
+similarity (BM25 over the best score the query could reach in that source),
+cosine similarity from a shared embedder, or a reranker's score. A
+hybrid fusion score is not one of them: each source's best hit scores 1.0
+however weakly it matches, so hybrid lists are fused once, over the merged
+lexical and vector lists of every source, instead of merged.
+"""
+
+import heapq
+
+from cortex.hybrid import RRF_K, reciprocal_rank_fusion
+
+
+def merge_top_k(ranked, limit):
+    """Merge ``{source: results}`` (each best first) into the overall top ``limit``.
+
+    Results are copied with their source name (``corpus``) added; a heap
+    holds one head per source, so only ``limit`` results are visited past
+    the heads. Ties go to source order.
+    """
+    heap = [(-results[0]['similarity'], order, 0, source)
+            for order, (source, results) in enumerate(ranked.items()) if results]
+    heapq.heapify(heap)
+
+    merged = []
+    while heap and len(merged) < limit:
+        _, order, i, source = heapq.heappop(heap)
+        results = ranked[source]
+        merged.append(dict(results[i], corpus=source))
+        if i + 1 < len(results):
+            heapq.heappush(heap, (-results[i + 1]['similarity'], order, i + 1, source))
+    return merged
+
+
+def fuse_top_k(rankings, limit, candidates, k=RRF_K):
+    """Fuse several ``{source: results}`` rankings (lexical and vector) into the top ``limit``.
+
+    Each ranking is merged across sources into its best ``candidates``
+    first, so ranks count over every source, then the merged lists are
+    fused by reciprocal rank as one engine's hybrid search fuses its own.
+    The fused score replaces each result's similarity.
+    """
+    found = {}
+    lists = []
+    for ranked in rankings:
+        keyed = []
+        for result in merge_top_k(ranked, candidates):
+            key = (result['corpus'], result['chunk_id'])
+            found.setdefault(key, result)
+            keyed.append((key, result['similarity']))
+        lists.append(keyed)
+    return [dict(found[key], similarity=round(score, 4))
+            for key, score in reciprocal_rank_fusion(lists, k)[:limit]]
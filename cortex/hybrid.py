@@ -0,0 +1,75 @@
+"""
+Hybrid retrieval
+Fuses the lexical and vector candidate lists with reciprocal rank fusion,
+and re-rankers that re-score the fused candidates with more information
+than either first stage had.
+"""
+
+import numpy as np
+
+# Damping constant of reciprocal rank fusion (the usual choice)
+RRF_K = 60
+
+DEFAULT_RERANKER = 'blend:0.5'
+
+
+def reciprocal_rank_fusion(rankings, k=RRF_K):
+    """Fuse ranked (doc, score) lists into one (doc, score) list, best first.
+
+    A document scores the sum of 1 / (k + rank) over the lists it appears
+    in, divided by the best possible sum (first in every list), so fused
+    scores are in (0, 1]. Ties keep the order documents were first seen.
+    """
+    fused = {}
+    for ranking in rankings:
+        for rank, (doc, _) in enumerate(ranking, 1):
+            fused[doc] = fused.get(doc, 0.0) + 1.0 / (k + rank)
+    best = len(rankings) / (k + 1.0)
+    return sorted(((doc, score / best) for doc, score in fused.items()), key=lambda item: -item[1])
+
+
+class BlendReranker:
+    """Weighted sum of exact BM25 similarity and cosine similarity.
+
+    Both are computed for every candidate, including those only one first
+    stage found, and with exact vectors even when candidates came from the
+    IVF index.
+    """
+
+    def __init__(self, weight=0.5):
+        self.weight = weight
+        self.name = f'blend:{weight}'
+
+    def rerank(self, engine, query, query_vector, docs):
+        rows = np.sort(np.asarray(docs, dtype=np.int64))
+        lexical = dict(engine.lexical.search(query, len(rows), rows))
+        cosine = np.maximum(engine.vectors.scores(query_vector, rows), 0.0)
+        scores = self.weight * cosine + (1.0 - self.weight) * np.array([lexical.get(int(doc), 0.0) for doc in rows])
+        order = np.argsort(-scores, kind='stable')
+        return [(int(rows[i]), float(scores[i])) for i in order]
+
+
+class CrossEncoderReranker:
+    """sentence-transformers CrossEncoder over (query, chunk) pairs (optional dependency)."""
+
+    def __init__(self, model_name):
+        from sentence_transformers import CrossEncoder
+
+        self.model = CrossEncoder(model_name)
+        self.name = f'cross-encoder:{model_name}'
+
+    def rerank(self, engine, query, query_vector, docs):
+        logits = self.model.predict([(query, engine.corpus.contents[doc]) for doc in docs])
+        scores = 1.0 / (1.0 + np.exp(-np.asarray(logits, dtype=np.float64)))
+        order = np.argsort(-scores, kind='stable')
+        return [(int(docs[i]), float(scores[i])) for i in order]
+
+
+def get_reranker(spec=None):
+    """Return a reranker from a spec like 'blend:0.5' or 'cross-encoder:<model>'."""
+    kind, _, arg = (spec or DEFAULT_RERANKER).partition(':')
+    if kind == 'blend':
+        return BlendReranker(float(arg) if arg else 0.5)
+    if kind == 'cross-encoder':
+        return CrossEncoderReranker(arg)
+    raise ValueError(f"Unknown reranker '{spec}'")
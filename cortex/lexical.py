@@ -0,0 +1,256 @@
+"""
+Lexical index
+Inverted index with BM25 ranking. Postings for all terms live in two flat
+arrays (doc ids and term frequencies) sliced by per-term offsets, and the
+whole index round-trips through a single binary file so servers load it
+instead of re-tokenizing the corpus on every boot.
+"""
+
+import json
+import math
+import os
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+import numpy as np
+
+# Words plus ICT number jargon such as ".705" or ":50"
+TOKEN_RE = re.compile(r"[a-z0-9]+|[.:]\d+")
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by can do for from going gonna had has have he
+i if in into is it its just like me my of on or our so that the their them
+then there these they this to was we were what when where which will with
+you your
+""".split())
+
+INDEX_MAGIC = b'CXBM25\x01\n'
+
+
+def tokenize(text):
+    """Lowercase and split text into index terms, dropping stopwords."""
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _to_le(arr):
+    if sys.byteorder == 'big':
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _from_le(typecode, data):
+    arr = array(typecode)
+    arr.frombytes(data)
+    if sys.byteorder == 'big':
+        arr.byteswap()
+    return arr
+
+
+class BM25Index:
+    """BM25 search over documents addressed by position (doc id)."""
+
+    def __init__(self, terms, offsets, post_docs, post_tfs, doc_lengths, k1=1.2, b=0.75):
+        self.terms = terms
+        self.term_ids = {term: i for i, term in enumerate(terms)}
+        self.offsets = offsets
+        self.post_docs = post_docs
+        self.post_tfs = post_tfs
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+
+        n = len(doc_lengths)
+        self.avgdl = (sum(doc_lengths) / n) if n else 0.0
+        # Length normalisation term of the BM25 denominator, per document
+        lengths = np.frombuffer(doc_lengths, dtype=np.uint32).astype(np.float64)
+        norms = (k1 * (1.0 - b + b * lengths / self.avgdl) if self.avgdl
+                 else np.full(n, k1)).astype(np.float32)
+        # The query-independent part of every posting's BM25 score,
+        # tf * (k1 + 1) / (tf + norm), computed in place
+        docs = np.frombuffer(post_docs, dtype=np.uint32)
+        impacts = np.frombuffer(post_tfs, dtype=np.uint16).astype(np.float64)
+        denominators = norms[docs].astype(np.float64)
+        denominators += impacts
+        impacts *= k1 + 1.0
+        impacts /= denominators
+        del denominators
+        self._impacts = array('f')
+        self._impacts.frombytes(memoryview(impacts.astype(np.float32)).cast('B'))
+        del impacts
+        # Zero-copy NumPy views of the postings for vectorised scoring
+        self._docs_np = docs
+        self._impacts_np = np.frombuffer(self._impacts, dtype=np.float32)
+
+    @classmethod
+    def build(cls, texts, k1=1.2, b=0.75):
+        """Tokenize ``texts`` and build an index over them.
+
+        Each term's postings grow in a pair of typed arrays (6 bytes a
+        posting) rather than a list of tuples, then are concatenated.
+        """
+        postings = {}
+        doc_lengths = array('I')
+        for doc, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                term_postings = postings.get(term)
+                if term_postings is None:
+                    term_postings = postings[term] = (array('I'), array('H'))
+                term_postings[0].append(doc)
+                term_postings[1].append(min(tf, 0xFFFF))
+
+        terms = sorted(postings)
+        offsets = array('I', [0])
+        post_docs = array('I')
+        post_tfs = array('H')
+        for term in terms:
+            docs, tfs = postings.pop(term)
+            post_docs.extend(docs)
+            post_tfs.extend(tfs)
+            offsets.append(len(post_docs))
+
+        return cls(terms, offsets, post_docs, post_tfs, doc_lengths, k1, b)
+
+    def save(self, path):
+        """Write the index to a single binary file."""
+        header = json.dumps({
+            'n_docs': len(self.doc_lengths),
+            'n_postings': len(self.post_docs),
+            'k1': self.k1,
+            'b': self.b,
+            'terms': self.terms,
+        }, ensure_ascii=False).encode('utf-8')
+
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(INDEX_MAGIC)
+            f.write(struct.pack('<Q', len(header)))
+            f.write(header)
+            for arr in (self.doc_lengths, self.offsets, self.post_docs, self.post_tfs):
+                f.write(_to_le(arr))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load an index written by ``save``."""
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        if not data.startswith(INDEX_MAGIC):
+            raise ValueError(f"{path} is not a BM25 index file")
+        pos = len(INDEX_MAGIC)
+        (header_len,) = struct.unpack_from('<Q', data, pos)
+        pos += 8
+        header = json.loads(data[pos:pos + header_len].decode('utf-8'))
+        pos += header_len
+
+        arrays = []
+        for typecode, count in (
+            ('I', header['n_docs']),
+            ('I', len(header['terms']) + 1),
+            ('I', header['n_postings']),
+            ('H', header['n_postings']),
+        ):
+            size = array(typecode).itemsize * count
+            arrays.append(_from_le(typecode, data[pos:pos + size]))
+            pos += size
+
+        doc_lengths, offsets, post_docs, post_tfs = arrays
+        return cls(header['terms'], offsets, post_docs, post_tfs, doc_lengths,
+                   header['k1'], header['b'])
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def _span(self, term):
+        i = self.term_ids[term]
+        return self.offsets[i], self.offsets[i + 1]
+
+    def _postings(self, term):
+        start, end = self._span(term)
+        return self.post_docs[start:end], self.post_tfs[start:end]
+
+    def idf(self, df):
+        """BM25 inverse document frequency (always positive)."""
+        n = len(self.doc_lengths)
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query, limit=10, rows=None):
+        """Return the top ``limit`` (doc, similarity) pairs for ``query``.
+
+        Each query term's postings are added into a dense score vector (doc
+        ids are unique within a posting list, so this is one vectorised add
+        per term), and argpartition picks the top ``limit``. Similarity is the
+        BM25 score divided by the best score any document could reach for
+        this query, so it is in [0, 1).
+
+        With ``rows`` (sorted doc ids) only those documents are scored: each
+        posting list is intersected with them by binary search, probing the
+        shorter of the two, so the cost follows the filter, not the corpus.
+        """
+        qtf = Counter(t for t in tokenize(query) if t in self.term_ids)
+        if not qtf or limit <= 0:
+            return []
+
+        scores = np.zeros(len(self.doc_lengths) if rows is None else len(rows))
+        ceiling = 0.0
+        for term, count in qtf.items():
+            start, end = self._span(term)
+            weight = self.idf(end - start) * count
+            ceiling += weight * (self.k1 + 1.0)
+            docs = self._docs_np[start:end]
+            impacts = self._impacts_np[start:end].astype(np.float64)
+            if rows is None:
+                scores[docs] += weight * impacts
+            elif len(rows) < len(docs):
+                at = np.minimum(np.searchsorted(docs, rows), len(docs) - 1)
+                hit = docs[at] == rows
+                scores[hit] += weight * impacts[at[hit]]
+            elif len(rows):
+                at = np.minimum(np.searchsorted(rows, docs), len(rows) - 1)
+                hit = rows[at] == docs
+                scores[at[hit]] += weight * impacts[hit]
+
+        matched = np.flatnonzero(scores)
+        if len(matched) > limit:
+            matched = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+        top = matched[np.argsort(-scores[matched], kind='stable')]
+        docs = top if rows is None else rows[top]
+        return [(int(doc), float(score) / ceiling) for doc, score in zip(docs, scores[top])]
+
+    def term_stats(self, term):
+        """Return document/collection frequency and idf for one term."""
+        if term not in self.term_ids:
+            return {'term': term, 'df': 0, 'cf': 0, 'idf': None}
+        docs, tfs = self._postings(term)
+        return {'term': term, 'df': len(docs), 'cf': sum(tfs), 'idf': round(self.idf(len(docs)), 4)}
+
+    def explain(self, query, doc):
+        """Break a document's BM25 score for ``query`` down by term."""
+        terms = []
+        total = 0.0
+        for term, count in Counter(tokenize(query)).items():
+            stats = self.term_stats(term)
+            tf = 0
+            contribution = 0.0
+            if stats['df']:
+                start, end = self._span(term)
+                i = bisect_left(self.post_docs, doc, start, end)
+                if i < end and self.post_docs[i] == doc:
+                    tf = self.post_tfs[i]
+                    contribution = count * self.idf(stats['df']) * self._impacts[i]
+            total += contribution
+            terms.append(dict(stats, tf=tf, query_count=count, contribution=round(contribution, 4)))
+
+        return {
+            'score': round(total, 4),
+            'doc_length': self.doc_lengths[doc],
+            'avg_doc_length': round(self.avgdl, 2),
+            'terms': terms,
+        }
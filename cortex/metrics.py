@@ -0,0 +1,191 @@
+"""
+Metrics
+Request and search-stage latency histograms, counters and scrape-time gauges
+rendered in the Prometheus text exposition format, an ASGI middleware that
+times every request by route, and a log of slow queries.
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+# Upper bounds (seconds) of latency histogram buckets
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _labels(names, values):
+    if not names:
+        return ''
+    pairs = (f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return '{' + ','.join(pairs) + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic count per label combination."""
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self._lock:
+            values = sorted(self._values.items())
+        lines += [f'{self.name}{_labels(self.labelnames, key)} {_number(value)}' for key, value in values]
+        return lines
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label combination."""
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((key, (list(counts), total, n)) for key, (counts, total, n) in self._series.items())
+        for key, (counts, total, n) in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = _labels(self.labelnames + ('le',), key + (_number(bound),))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_number(total)}')
+            lines.append(f'{self.name}_count{labels} {n}')
+        return lines
+
+
+def sampled(name, help, samples, labelnames=(), kind='gauge'):
+    """Render a gauge (or a counter kept elsewhere) from ``{labelvalues: value}`` read at scrape time."""
+    lines = [f'# HELP {name} {help}', f'# TYPE {name} {kind}']
+    lines += [f'{name}{_labels(labelnames, key)} {_number(value)}'
+              for key, value in sorted(samples.items()) if value is not None]
+    return lines
+
+
+def render(*families):
+    """Join rendered metric families into one exposition body."""
+    return '\n'.join(line for family in families for line in family) + '\n'
+
+
+def process_memory():
+    """Resident and virtual memory of this process in bytes (None where unavailable)."""
+    try:
+        with open('/proc/self/statm') as f:
+            size, resident = (int(n) for n in f.read().split()[:2])
+        page = os.sysconf('SC_PAGE_SIZE')
+        return {'resident': resident * page, 'virtual': size * page}
+    except (OSError, ValueError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return {'resident': None, 'virtual': None}
+    # Peak rather than current resident size: kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {'resident': peak if os.uname().sysname == 'Darwin' else peak * 1024, 'virtual': None}
+
+
+class RequestMetrics:
+    """ASGI middleware timing every HTTP request by route template and status.
+
+    The request's start time is left in ``scope['state']['started']`` so
+    handlers can report how long parsing took before they ran; handlers may
+    leave a ``slow_query`` dict there for the slow-query log.
+    """
+
+    def __init__(self, app, duration, requests, slow_log=None):
+        self.app = app
+        self.duration = duration
+        self.requests = requests
+        self.slow_log = slow_log
+        self._routes = None
+
+    def route_of(self, scope):
+        """The matched route's path template (e.g. '/search/{source}'), or 'unmatched'."""
+        if self._routes is None:
+            routes = getattr(scope.get('app'), 'routes', ())
+            self._routes = {getattr(route, 'endpoint', None) or getattr(route, 'app', None): route.path
+                            for route in routes}
+        return self._routes.get(scope.get('endpoint'), 'unmatched')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+        scope.setdefault('state', {})['started'] = started
+        status = [500]
+
+        async def send_status(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            seconds = time.perf_counter() - started
+            route = self.route_of(scope)
+            self.duration.observe(seconds, route)
+            self.requests.inc(route, str(status[0]))
+            details = scope['state'].get('slow_query')
+            if self.slow_log is not None and details is not None:
+                self.slow_log.record(seconds * 1000, route=route, status=status[0], **details)
+
+
+class SlowQueryLog:
+    """Appends a JSON line for every request slower than ``threshold_ms`` (0 disables)."""
+
+    def __init__(self, path, threshold_ms=0):
+        self.path = path
+        self.threshold_ms = threshold_ms
+        self.logged = 0
+        self._lock = threading.Lock()
+
+    def record(self, total_ms, **details):
+        if not self.threshold_ms or total_ms < self.threshold_ms:
+            return False
+        entry = dict(time=datetime.now(timezone.utc).isoformat(), total_ms=round(total_ms, 3), **details)
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+            self.logged += 1
+        return True
@@ -0,0 +1,49 @@
+"""
+Request coalescing
+Concurrent calls for the same key share one in-flight computation instead
+of each running it ("single flight"). Used by the async search endpoints so
+a burst of identical queries runs one search.
+"""
+
+import asyncio
+
+
+class SingleFlight:
+    """Coalesce concurrent awaits of the same key onto one task."""
+
+    def __init__(self):
+        self._flights = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn):
+        """Await ``fn()`` for ``key``, joining the running call if there is one.
+
+        The computation runs as its own task, so a caller that is cancelled
+        (e.g. its client disconnected) does not cancel it for the others.
+        """
+        task = self._flights.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._flights[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task):
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller went away
+            task.exception()
+
+    def stats(self):
+        calls = self.leaders + self.coalesced
+        return {
+            'in_flight': len(self._flights),
+            'executed': self.leaders,
+            'coalesced': self.coalesced,
+            'coalesced_rate': round(self.coalesced / calls, 4) if calls else None,
+        }
@@ -0,0 +1,109 @@
+"""
+Static responses
+Bodies that never change while the server runs (the HTML shell) are encoded
+once at import, precompressed with gzip and brotli (when installed), and
+served by Accept-Encoding with a strong ETag so repeat visits revalidate
+with an empty 304 instead of downloading the page again.
+"""
+
+import gzip
+import hashlib
+
+from starlette.responses import Response
+
+try:
+    import brotli  # optional: pip install brotli
+except ImportError:
+    brotli = None
+
+# Browsers may reuse the page but must revalidate it (a cheap 304) first
+CACHE_CONTROL = 'no-cache'
+
+# Content codings in order of preference when the client weighs them equally
+PREFERRED_ENCODINGS = ('br', 'gzip', 'identity')
+
+
+def parse_accept_encoding(header):
+    """Return {coding: q} from an Accept-Encoding header value."""
+    weights = {}
+    for item in (header or '').split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+    return weights
+
+
+def choose_encoding(header, available):
+    """Pick the content coding to send from ``available`` for an Accept-Encoding header."""
+    if not header:
+        return 'identity'
+    weights = parse_accept_encoding(header)
+    default = weights.get('*')
+
+    def weight(coding):
+        if coding in weights:
+            return weights[coding]
+        if default is not None:
+            return default
+        # identity is acceptable unless explicitly refused
+        return 1.0 if coding == 'identity' else 0.0
+
+    candidates = [(weight(c), -i, c) for i, c in enumerate(PREFERRED_ENCODINGS) if c in available]
+    q, _, coding = max(candidates)
+    return coding if q > 0 else 'identity'
+
+
+def etag_matches(header, etag):
+    """Weak comparison of an If-None-Match header against ``etag``."""
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    tags = [tag.strip() for tag in header.split(',')]
+    return any((tag[2:] if tag.startswith('W/') else tag) == etag for tag in tags)
+
+
+class StaticAsset:
+    """One immutable body with its precompressed variants."""
+
+    def __init__(self, body, media_type, cache_control=CACHE_CONTROL):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.media_type = media_type
+        self.cache_control = cache_control
+
+        digest = hashlib.sha256(body).hexdigest()[:20]
+        # Strong ETags must differ between content codings of the same resource
+        self.variants = {'identity': (body, f'"{digest}"')}
+        compressed = {'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            compressed['br'] = brotli.compress(body, quality=11)
+        for coding, data in compressed.items():
+            if len(data) < len(body):
+                self.variants[coding] = (data, f'"{digest}-{coding}"')
+
+    def response(self, headers):
+        """Build the response for a request's headers (200 or 304)."""
+        coding = choose_encoding(headers.get('accept-encoding'), self.variants)
+        body, etag = self.variants[coding]
+        response_headers = {
+            'ETag': etag,
+            'Cache-Control': self.cache_control,
+            'Vary': 'Accept-Encoding',
+        }
+        if coding != 'identity':
+            response_headers['Content-Encoding'] = coding
+
+        if etag_matches(headers.get('if-none-match'), etag):
+            return Response(status_code=304, headers=response_headers)
+        return Response(body, media_type=self.media_type, headers=response_headers)
@@ -0,0 +1,85 @@
+"""
+Search suggestions
+Prefix completion over a source's index vocabulary and the ICT concept
+phrases. Both live in sorted arrays, so a prefix is a bisect range and the
+best completions in it are picked by weight with argpartition.
+"""
+
+from bisect import bisect_left
+
+import numpy as np
+
+from cortex.concepts import CONCEPT_KEYWORDS
+from cortex.lexical import tokenize
+
+# Concept phrases rank above single vocabulary terms with the same prefix
+CONCEPT_BOOST = 1e9
+
+
+class PrefixIndex:
+    """Sorted keys with weights; completes prefixes by weight."""
+
+    def __init__(self, keys, weights, values=None):
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self.keys = [keys[i] for i in order]
+        self.weights = np.asarray(weights, dtype=np.float64)[order] if len(keys) else np.zeros(0)
+        self.values = [values[i] for i in order] if values is not None else None
+
+    def complete(self, prefix, limit=8):
+        """Return the ``limit`` heaviest (key, weight, value) entries starting with ``prefix``."""
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + '\uffff', lo)
+        if hi <= lo:
+            return []
+        weights = self.weights[lo:hi]
+        if hi - lo > limit:
+            top = np.argpartition(-weights, limit - 1)[:limit]
+        else:
+            top = np.arange(hi - lo)
+        top = top[np.argsort(-weights[top], kind='stable')]
+        return [(self.keys[lo + i], float(weights[i]), self.values[lo + i] if self.values else None)
+                for i in top]
+
+
+class SuggestIndex:
+    """Completions for a partly typed query."""
+
+    def __init__(self, terms, concepts):
+        self.terms = terms
+        self.concepts = concepts
+
+    @classmethod
+    def build(cls, lexical, concept_keywords=CONCEPT_KEYWORDS):
+        """Index a BM25 index's terms (weighted by document frequency) and concept phrases."""
+        offsets = np.frombuffer(lexical.offsets, dtype=np.uint32)
+        terms = PrefixIndex(list(lexical.terms), np.diff(offsets))
+
+        phrases, weights, names = [], [], []
+        for concept, keywords in concept_keywords.items():
+            for phrase in dict.fromkeys([concept.replace('_', ' ')] + list(keywords)):
+                # Rank phrases by how many chunks contain their rarest word
+                df = min((lexical.term_stats(t)['df'] for t in tokenize(phrase)), default=0)
+                phrases.append(phrase)
+                weights.append(CONCEPT_BOOST + df)
+                names.append(concept)
+        return cls(terms, PrefixIndex(phrases, weights, names))
+
+    def suggest(self, query, limit=8):
+        """Return up to ``limit`` suggestion dicts for ``query``."""
+        text = ' '.join(query.lower().split())
+        if not text:
+            return []
+
+        suggestions = {}
+        for phrase, _, concept in self.concepts.complete(text, limit):
+            suggestions.setdefault(phrase, {'text': phrase, 'kind': 'concept', 'concept': concept})
+
+        # Complete the last word against the vocabulary, keeping the words before it
+        head, _, last = text.rpartition(' ')
+        if last and len(suggestions) < limit:
+            for term, df, _ in self.terms.complete(last, limit):
+                completion = f"{head} {term}" if head else term
+                suggestions.setdefault(completion, {'text': completion, 'kind': 'term', 'df': int(df)})
+                if len(suggestions) >= limit:
+                    break
+        return list(suggestions.values())[:limit]
@@ -0,0 +1,168 @@
+"""
+Upstream proxy
+Forwards requests to the remote search backend through one shared
+keep-alive connection pool, with per-request timeouts, a circuit breaker
+that fails fast while the backend is down, and a cached health check.
+"""
+
+import time
+
+import httpx
+
+from cortex.singleflight import SingleFlight
+
+# Response headers passed back to the browser
+FORWARDED_HEADERS = ('content-type', 'cache-control', 'etag', 'last-modified')
+
+
+class CircuitBreaker:
+    """Closed → open after ``failure_threshold`` consecutive failures.
+
+    While open every call is refused until ``reset_timeout`` seconds have
+    passed; then one trial call is let through (half-open) and its outcome
+    closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self.rejected = 0
+
+    def allow(self):
+        """Whether a call may go to the upstream now."""
+        if self.state == 'closed':
+            return True
+        now = self.clock()
+        if now - self.opened_at >= self.reset_timeout:
+            # One trial call; another after reset_timeout if it never reports back
+            self.state = 'half_open'
+            self.opened_at = now
+            return True
+        self.rejected += 1
+        return False
+
+    def retry_after(self):
+        """Seconds until the next trial call is allowed."""
+        if self.state == 'closed':
+            return 0.0
+        return max(0.0, self.reset_timeout - (self.clock() - self.opened_at))
+
+    def record_success(self):
+        self.state = 'closed'
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == 'half_open' or self.failures >= self.failure_threshold:
+            self.state = 'open'
+            self.opened_at = self.clock()
+
+    def stats(self):
+        return {'state': self.state, 'failures': self.failures, 'rejected': self.rejected}
+
+
+class UpstreamError(Exception):
+    """The upstream could not be reached (or the circuit is open)."""
+
+    def __init__(self, status_code, detail, retry_after=None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class UpstreamProxy:
+    """Shared async client for one upstream base URL."""
+
+    def __init__(self, base_url, timeout=10.0, connect_timeout=3.0, max_connections=100,
+                 max_keepalive=50, breaker=None, health_path='/health', health_ttl=30.0):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive)
+        self.breaker = breaker or CircuitBreaker()
+        self.health_path = health_path
+        self.health_ttl = health_ttl
+        self.client = None
+        self._health = None
+        self._health_expires = 0.0
+        self._health_flights = SingleFlight()
+        self.requests = 0
+        self.health_checks = 0
+
+    async def start(self, transport=None):
+        """Open the connection pool (call from the app's startup)."""
+        self.client = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout,
+                                        limits=self.limits, transport=transport)
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def get(self, path, params=None):
+        """GET ``path`` from the upstream; raise UpstreamError if it cannot be reached.
+
+        Timeouts, connection errors and 5xx responses count against the
+        circuit breaker.
+        """
+        if self.client is None:
+            raise UpstreamError(503, "Upstream proxy is not started")
+        if not self.breaker.allow():
+            raise UpstreamError(503, "Upstream unavailable (circuit open)",
+                                retry_after=self.breaker.retry_after())
+
+        self.requests += 1
+        try:
+            response = await self.client.get('/' + path.lstrip('/'), params=params)
+        except httpx.TimeoutException:
+            self.breaker.record_failure()
+            raise UpstreamError(504, "Upstream timed out")
+        except httpx.HTTPError as e:
+            self.breaker.record_failure()
+            raise UpstreamError(502, f"Upstream unreachable: {type(e).__name__}")
+
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    async def health(self):
+        """Upstream health, checked at most once per ``health_ttl`` seconds."""
+        if self._health is not None and time.monotonic() < self._health_expires:
+            return self._health
+        return await self._health_flights.do('health', self._check_health)
+
+    async def _check_health(self):
+        self.health_checks += 1
+        started = time.perf_counter()
+        try:
+            response = await self.get(self.health_path)
+            status = 'healthy' if response.status_code < 400 else 'degraded'
+            detail = {'status_code': response.status_code}
+        except UpstreamError as e:
+            status = 'offline'
+            detail = {'error': e.detail}
+
+        self._health = dict(
+            detail,
+            status=status,
+            upstream=self.base_url,
+            latency_ms=round((time.perf_counter() - started) * 1000, 1),
+            checked_at=time.time(),
+            circuit=self.breaker.state,
+        )
+        self._health_expires = time.monotonic() + self.health_ttl
+        return self._health
+
+    def stats(self):
+        return {
+            'upstream': self.base_url,
+            'requests': self.requests,
+            'health_checks': self.health_checks,
+            'circuit': self.breaker.stats(),
+        }
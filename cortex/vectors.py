@@ -0,0 +1,170 @@
+"""
+Vector store
+Chunk embeddings persisted as one contiguous .npy matrix (float32, or int8
+with per-row scales) plus an id table. Servers open it with np.load's
+memory-mapping, so every uvicorn worker shares the same page-cached copy.
+"""
+
+import json
+import os
+
+import numpy as np
+
+VECTORS_FILE = 'vectors.npy'
+SCALES_FILE = 'vector_scales.npy'
+IDS_FILE = 'vector_ids.npy'
+META_FILE = 'vectors.json'
+
+# Rows converted from int8 per block, bounding the float32 temporary
+QUANTIZED_BLOCK_ROWS = 8192
+
+# Query-by-row scores held at once by a batched search (64 MiB of float32)
+BATCH_SCORE_ELEMENTS = 1 << 24
+
+
+def save_array(path, arr):
+    """np.save to a temporary file and rename it into place.
+
+    Replacing the file (rather than truncating it) leaves any process that
+    still has the old version memory-mapped reading valid pages.
+    """
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        np.save(f, arr)
+    os.replace(tmp, path)
+
+
+def write_vectors(directory, matrix, ids, embedder_name, quantize=False):
+    """Persist unit-length row vectors and their chunk ids."""
+    os.makedirs(directory, exist_ok=True)
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+
+    if quantize:
+        scales = np.abs(matrix).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        save_array(os.path.join(directory, VECTORS_FILE),
+                   np.round(matrix / scales[:, None]).astype(np.int8))
+        save_array(os.path.join(directory, SCALES_FILE), scales.astype(np.float32))
+    else:
+        save_array(os.path.join(directory, VECTORS_FILE), matrix)
+        if os.path.exists(os.path.join(directory, SCALES_FILE)):
+            os.remove(os.path.join(directory, SCALES_FILE))
+
+    save_array(os.path.join(directory, IDS_FILE), np.asarray(ids, dtype=np.int64))
+    with open(os.path.join(directory, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump({
+            'embedder': embedder_name,
+            'count': int(matrix.shape[0]),
+            'dim': int(matrix.shape[1]),
+            'dtype': 'int8' if quantize else 'float32',
+        }, f, indent=2)
+
+
+class VectorStore:
+    """Memory-mapped embedding matrix answering cosine top-k queries."""
+
+    def __init__(self, matrix, ids, meta, scales=None):
+        self.matrix = matrix
+        self.ids = ids
+        self.meta = meta
+        self.scales = scales
+
+    @classmethod
+    def open(cls, directory):
+        """Memory-map a store written by ``write_vectors``."""
+        with open(os.path.join(directory, META_FILE), encoding='utf-8') as f:
+            meta = json.load(f)
+        matrix = np.load(os.path.join(directory, VECTORS_FILE), mmap_mode='r')
+        ids = np.load(os.path.join(directory, IDS_FILE), mmap_mode='r')
+        scales = None
+        if meta['dtype'] == 'int8':
+            scales = np.load(os.path.join(directory, SCALES_FILE))
+        return cls(matrix, ids, meta, scales)
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def rows(self, rows):
+        """Return the stored vectors for ``rows`` as float32 (dequantized if int8)."""
+        vectors = np.asarray(self.matrix[rows], dtype=np.float32)
+        if self.scales is not None:
+            vectors *= self.scales[rows][:, None]
+        return vectors
+
+    @property
+    def embedder(self):
+        return self.meta['embedder']
+
+    def scores(self, query_vector, rows=None):
+        """Cosine similarity of ``query_vector`` against every row (or just ``rows``)."""
+        q = np.asarray(query_vector, dtype=np.float32)
+        if rows is not None:
+            subset = self.matrix[rows]
+            if self.scales is None:
+                return subset @ q
+            return (subset.astype(np.float32) @ q) * self.scales[rows]
+
+        if self.scales is None:
+            return self.matrix @ q
+
+        out = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), QUANTIZED_BLOCK_ROWS):
+            block = self.matrix[start:start + QUANTIZED_BLOCK_ROWS]
+            out[start:start + len(block)] = block.astype(np.float32) @ q
+        return out * self.scales
+
+    def batch_scores(self, query_vectors, rows=None):
+        """Cosine similarities of several queries at once: a (queries, rows) matrix.
+
+        One matrix-matrix product over the store (or just ``rows``) instead
+        of a pass per query.
+        """
+        q = np.asarray(query_vectors, dtype=np.float32)
+        if rows is not None:
+            subset = self.matrix[rows]
+            if self.scales is None:
+                return q @ subset.T
+            return (q @ subset.astype(np.float32).T) * self.scales[rows]
+        if self.scales is None:
+            return q @ self.matrix.T
+
+        out = np.empty((len(q), len(self)), dtype=np.float32)
+        for start in range(0, len(self), QUANTIZED_BLOCK_ROWS):
+            block = self.matrix[start:start + QUANTIZED_BLOCK_ROWS]
+            out[:, start:start + len(block)] = q @ block.astype(np.float32).T
+        return out * self.scales
+
+    def search_batch(self, query_vectors, limits, rows=None):
+        """``search`` for several queries, each with its own limit.
+
+        Queries are scored in groups so the score matrix stays within
+        ``BATCH_SCORE_ELEMENTS``.
+        """
+        group = max(1, BATCH_SCORE_ELEMENTS // max(1, len(self) if rows is None else len(rows)))
+        batch_hits = []
+        for start in range(0, len(query_vectors), group):
+            scores = self.batch_scores(query_vectors[start:start + group], rows)
+            batch_hits += [top_k(row_scores, limit) for row_scores, limit in zip(scores, limits[start:start + group])]
+        if rows is None:
+            return batch_hits
+        return [[(int(rows[i]), score) for i, score in hits] for hits in batch_hits]
+
+    def search(self, query_vector, limit=10, rows=None):
+        """Return the top ``limit`` (row, similarity) pairs, optionally among ``rows``."""
+        scores = self.scores(query_vector, rows)
+        hits = top_k(scores, limit)
+        if rows is None:
+            return hits
+        return [(int(rows[i]), score) for i, score in hits]
+
+
+def top_k(scores, limit):
+    """Select the best ``limit`` entries with argpartition, then sort just those."""
+    if limit <= 0 or len(scores) == 0:
+        return []
+    if limit < len(scores):
+        top = np.argpartition(-scores, limit - 1)[:limit]
+    else:
+        top = np.arange(len(scores))
+    top = top[np.argsort(-scores[top], kind='stable')]
+    return [(int(row), float(scores[row])) for row in top]
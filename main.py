@@ -1,15 +1,169 @@
 """
 The Cortex Web Interface
-A simple server to host the search interface
+A simple server to host the search interface and answer searches locally
 """
 
+import asyncio
+import json
+import math
 import os
-from fastapi import FastAPI
-from fastapi.responses import HTMLResponse
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from fastapi import Body, FastAPI, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
 import uvicorn
 
-app = FastAPI(title="The Cortex Web Interface")
+from cortex.artifacts import source_dir
+from cortex.cache import QueryCache, normalize_query
+from cortex.engine import SEARCH_MODES, artifact_version, corpus_available, load_engine
+from cortex.federated import fuse_top_k, merge_top_k
+from cortex.hybrid import get_reranker
+from cortex.lexical import tokenize
+from cortex.metrics import Counter, Histogram, RequestMetrics, SlowQueryLog, process_memory, render, sampled
+from cortex.singleflight import SingleFlight
+from cortex.static import StaticAsset
+from cortex.upstream import FORWARDED_HEADERS, CircuitBreaker, UpstreamError, UpstreamProxy
+
+# Corpus exports (output of scripts/extract_ict_wisdom.py) served per source
+CORPORA = {
+    'ict': os.environ.get("ICT_CORPUS", "ict_wisdom.json"),
+    'vanessa': os.environ.get("VANESSA_CORPUS", "vanessa_wisdom.json"),
+}
+
+# Further sources as "name=path,name=path" (exported with the extractor's --table/--name)
+CORPORA.update(
+    (name.strip(), path.strip() or f"{name.strip()}_wisdom.json")
+    for name, _, path in (entry.partition('=') for entry in os.environ.get("CORTEX_CORPORA", "").split(',') if entry)
+)
+
+# Pseudo-source searching every loaded source at once
+ALL_SOURCES = 'all'
+
+# Loaded search engines by source name
+ENGINES = {}
+
+# Recent search results (QUERY_CACHE_SIZE=0 disables caching)
+QUERY_CACHE = QueryCache(
+    maxsize=int(os.environ.get("QUERY_CACHE_SIZE", "1024")),
+    ttl=float(os.environ.get("QUERY_CACHE_TTL", "300")),
+)
+
+# Candidates each index contributes to a hybrid search, unless ?candidates= asks
+# for another budget (capped by HYBRID_MAX_CANDIDATES to keep latency bounded)
+HYBRID_CANDIDATES = int(os.environ.get("HYBRID_CANDIDATES", "100"))
+HYBRID_MAX_CANDIDATES = int(os.environ.get("HYBRID_MAX_CANDIDATES", "1000"))
+
+# Re-rank stage of hybrid search: 'blend:<vector weight>' or 'cross-encoder:<model>'
+RERANKER = os.environ.get("CORTEX_RERANKER", "blend:0.5")
+
+# Seconds between checks for a new artifact version to hot-reload (0 disables)
+RELOAD_INTERVAL = float(os.environ.get("RELOAD_INTERVAL", "30"))
+
+# Requests slower than SLOW_QUERY_MS (0 disables) are appended to SLOW_QUERY_LOG
+# as JSON lines with their query, filters and stage timings
+SLOW_QUERIES = SlowQueryLog(
+    os.environ.get("SLOW_QUERY_LOG", "slow_queries.jsonl"),
+    threshold_ms=float(os.environ.get("SLOW_QUERY_MS", "0")),
+)
+
+# Latency and request counts exposed on /metrics
+REQUEST_DURATION = Histogram('cortex_request_duration_seconds', 'HTTP request latency by route.', ('route',))
+REQUESTS = Counter('cortex_requests_total', 'HTTP requests by route and status code.', ('route', 'status'))
+SEARCH_STAGE_DURATION = Histogram('cortex_search_stage_duration_seconds',
+                                  'Time spent in each stage of a search.', ('source', 'mode', 'stage'))
+
+# Largest number of queries accepted by POST /search/batch
+BATCH_MAX_QUERIES = int(os.environ.get("BATCH_MAX_QUERIES", "128"))
+
+# Identical searches in progress, shared by concurrent requests
+SEARCH_FLIGHTS = SingleFlight()
+
+# Remote search backend behind the same-origin /api/* routes
+UPSTREAM = UpstreamProxy(
+    os.environ.get("UPSTREAM_URL", "https://web-production-2845d.up.railway.app"),
+    timeout=float(os.environ.get("UPSTREAM_TIMEOUT", "10")),
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.environ.get("UPSTREAM_FAILURE_THRESHOLD", "5")),
+        reset_timeout=float(os.environ.get("UPSTREAM_RESET_TIMEOUT", "30")),
+    ),
+    health_path=os.environ.get("UPSTREAM_HEALTH_PATH", "/"),
+    health_ttl=float(os.environ.get("UPSTREAM_HEALTH_TTL", "30")),
+)
+
+
+def swap_engine(name, engine):
+    """Serve ``name`` from ``engine`` from now on.
+
+    Requests already holding the previous engine finish on it; replacing one
+    dict entry is atomic, so every request sees exactly one of the two.
+    """
+    ENGINES[name] = engine
+    QUERY_CACHE.invalidate(name)
+    print(f"✅ Loaded '{name}' version {engine.version}: {len(engine.corpus):,} chunks from {CORPORA[name]}")
+
+
+def load_engines():
+    """Load every available corpus export with its search index."""
+    reranker = get_reranker(RERANKER)
+    for name, path in CORPORA.items():
+        if not corpus_available(name, path):
+            print(f"⚠️ No corpus for '{name}' at {path}, skipping")
+            continue
+        swap_engine(name, load_engine(name, path, reranker=reranker))
+
+
+async def reload_engines():
+    """Load sources whose artifact version changed, off the event loop, and swap them in.
+
+    Returns the names of the sources swapped. A source whose new version
+    fails to load keeps serving the old one.
+    """
+    swapped = []
+    for name, path in CORPORA.items():
+        current = ENGINES.get(name)
+        version = await run_in_threadpool(artifact_version, name, path)
+        if version is None or (current is not None and current.version == version):
+            continue
+        reranker = current.reranker if current is not None else get_reranker(RERANKER)
+        try:
+            engine = await run_in_threadpool(load_engine, name, path, reranker=reranker)
+        except Exception as e:
+            print(f"⚠️ Could not load '{name}' version {version}: {e}")
+            continue
+        swap_engine(name, engine)
+        swapped.append(name)
+    return swapped
+
+
+async def watch_artifacts(interval=None):
+    """Hot-reload new artifact versions every ``interval`` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval or RELOAD_INTERVAL)
+        try:
+            await reload_engines()
+        except Exception as e:
+            print(f"⚠️ Artifact reload check failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    await UPSTREAM.start()
+    load_engines()
+    watcher = asyncio.create_task(watch_artifacts()) if RELOAD_INTERVAL > 0 else None
+    yield
+    if watcher is not None:
+        watcher.cancel()
+    await UPSTREAM.close()
+
+
+app = FastAPI(title="The Cortex Web Interface", lifespan=lifespan)
+app.add_middleware(RequestMetrics, duration=REQUEST_DURATION, requests=REQUESTS, slow_log=SLOW_QUERIES)
 
 # Read the HTML file
 HTML_CONTENT = """
@@ -145,6 +299,36 @@ HTML_CONTENT = """
             transform: translateY(0);
         }
 
+        .suggestions {
+            position: relative;
+            margin: -10px 0 15px;
+            background: rgba(0,0,0,0.6);
+            border: 1px solid rgba(0,212,255,0.3);
+            border-radius: 10px;
+            overflow: hidden;
+        }
+
+        .suggestions:empty {
+            display: none;
+        }
+
+        .suggestion {
+            padding: 10px 20px;
+            color: #ccc;
+            cursor: pointer;
+        }
+
+        .suggestion:hover {
+            background: rgba(0,212,255,0.2);
+            color: #fff;
+        }
+
+        .suggestion .kind {
+            float: right;
+            font-size: 0.8rem;
+            color: #00d4ff;
+        }
+
         .filters {
             display: flex;
             gap: 10px;
@@ -173,6 +357,20 @@ HTML_CONTENT = """
             color: #00d4ff;
         }
 
+        .concept-picker {
+            padding: 8px 15px;
+            font-size: 0.9rem;
+            background: rgba(0,0,0,0.3);
+            border: 1px solid rgba(255,255,255,0.2);
+            border-radius: 20px;
+            color: #ccc;
+            outline: none;
+        }
+
+        .concept-picker:focus {
+            border-color: #00d4ff;
+        }
+
         .results {
             margin-top: 30px;
         }
@@ -326,10 +524,14 @@ HTML_CONTENT = """
                 <input type="text" id="search-input" placeholder="Search ICT concepts... (e.g., order blocks, liquidity, FOMO)" autofocus>
                 <button onclick="search()">Search</button>
             </div>
+            <div class="suggestions" id="suggestions"></div>
             <div class="filters">
                 <button class="filter-btn active" data-filter="all" onclick="setFilter('all')">All Sources</button>
                 <button class="filter-btn" data-filter="ict" onclick="setFilter('ict')">ICT Only</button>
                 <button class="filter-btn" data-filter="vanessa" onclick="setFilter('vanessa')">Social Skills</button>
+                <select class="concept-picker" id="concept-picker" style="display: none;">
+                    <option value="">All concepts</option>
+                </select>
             </div>
         </div>
 
@@ -347,20 +549,51 @@ HTML_CONTENT = """
     </div>
 
     <script>
-        const API_BASE = 'https://web-production-2845d.up.railway.app';
+        const API_BASE = '';
         let currentFilter = 'all';
+        let currentConcept = '';
+        // Sources this server searches itself; others go through the /api proxy
+        let localSources = [];
+
+        // 'all' searches every source: this server's /search/all, or each upstream source merged here
+        function currentSource() {
+            return currentFilter;
+        }
+
+        // Concept filters are answered from this server's concept index only
+        function conceptParam() {
+            return currentConcept ? `&concept=${encodeURIComponent(currentConcept)}` : '';
+        }
+
+        function searchUrl(source, query) {
+            if (!localSources.includes(source)) {
+                return `${API_BASE}/api/search/${source}?query=${encodeURIComponent(query)}&limit=10`;
+            }
+            return `${API_BASE}/search/${source}?query=${encodeURIComponent(query)}&limit=10${conceptParam()}`;
+        }
 
         async function checkStatus() {
             const indicator = document.getElementById('status-indicator');
             try {
-                const response = await fetch(API_BASE);
+                const response = await fetch(`${API_BASE}/health`);
                 const data = await response.json();
-                if (data.status === 'healthy') {
+                localSources = Object.keys(data.corpora || {});
+                if (localSources.length) localSources.push('all');
+                let status = data.status;
+                if (status !== 'healthy') {
+                    // Served from the proxy's cache, not a fresh upstream call
+                    const upstream = await (await fetch(`${API_BASE}/api/health`)).json();
+                    status = upstream.status;
+                }
+                if (status === 'healthy') {
                     indicator.style.color = '#00ff88';
                     indicator.textContent = '● Online';
-                } else {
+                } else if (status === 'degraded') {
                     indicator.style.color = '#ffaa00';
                     indicator.textContent = '● Degraded';
+                } else {
+                    indicator.style.color = '#ff4444';
+                    indicator.textContent = '● Offline';
                 }
             } catch (e) {
                 indicator.style.color = '#ff4444';
@@ -373,6 +606,70 @@ HTML_CONTENT = """
             document.querySelectorAll('.filter-btn').forEach(btn => {
                 btn.classList.toggle('active', btn.dataset.filter === filter);
             });
+            statusReady.then(() => loadConcepts(currentSource()));
+        }
+
+        // Fill the concept picker from the source's concept index, most mentioned first
+        async function loadConcepts(source) {
+            const picker = document.getElementById('concept-picker');
+            picker.innerHTML = '<option value="">All concepts</option>';
+            picker.style.display = 'none';
+            currentConcept = '';
+            if (source === 'all' || !localSources.includes(source)) return;
+            try {
+                const response = await fetch(`${API_BASE}/concepts/${source}`);
+                if (!response.ok) return;
+                const data = await response.json();
+                data.concepts.forEach(c => {
+                    const option = document.createElement('option');
+                    option.value = c.name;
+                    option.textContent = c.name.replace(/_/g, ' ') + ' (' + c.chunks.toLocaleString() + ')';
+                    picker.appendChild(option);
+                });
+                picker.style.display = '';
+            } catch (e) {
+                // No picker; searches run unfiltered
+            }
+        }
+
+        document.getElementById('concept-picker').addEventListener('change', (e) => {
+            currentConcept = e.target.value;
+            if (document.getElementById('search-input').value.trim()) search();
+        });
+
+        let activeStream = null;
+
+        // Stream from this server's /stream endpoint: lexical hits are appended
+        // as they arrive, then replaced by the vector re-ranked list
+        function streamSearch(source, query) {
+            return new Promise((resolve, reject) => {
+                const resultsDiv = document.getElementById('results');
+                const events = new EventSource(`${API_BASE}/search/${source}/stream?query=${encodeURIComponent(query)}&limit=10${conceptParam()}`);
+                activeStream = events;
+                let shown = 0;
+
+                events.addEventListener('result', (e) => {
+                    const data = JSON.parse(e.data);
+                    if (shown === 0) resultsDiv.innerHTML = resultsHeaderHtml(query, 0);
+                    resultsDiv.insertAdjacentHTML('beforeend', resultCardHtml(data.result));
+                    shown += 1;
+                    resultsDiv.querySelector('.results-count').textContent = shown + ' matches';
+                });
+                events.addEventListener('rerank', (e) => {
+                    const data = JSON.parse(e.data);
+                    displayResults(data.results, query);
+                    shown = data.results.length;
+                });
+                events.addEventListener('done', () => {
+                    events.close();
+                    if (shown === 0) displayResults([], query);
+                    resolve();
+                });
+                events.onerror = () => {
+                    events.close();
+                    if (shown > 0) resolve(); else reject(new Error('Stream interrupted'));
+                };
+            });
         }
 
         async function search() {
@@ -381,18 +678,26 @@ HTML_CONTENT = """
 
             const resultsDiv = document.getElementById('results');
             resultsDiv.innerHTML = '<div class="loading"><div class="loading-spinner"></div><p>Searching The Cortex...</p></div>';
+            if (activeStream) activeStream.close();
 
             try {
-                let url;
-                if (currentFilter === 'ict') {
-                    url = `${API_BASE}/search/ict?query=${encodeURIComponent(query)}&limit=10`;
-                } else if (currentFilter === 'vanessa') {
-                    url = `${API_BASE}/search/vanessa?query=${encodeURIComponent(query)}&limit=10`;
-                } else {
-                    url = `${API_BASE}/search/ict?query=${encodeURIComponent(query)}&limit=10`;
+                await statusReady;
+                const source = currentSource();
+                if (window.EventSource && localSources.includes(source) && source !== 'all') {
+                    try {
+                        await streamSearch(source, query);
+                        return;
+                    } catch (e) {
+                        // Fall back to a plain request below
+                    }
+                }
+
+                if (source === 'all' && !localSources.includes('all')) {
+                    displayResults(await searchAllUpstream(query), query);
+                    return;
                 }
 
-                const response = await fetch(url);
+                const response = await fetch(searchUrl(source, query));
                 const data = await response.json();
                 displayResults(data.results || [], query);
 
@@ -401,6 +706,34 @@ HTML_CONTENT = """
             }
         }
 
+        // Query each upstream source in parallel and keep the 10 most similar overall
+        async function searchAllUpstream(query) {
+            const lists = await Promise.all(['ict', 'vanessa'].map(async (source) => {
+                try {
+                    const response = await fetch(searchUrl(source, query));
+                    const data = await response.json();
+                    return (data.results || []).map(result => Object.assign({corpus: source}, result));
+                } catch (e) {
+                    return [];
+                }
+            }));
+            return lists.flat().sort((a, b) => (b.similarity || 0) - (a.similarity || 0)).slice(0, 10);
+        }
+
+        function resultsHeaderHtml(query, count) {
+            return '<div class="results-header"><h3>Results for "' + query + '"</h3><span class="results-count">' + count + ' matches</span></div>';
+        }
+
+        function resultCardHtml(result) {
+            const source = result.source_transcript || result.source || 'Unknown';
+            const similarity = result.similarity ? (result.similarity * 100).toFixed(1) : '?';
+            const content = result.content || '';
+
+            const corpus = result.corpus ? ' · ' + (result.corpus === 'vanessa' ? 'Social Skills' : result.corpus.toUpperCase()) : '';
+
+            return '<div class="result-card"><div class="result-source"><span>📄 ' + source + corpus + '</span><span class="similarity-badge">' + similarity + '% match</span></div><div class="result-content">' + content + '</div></div>';
+        }
+
         function displayResults(results, query) {
             const resultsDiv = document.getElementById('results');
 
@@ -409,32 +742,524 @@ HTML_CONTENT = """
                 return;
             }
 
-            let html = '<div class="results-header"><h3>Results for "' + query + '"</h3><span class="results-count">' + results.length + ' matches</span></div>';
-
+            let html = resultsHeaderHtml(query, results.length);
             results.forEach(result => {
-                const source = result.source_transcript || result.source || 'Unknown';
-                const similarity = result.similarity ? (result.similarity * 100).toFixed(1) : '?';
-                const content = result.content || '';
-
-                html += '<div class="result-card"><div class="result-source"><span>📄 ' + source + '</span><span class="similarity-badge">' + similarity + '% match</span></div><div class="result-content">' + content + '</div></div>';
+                html += resultCardHtml(result);
             });
 
             resultsDiv.innerHTML = html;
         }
 
+        // Search-as-you-type: wait for a pause in typing, and abort the previous
+        // request so a slow response for an old prefix never overwrites a newer one
+        const SUGGEST_DELAY_MS = 120;
+        let suggestTimer = null;
+        let suggestController = null;
+
+        function clearSuggestions() {
+            clearTimeout(suggestTimer);
+            if (suggestController) suggestController.abort();
+            document.getElementById('suggestions').innerHTML = '';
+        }
+
+        async function fetchSuggestions(text) {
+            if (suggestController) suggestController.abort();
+            suggestController = new AbortController();
+            const source = currentSource();
+            if (!localSources.includes(source)) return;
+            try {
+                const response = await fetch(`${API_BASE}/suggest?q=${encodeURIComponent(text)}&source=${source}`,
+                                             {signal: suggestController.signal});
+                const data = await response.json();
+                showSuggestions(data.suggestions || []);
+            } catch (e) {
+                if (e.name !== 'AbortError') showSuggestions([]);
+            }
+        }
+
+        function showSuggestions(suggestions) {
+            const box = document.getElementById('suggestions');
+            box.innerHTML = '';
+            suggestions.forEach(s => {
+                const item = document.createElement('div');
+                item.className = 'suggestion';
+                item.textContent = s.text;
+                const kind = document.createElement('span');
+                kind.className = 'kind';
+                kind.textContent = s.kind === 'concept' ? 'concept' : '';
+                item.appendChild(kind);
+                item.addEventListener('mousedown', (e) => {
+                    e.preventDefault();
+                    document.getElementById('search-input').value = s.text;
+                    clearSuggestions();
+                    search();
+                });
+                box.appendChild(item);
+            });
+        }
+
+        const searchInput = document.getElementById('search-input');
+        searchInput.addEventListener('input', () => {
+            clearTimeout(suggestTimer);
+            const text = searchInput.value.trim();
+            if (!text) {
+                clearSuggestions();
+                return;
+            }
+            suggestTimer = setTimeout(() => fetchSuggestions(text), SUGGEST_DELAY_MS);
+        });
+        searchInput.addEventListener('blur', () => setTimeout(clearSuggestions, 100));
+
         document.getElementById('search-input').addEventListener('keypress', (e) => {
-            if (e.key === 'Enter') search();
+            if (e.key === 'Enter') {
+                clearSuggestions();
+                search();
+            }
         });
 
-        checkStatus();
+        const statusReady = checkStatus();
+        statusReady.then(() => loadConcepts(currentSource()));
     </script>
 </body>
 </html>
 """
 
+# Encoded and precompressed once; served with an ETag and Accept-Encoding negotiation
+HOME_PAGE = StaticAsset(HTML_CONTENT, 'text/html; charset=utf-8')
+
+
 @app.get("/", response_class=HTMLResponse)
-async def home():
-    return HTML_CONTENT
+async def home(request: Request):
+    return HOME_PAGE.response(request.headers)
+
+
+@app.get("/health")
+async def health():
+    return {
+        'status': 'healthy' if ENGINES else 'degraded',
+        'corpora': {name: len(engine.corpus) for name, engine in ENGINES.items()},
+        'versions': {name: engine.version for name, engine in ENGINES.items()},
+    }
+
+
+def get_engine(source):
+    if source not in CORPORA:
+        raise HTTPException(status_code=404, detail=f"Unknown source '{source}'")
+    engine = ENGINES.get(source)
+    if engine is None:
+        raise HTTPException(status_code=503, detail=f"Corpus '{source}' is not loaded")
+    return engine
+
+
+def check_concepts(engine, concepts):
+    """Validate ``concept=`` filters; return them as a canonical tuple."""
+    concepts = tuple(sorted(set(concepts or ())))
+    try:
+        engine.check_concepts(concepts)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return concepts
+
+
+def hybrid_options(mode, candidates, rerank):
+    """Candidate budget and re-rank flag for the cache key; they only apply to hybrid search."""
+    if mode != 'hybrid':
+        return None, False
+    return min(candidates or HYBRID_CANDIDATES, HYBRID_MAX_CANDIDATES), rerank
+
+
+async def run_search(engine, query, limit=10, mode=None, nprobe=None, exact=False, explain=False, concepts=(),
+                     candidates=None, rerank=False, timings=None):
+    """Search through the result cache, sharing identical searches already in flight.
+
+    Per-stage milliseconds of the search that produced the results are
+    copied into ``timings`` when a dict is passed ('cached' if none ran,
+    'coalesced' if another request's search produced them).
+    Keys end with the engine version, so results of a search that finishes
+    after a hot reload are never served for the new version.
+    """
+    key = (engine.name, normalize_query(query), mode, limit, nprobe, exact, explain, concepts, candidates, rerank,
+           engine.version)
+    results = QUERY_CACHE.get(key)
+    if results is not None:
+        if timings is not None:
+            timings['cached'] = True
+        return results
+
+    led = False
+
+    async def compute():
+        nonlocal led
+        led = True
+        stages = {}
+        found = await run_in_threadpool(
+            engine.search, query, limit, explain=explain, mode=mode, nprobe=nprobe, exact=exact,
+            concepts=concepts, candidates=candidates, rerank=rerank, timings=stages)
+        QUERY_CACHE.put(key, found)
+        return found, stages
+
+    found, stages = await SEARCH_FLIGHTS.do(key, compute)
+    if timings is not None:
+        timings.update(stages)
+        if not led:
+            timings['coalesced'] = True
+    return found
+
+
+def observe_stages(engine, mode, timings):
+    """Record a search's stage timings in the stage histogram.
+
+    Cache hits and coalesced results are skipped: their stages ran once,
+    for the request that led the search, and are recorded there.
+    """
+    if timings.get('cached') or timings.get('coalesced'):
+        return
+    for key, ms in timings.items():
+        if key.endswith('_ms') and key != 'total_ms':
+            SEARCH_STAGE_DURATION.observe(ms / 1000, engine.name, mode, key[:-3])
+
+
+def since_arrival_ms(request):
+    """Milliseconds since the metrics middleware saw ``request`` arrive (routing and parsing)."""
+    started = getattr(request.state, 'started', None)
+    return round((time.perf_counter() - started) * 1000, 3) if started is not None else None
+
+
+@app.get(f"/search/{ALL_SOURCES}")
+async def search_all(request: Request, query: str, limit: int = Query(10, ge=1, le=100),
+                     mode: str = Query(None, pattern=f"^({'|'.join(SEARCH_MODES)})$"),
+                     concept: List[str] = Query(None), candidates: int = Query(None, ge=1),
+                     rerank: bool = False):
+    """Search every loaded source in parallel and merge their top ``limit`` lists.
+
+    Every source runs the same mode: ``mode``, or by default hybrid when
+    all sources have vectors from one embedder and lexical otherwise.
+    Sources without that mode, or without the ``concept`` filters, sit out.
+    Lexical, vector and re-ranked lists are merged on their scores, which
+    every source computes on one scale; hybrid search without ``rerank``
+    merges each source's lexical and vector candidates and fuses the two
+    merged lists once, so ranks count over all sources.
+    """
+    started = time.perf_counter()
+    sources = {}
+    for name, engine in sorted(ENGINES.items()):
+        try:
+            sources[name] = (engine, check_concepts(engine, concept))
+        except HTTPException:
+            continue
+    if not sources:
+        detail = "No loaded source has the requested concepts" if concept else "No corpus is loaded"
+        raise HTTPException(status_code=400 if concept and ENGINES else 503, detail=detail)
+    embedders = {engine.vectors.embedder for engine, _ in sources.values() if engine.vectors is not None}
+    if mode is None:
+        vectors = len(embedders) == 1 and all(engine.vectors is not None for engine, _ in sources.values())
+        mode = 'hybrid' if vectors else 'lexical'
+    elif mode != 'lexical' and len(embedders) > 1:
+        raise HTTPException(status_code=400, detail="Sources embed with different models; use mode=lexical")
+    plans = {name: plan for name, plan in sources.items() if mode in plan[0].modes}
+    if not plans:
+        raise HTTPException(status_code=400, detail=f"No loaded source supports search mode '{mode}'")
+    candidates, rerank = hybrid_options(mode, candidates, rerank)
+    request.state.slow_query = {'source': ALL_SOURCES, 'query': query, 'mode': mode, 'limit': limit,
+                                'concepts': sorted(set(concept or ())), 'sources': list(plans)}
+
+    # Hybrid fusion scores are per source, so plain hybrid fetches both candidate lists
+    stages = [('lexical', candidates), ('vector', candidates)] if mode == 'hybrid' and not rerank else [(mode, limit)]
+    timings = {name: {stage: {} for stage, _ in stages} for name in plans}
+    calls = [(name, stage, size) for name in plans for stage, size in stages]
+    ranked = await asyncio.gather(*(
+        run_search(plans[name][0], query, size, stage, None, False, False, plans[name][1],
+                   *hybrid_options(stage, candidates, rerank), timings[name][stage])
+        for name, stage, size in calls))
+    lists = {stage: {} for stage, _ in stages}
+    for (name, stage, _), hits in zip(calls, ranked):
+        observe_stages(plans[name][0], stage, timings[name][stage])
+        lists[stage][name] = hits
+
+    merge_started = time.perf_counter()
+    if len(stages) > 1:
+        results = fuse_top_k(list(lists.values()), limit, candidates)
+    else:
+        results = merge_top_k(lists[mode], limit)
+    merge_ms = round((time.perf_counter() - merge_started) * 1000, 3)
+    return {
+        'query': query,
+        'source': ALL_SOURCES,
+        'mode': mode,
+        'count': len(results),
+        'results': results,
+        'sources': {name: {'version': engine.version, 'count': sum(r['corpus'] == name for r in results),
+                           'timings': timings[name]}
+                    for name, (engine, _) in plans.items()},
+        'timings': {'merge_ms': merge_ms, 'total_ms': round((time.perf_counter() - started) * 1000, 3)},
+    }
+
+
+@app.get("/search/{source}")
+async def search(request: Request, source: str, query: str, limit: int = Query(10, ge=1, le=100),
+                 mode: str = Query(None, pattern=f"^({'|'.join(SEARCH_MODES)})$"),
+                 nprobe: int = Query(None, ge=1), exact: bool = False, explain: bool = False,
+                 concept: List[str] = Query(None), candidates: int = Query(None, ge=1),
+                 rerank: bool = False):
+    timings = {'parse_ms': since_arrival_ms(request)}
+    engine = get_engine(source)
+    mode = mode or engine.default_mode
+    if mode not in engine.modes:
+        raise HTTPException(status_code=400, detail=f"Search mode '{mode}' is not available for '{source}'")
+    concepts = check_concepts(engine, concept)
+    candidates, rerank = hybrid_options(mode, candidates, rerank)
+    request.state.slow_query = {'source': source, 'query': query, 'mode': mode, 'limit': limit,
+                                'concepts': list(concepts), 'candidates': candidates, 'rerank': rerank,
+                                'timings': timings}
+    started = time.perf_counter()
+    results = await run_search(engine, query, limit, mode, nprobe, exact, explain, concepts,
+                               candidates, rerank, timings)
+    timings['total_ms'] = round((time.perf_counter() - started) * 1000, 3)
+    observe_stages(engine, mode, timings)
+    response = {'query': query, 'source': source, 'version': engine.version, 'mode': mode,
+                'count': len(results), 'results': results, 'timings': dict(timings)}
+    if mode == 'hybrid':
+        response.update(candidates=candidates, rerank=rerank)
+    if concepts:
+        response['concepts'] = list(concepts)
+
+    # Encoded here rather than by FastAPI so the stage can be timed
+    started = time.perf_counter()
+    response = JSONResponse(jsonable_encoder(response))
+    timings['serialize_ms'] = round((time.perf_counter() - started) * 1000, 3)
+    SEARCH_STAGE_DURATION.observe(timings['serialize_ms'] / 1000, engine.name, mode, 'serialize')
+    return response
+
+
+def sse(event, data):
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.get("/search/{source}/stream")
+async def search_stream(request: Request, source: str, query: str, limit: int = Query(10, ge=1, le=100),
+                        nprobe: int = Query(None, ge=1), concept: List[str] = Query(None),
+                        candidates: int = Query(None, ge=1), rerank: bool = False):
+    """Stream results as Server-Sent Events while they are ranked.
+
+    'result' events carry the lexical hits one at a time, a 'rerank' event
+    then carries the hybrid list that replaces them (when the source has
+    vectors; the same list /search/{source} returns in hybrid mode), and
+    'done' ends the stream with cumulative timings.
+    """
+    engine = get_engine(source)
+    concepts = check_concepts(engine, concept)
+    candidates, rerank = hybrid_options('hybrid', candidates, rerank)
+    timings = {}
+    request.state.slow_query = {'source': source, 'query': query, 'mode': 'stream', 'limit': limit,
+                                'concepts': list(concepts), 'timings': timings}
+
+    async def events():
+        stages = engine.staged_search(query, limit, nprobe, candidates, rerank, concepts=concepts)
+        started = time.perf_counter()
+        while True:
+            step = await run_in_threadpool(next, stages, None)
+            if step is None:
+                break
+            stage, results = step
+            timings[f'{stage}_ms'] = round((time.perf_counter() - started) * 1000, 2)
+            if stage == 'lexical':
+                for rank, result in enumerate(results, 1):
+                    yield sse('result', {'stage': stage, 'rank': rank, 'result': result})
+            else:
+                yield sse('rerank', {'stage': stage, 'results': results})
+        yield sse('done', {'query': query, 'source': source, 'timings': timings})
+
+    return StreamingResponse(events(), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+class BatchQuery(BaseModel):
+    query: str
+    source: str = 'ict'
+    limit: int = Field(10, ge=1, le=100)
+    mode: Optional[str] = Field(None, pattern=f"^({'|'.join(SEARCH_MODES)})$")
+    concepts: List[str] = []
+    candidates: Optional[int] = Field(None, ge=1)
+    rerank: bool = False
+
+
+@app.post("/search/batch")
+async def search_batch(request: Request, items: List[BatchQuery] = Body(..., min_length=1)):
+    """Run many searches in one request; results come back in input order.
+
+    Queries missing from the cache are grouped by source, mode, concept
+    filter and hybrid options, and each group is embedded in one batched call.
+    """
+    if len(items) > BATCH_MAX_QUERIES:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_QUERIES} queries per batch")
+
+    keys, groups = [], {}
+    for i, item in enumerate(items):
+        engine = get_engine(item.source)
+        mode = item.mode or engine.default_mode
+        if mode not in engine.modes:
+            raise HTTPException(status_code=400,
+                                detail=f"Item {i}: search mode '{mode}' is not available for '{item.source}'")
+        try:
+            concepts = check_concepts(engine, item.concepts)
+        except HTTPException as e:
+            raise HTTPException(status_code=400, detail=f"Item {i}: {e.detail}")
+        candidates, rerank = hybrid_options(mode, item.candidates, item.rerank)
+        key = (engine.name, normalize_query(item.query), mode, item.limit, None, False, False, concepts,
+               candidates, rerank, engine.version)
+        keys.append(key)
+        groups.setdefault((engine, mode, concepts, candidates, rerank), {})[key] = item
+
+    found, timings = {}, {}
+    request.state.slow_query = {'batch': len(items), 'sources': sorted({item.source for item in items}),
+                                'timings': timings}
+    for (engine, mode, concepts, candidates, rerank), group in groups.items():
+        todo = {}
+        for key, item in group.items():
+            cached = QUERY_CACHE.get(key)
+            if cached is None:
+                todo[key] = item
+            else:
+                found[key] = cached
+        if not todo:
+            continue
+        stages = {}
+        batch = await run_in_threadpool(
+            engine.search_batch, [item.query for item in todo.values()],
+            [item.limit for item in todo.values()], mode=mode, concepts=concepts,
+            candidates=candidates, rerank=rerank, timings=stages)
+        observe_stages(engine, mode, stages)
+        for stage, ms in stages.items():
+            timings[stage] = round(timings.get(stage, 0.0) + ms, 3)
+        for key, results in zip(todo, batch):
+            QUERY_CACHE.put(key, results)
+            found[key] = results
+
+    return {
+        'count': len(items),
+        'results': [
+            {'query': item.query, 'source': item.source, 'mode': key[2],
+             'count': len(found[key]), 'results': found[key]}
+            for item, key in zip(items, keys)
+        ],
+    }
+
+
+@app.get("/concepts/{source}")
+def concepts(source: str):
+    """ICT concepts a search can be filtered by, with how many chunks mention each."""
+    engine = get_engine(source)
+    if engine.concepts is None:
+        raise HTTPException(status_code=404, detail=f"'{source}' has no concept index")
+    counts = sorted(engine.concepts.counts().items(), key=lambda item: (-item[1], item[0]))
+    return {'source': source, 'concepts': [{'name': name, 'chunks': n} for name, n in counts if n]}
+
+
+@app.get("/suggest")
+def suggest(q: str, source: str = 'ict', limit: int = Query(8, ge=1, le=25)):
+    """Completions for a partly typed query: concept phrases, then index terms.
+
+    For 'all', concept phrases from every source come first, then terms by
+    their document frequency summed over sources.
+    """
+    if source != ALL_SOURCES:
+        engine = get_engine(source)
+        return {'query': q, 'source': source, 'suggestions': engine.suggestions.suggest(q, limit)}
+
+    concepts, terms = {}, {}
+    for _, engine in sorted(ENGINES.items()):
+        for suggestion in engine.suggestions.suggest(q, limit):
+            if suggestion['kind'] == 'concept':
+                concepts.setdefault(suggestion['text'], suggestion)
+            elif suggestion['text'] in terms:
+                terms[suggestion['text']]['df'] += suggestion['df']
+            else:
+                terms[suggestion['text']] = dict(suggestion)
+    ranked_terms = sorted((t for t in terms.values() if t['text'] not in concepts), key=lambda t: -t['df'])
+    return {'query': q, 'source': source, 'suggestions': (list(concepts.values()) + ranked_terms)[:limit]}
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    return dict(QUERY_CACHE.stats(), single_flight=SEARCH_FLIGHTS.stats())
+
+
+def artifact_bytes(name):
+    """Bytes of prebuilt artifacts on disk for a source (mostly memory-mapped when served)."""
+    directory = source_dir(name)
+    if not os.path.isdir(directory):
+        return 0
+    return sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus text exposition: latency histograms, cache ratios, index sizes and memory."""
+    cache, flights = QUERY_CACHE.stats(), SEARCH_FLIGHTS.stats()
+    memory = process_memory()
+    engines = sorted(ENGINES.items())
+    body = render(
+        REQUEST_DURATION.render(),
+        REQUESTS.render(),
+        SEARCH_STAGE_DURATION.render(),
+        sampled('cortex_query_cache_hits_total', 'Query cache hits.', {(): cache['hits']}, kind='counter'),
+        sampled('cortex_query_cache_misses_total', 'Query cache misses.', {(): cache['misses']}, kind='counter'),
+        sampled('cortex_query_cache_evictions_total', 'Query cache LRU evictions.',
+                {(): cache['evictions']}, kind='counter'),
+        sampled('cortex_query_cache_hit_ratio', 'Share of query cache lookups that hit.', {(): cache['hit_rate']}),
+        sampled('cortex_query_cache_entries', 'Results held in the query cache.', {(): cache['size']}),
+        sampled('cortex_single_flight_executed_total', 'Searches run by the single-flight layer.',
+                {(): flights['executed']}, kind='counter'),
+        sampled('cortex_single_flight_coalesced_total', 'Searches that joined one already in flight.',
+                {(): flights['coalesced']}, kind='counter'),
+        sampled('cortex_index_chunks', 'Chunks in each loaded corpus.',
+                {(name,): len(engine.corpus) for name, engine in engines}, ('source',)),
+        sampled('cortex_index_terms', 'Distinct terms in each BM25 index.',
+                {(name,): len(engine.lexical.terms) for name, engine in engines}, ('source',)),
+        sampled('cortex_index_vectors', 'Rows in each vector store.',
+                {(name,): len(engine.vectors) for name, engine in engines if engine.vectors is not None},
+                ('source',)),
+        sampled('cortex_index_artifact_bytes', 'Bytes of prebuilt artifacts on disk per source.',
+                {(name,): artifact_bytes(name) for name, _ in engines}, ('source',)),
+        sampled('cortex_index_info', 'Artifact version each source is serving.',
+                {(name, engine.version or ''): 1 for name, engine in engines}, ('source', 'version')),
+        sampled('cortex_slow_queries_total', 'Requests written to the slow-query log.',
+                {(): SLOW_QUERIES.logged}, kind='counter'),
+        sampled('process_resident_memory_bytes', 'Resident memory size in bytes.', {(): memory['resident']}),
+        sampled('process_virtual_memory_bytes', 'Virtual memory size in bytes.', {(): memory['virtual']}),
+    )
+    return Response(body, media_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@app.get("/api/health")
+async def upstream_health():
+    """Upstream status, cached so page loads do not each reach the backend."""
+    return dict(await UPSTREAM.health(), proxy=UPSTREAM.stats())
+
+
+@app.get("/api/{path:path}")
+async def proxy(path: str, request: Request):
+    """Forward a GET to the upstream search backend."""
+    try:
+        response = await UPSTREAM.get(path, params=request.query_params.multi_items())
+    except UpstreamError as e:
+        headers = {'Retry-After': str(math.ceil(e.retry_after))} if e.retry_after is not None else None
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers=headers)
+    headers = {k: v for k, v in response.headers.items() if k in FORWARDED_HEADERS}
+    return Response(response.content, status_code=response.status_code, headers=headers)
+
+
+@app.get("/index/{source}/terms")
+def term_stats(source: str, query: str):
+    engine = get_engine(source)
+    terms = [engine.lexical.term_stats(term) for term in dict.fromkeys(tokenize(query))]
+    return {
+        'source': source,
+        'documents': len(engine.lexical),
+        'avg_doc_length': round(engine.lexical.avgdl, 2),
+        'terms': terms,
+    }
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8080))
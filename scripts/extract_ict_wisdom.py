@@ -6,9 +6,39 @@ Organizes by source transcript for comprehensive coverage.
 """
 
 import os
+import re
+import sys
 import json
+import time
+import random
+import sqlite3
+import tempfile
+import argparse
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from supabase import create_client
+
+try:
+    import ahocorasick  # optional: pip install pyahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import httpx  # installed with supabase
+except ImportError:
+    httpx = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from cortex.ann import IVF_FILE, IVF_VECTORS_FILE, IVFIndex  # noqa: E402
+from cortex.artifacts import BM25_FILE, artifact_path, read_manifest, source_dir, write_manifest  # noqa: E402
+from cortex.concepts import CONCEPT_INDEX_FILE, CONCEPT_KEYWORDS, write_concept_index  # noqa: E402
+from cortex.corpus import CORPUS_FILE, write_corpus  # noqa: E402
+from cortex.embeddings import DEFAULT_EMBEDDER, get_embedder  # noqa: E402
+from cortex.engine import artifact_version  # noqa: E402
+from cortex.lexical import TOKEN_RE, BM25Index  # noqa: E402
+from cortex.vectors import IDS_FILE, META_FILE, SCALES_FILE, VECTORS_FILE, VectorStore, write_vectors  # noqa: E402
 
 # Environment variables
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
@@ -17,31 +47,180 @@ SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
 # Batch size for pagination (Supabase has row limits)
 BATCH_SIZE = 1000
 
+# Largest number of chunks sent to a concept analysis worker in one task
+CONCEPT_SHARD_SIZE = 5000
+
+# Default table and source name; any table with these columns exports the same way
+CHUNK_TABLE = 'ict_chunks'
+SOURCE_NAME = 'ict'
+
+# Columns the export uses; keeps embeddings and other wide columns off the wire
+CHUNK_COLUMNS = ['id', 'content', 'chunk_index', 'source_transcript']
+
+# Retries for a failed request, with exponential backoff starting at RETRY_BACKOFF seconds
+FETCH_RETRIES = 4
+RETRY_BACKOFF = 0.5
+
+# SQLSTATE classes worth retrying: connection exceptions, serialization
+# failures and deadlocks, insufficient resources, statement timeouts and shutdowns
+TRANSIENT_SQLSTATE_CLASSES = ('08', '40', '53', '57')
+
+# Embedding model for vector search: 'hashing:<dim>' or 'sentence-transformers:<model>'
+EMBEDDER = os.environ.get("CORTEX_EMBEDDER", DEFAULT_EMBEDDER)
+
+# Store embeddings as int8 with per-row scales (4x smaller than float32)
+QUANTIZE_VECTORS = os.environ.get("CORTEX_QUANTIZE", "") == "1"
+
+# Chunks embedded per model call
+EMBED_BATCH_SIZE = 1024
 
-def fetch_all_chunks(supabase):
-    """Fetch ALL chunks from the Cortex using pagination."""
-    all_chunks = []
-    offset = 0
+# Build the IVF approximate nearest neighbour index (list count defaults to 4*sqrt(n));
+# servers only search through it when a request passes nprobe
+BUILD_ANN = os.environ.get("CORTEX_ANN", "") == "1"
+ANN_LISTS = int(os.environ.get("CORTEX_ANN_LISTS", "0")) or None
+
+# Artifact files the web server loads, listed in the version manifest
+SERVED_ARTIFACTS = (CORPUS_FILE, CONCEPT_INDEX_FILE, BM25_FILE, VECTORS_FILE, SCALES_FILE, IDS_FILE, META_FILE,
+                    IVF_FILE, IVF_VECTORS_FILE)
+
+# Incremental extraction state (high-water mark, per-concept chunk ids),
+# kept next to the source's search artifacts
+STATE_FILE = 'extract_state.json'
+
+
+def is_transient(error):
+    """Whether a failed request may succeed if sent again.
+
+    Network errors, timeouts, 429s and 5xx responses are; anything else (a
+    4xx APIError for a bad column or table, say) fails the same way every time.
+    """
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    if httpx is not None and isinstance(error, httpx.TransportError):
+        return True
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status is None:
+        # postgrest's APIError: an HTTP status when the body was not JSON, else a SQLSTATE or PGRST code
+        code = str(getattr(error, 'code', None) or '')
+        if len(code) == 3 and code.isdigit():
+            status = int(code)
+        else:
+            return len(code) == 5 and code[:2] in TRANSIENT_SQLSTATE_CLASSES
+    return status == 429 or status >= 500
+
+
+def execute_with_retry(build_query, retries=None, backoff=None):
+    """Build and execute a query, retrying transient failures with jittered backoff."""
+    retries = FETCH_RETRIES if retries is None else retries
+    backoff = RETRY_BACKOFF if backoff is None else backoff
+    for attempt in range(retries + 1):
+        try:
+            return build_query().execute()
+        except Exception as e:
+            if attempt == retries or not is_transient(e):
+                raise
+            delay = backoff * (2 ** attempt) * (0.5 + random.random())
+            print(f"  ⚠️ Request failed ({e}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def _iter_id_range(supabase, columns, page_size, after, watermark_column, after_id=None, upto_id=None,
+                   table=CHUNK_TABLE):
+    """Keyset-paginate rows with after_id < id <= upto_id (either bound optional), page by page.
+
+    Only an empty page (or reaching ``upto_id``) ends the range: the server
+    may cap a page below ``page_size``, so a short page is not the last one.
+    """
+    last_id = after_id
 
     while True:
-        print(f"  Fetching chunks {offset} to {offset + BATCH_SIZE}...")
+        def build_query():
+            query = supabase.table(table).select(','.join(columns))
+            if after is not None:
+                query = query.gt(watermark_column, after)
+            if last_id is not None:
+                query = query.gt('id', last_id)
+            if upto_id is not None:
+                query = query.lte('id', upto_id)
+            return query.order('id').limit(page_size)
 
-        response = supabase.table('ict_chunks') \
-            .select('*') \
-            .range(offset, offset + BATCH_SIZE - 1) \
-            .execute()
+        response = execute_with_retry(build_query)
 
         if not response.data:
             break
 
-        all_chunks.extend(response.data)
+        yield response.data
 
-        if len(response.data) < BATCH_SIZE:
+        last_id = response.data[-1]['id']
+        if upto_id is not None and last_id >= upto_id:
             break
 
-        offset += BATCH_SIZE
 
-    return all_chunks
+def _id_bounds(supabase, after, watermark_column, table=CHUNK_TABLE):
+    """Smallest and largest id among the rows to fetch, or None if there are none."""
+    bounds = []
+    for desc in (False, True):
+        def build_query():
+            query = supabase.table(table).select('id')
+            if after is not None:
+                query = query.gt(watermark_column, after)
+            return query.order('id', desc=desc).limit(1)
+
+        response = execute_with_retry(build_query)
+        if not response.data:
+            return None
+        bounds.append(response.data[0]['id'])
+    return bounds
+
+
+def iter_chunk_pages(supabase, after=None, watermark_column='id', page_size=BATCH_SIZE,
+                     columns=CHUNK_COLUMNS, concurrency=1, total=None, table=CHUNK_TABLE):
+    """Yield pages of chunks from ``table`` in id order, using keyset pagination.
+
+    Each page asks for rows with id greater than the last one seen, so every
+    page costs the same regardless of depth and rows inserted or deleted
+    mid-run cannot shift later pages. With ``after`` set, only rows whose
+    ``watermark_column`` is greater than it are fetched (the incremental delta).
+
+    With ``concurrency`` > 1 the id range is split into slices of about one
+    page each (sized from ``total`` rows when known) that a thread pool
+    fetches, at most two slices per worker ahead of the consumer; slices are
+    yielded in id order, so the result is the same as a sequential fetch.
+    """
+    columns = list(dict.fromkeys(list(columns) + [watermark_column]))
+
+    if concurrency <= 1:
+        print(f"  Fetching in pages of {page_size}...")
+        yield from _iter_id_range(supabase, columns, page_size, after, watermark_column, table=table)
+        return
+
+    bounds = _id_bounds(supabase, after, watermark_column, table)
+    if bounds is None:
+        return
+    low, high = bounds
+
+    slices = max(1, -(-total // page_size)) if total else concurrency * 4
+    slices = min(slices, high - low + 1)
+    edges = [low - 1 + (high - low + 1) * i // slices for i in range(slices + 1)]
+    print(f"  Fetching ids {low}..{high} as {slices} slices, {concurrency} at a time...")
+
+    def fetch_slice(i):
+        return list(_iter_id_range(supabase, columns, page_size, after, watermark_column,
+                                   after_id=edges[i], upto_id=edges[i + 1], table=table))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending = deque()
+        for i in range(slices):
+            pending.append(pool.submit(fetch_slice, i))
+            if len(pending) >= concurrency * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def fetch_all_chunks(supabase, **kwargs):
+    """Fetch ALL chunks from the Cortex (see iter_chunk_pages for options)."""
+    return [chunk for page in iter_chunk_pages(supabase, **kwargs) for chunk in page]
 
 
 def organize_by_source(chunks):
@@ -72,151 +251,457 @@ def organize_by_source(chunks):
     return by_source
 
 
-def extract_ict_concepts(chunks):
-    """Extract and categorize ICT concepts mentioned across all chunks."""
-    concepts = {
-        'power_of_three': [],
-        'order_blocks': [],
-        'fair_value_gaps': [],
-        'liquidity': [],
-        'market_structure': [],
-        'optimal_trade_entry': [],
-        'silver_bullet': [],
-        'judas_swing': [],
-        'turtle_soup': [],
-        'breaker_blocks': [],
-        'mitigation_blocks': [],
-        'killzones': [],
-        'asian_session': [],
-        'london_session': [],
-        'new_york_session': [],
-        'midnight_open': [],
-        'true_day': [],
-        'weekly_profiles': [],
-        'monthly_profiles': [],
-        'quarterly_shifts': [],
-        'institutional_order_flow': [],
-        'smart_money': [],
-        'displacement': [],
-        'imbalance': [],
-        'inefficiency': [],
-        'premium_discount': [],
-        'equilibrium': [],
-        'swing_points': [],
-        'pivot_points': [],
-        'time_and_price': [],
-        'fibonacci': [],
-        'pd_arrays': [],
-        'draw_on_liquidity': [],
-        'raid': [],
-        'stop_hunt': [],
-        'manipulation': [],
-        'accumulation': [],
-        'distribution': [],
-        'expansion': [],
-        'retracement': [],
-        'consolidation': [],
-        'propulsion_block': [],
-        'rejection_block': [],
-        'volume_imbalance': [],
-        'opening_range_gap': [],
-        'new_week_opening_gap': [],
-        'new_day_opening_gap': [],
-        'consequent_encroachment': [],
-        'model_2022': [],
-        'unicorn_model': [],
-        'ict_mentorship': [],
-        'amd': [],
-        'cbdr': [],
-        'nwog': [],
-        'ndog': [],
-        'macro_time': [],
-        'algorithmically_delivered': [],
-        'seek_and_destroy': [],
-        'standard_deviation': [],
-    }
-
-    # Keywords mapping for each concept
-    keywords = {
-        'power_of_three': ['power of three', 'po3', 'accumulation manipulation distribution'],
-        'order_blocks': ['order block', 'bullish order block', 'bearish order block'],
-        'fair_value_gaps': ['fair value gap', 'fvg', 'imbalance'],
-        'liquidity': ['liquidity', 'buy side liquidity', 'sell side liquidity', 'bsl', 'ssl', 'equal highs', 'equal lows'],
-        'market_structure': ['market structure', 'bos', 'break of structure', 'choch', 'change of character'],
-        'optimal_trade_entry': ['optimal trade entry', 'ote', '.62', '.705', '.79'],
-        'silver_bullet': ['silver bullet'],
-        'judas_swing': ['judas swing', 'judas'],
-        'turtle_soup': ['turtle soup'],
-        'breaker_blocks': ['breaker block', 'breaker'],
-        'mitigation_blocks': ['mitigation block', 'mitigation'],
-        'killzones': ['killzone', 'kill zone'],
-        'asian_session': ['asian session', 'asian range'],
-        'london_session': ['london session', 'london open', 'london close'],
-        'new_york_session': ['new york session', 'ny session', 'new york open'],
-        'midnight_open': ['midnight open', 'midnight'],
-        'true_day': ['true day'],
-        'weekly_profiles': ['weekly profile', 'weekly range'],
-        'monthly_profiles': ['monthly profile', 'monthly range'],
-        'quarterly_shifts': ['quarterly shift'],
-        'institutional_order_flow': ['institutional order flow', 'institutional'],
-        'smart_money': ['smart money'],
-        'displacement': ['displacement'],
-        'imbalance': ['imbalance'],
-        'inefficiency': ['inefficiency'],
-        'premium_discount': ['premium', 'discount'],
-        'equilibrium': ['equilibrium'],
-        'swing_points': ['swing high', 'swing low'],
-        'pivot_points': ['pivot'],
-        'time_and_price': ['time and price'],
-        'fibonacci': ['fibonacci', 'fib'],
-        'pd_arrays': ['pd array'],
-        'draw_on_liquidity': ['draw on liquidity', 'dol'],
-        'raid': ['raid', 'liquidity raid'],
-        'stop_hunt': ['stop hunt', 'stop run'],
-        'manipulation': ['manipulation'],
-        'accumulation': ['accumulation'],
-        'distribution': ['distribution'],
-        'expansion': ['expansion'],
-        'retracement': ['retracement'],
-        'consolidation': ['consolidation', 'range'],
-        'propulsion_block': ['propulsion block'],
-        'rejection_block': ['rejection block'],
-        'volume_imbalance': ['volume imbalance'],
-        'opening_range_gap': ['opening range gap'],
-        'new_week_opening_gap': ['new week opening gap', 'nwog'],
-        'new_day_opening_gap': ['new day opening gap', 'ndog'],
-        'consequent_encroachment': ['consequent encroachment'],
-        'model_2022': ['2022 model', 'model 2022'],
-        'unicorn_model': ['unicorn'],
-        'ict_mentorship': ['mentorship'],
-        'amd': ['amd'],
-        'cbdr': ['cbdr', 'central bank dealer range'],
-        'nwog': ['nwog'],
-        'ndog': ['ndog'],
-        'macro_time': ['macro', ':50', ':10'],
-        'algorithmically_delivered': ['algorithm', 'algorithmically'],
-        'seek_and_destroy': ['seek and destroy'],
-        'standard_deviation': ['standard deviation'],
-    }
+class ChunkSpool:
+    """On-disk staging table that regroups streamed chunks by source transcript.
+
+    Chunks are written to a temporary SQLite file as pages arrive and read
+    back one transcript at a time, in the same order organize_by_source()
+    produces (sources by first appearance, chunks by chunk_index), so memory
+    stays flat however many chunks there are. Concept hits are kept
+    alongside so concept statistics can be computed in SQL.
+    """
+
+    def __init__(self, path=None):
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix='cortex-spool-', suffix='.sqlite')
+            os.close(fd)
+            self._owned_path = path
+        else:
+            self._owned_path = None
+        self.db = sqlite3.connect(path)
+        self.db.executescript("""
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            CREATE TABLE IF NOT EXISTS chunks (
+                id INTEGER PRIMARY KEY,
+                seq INTEGER NOT NULL,
+                source TEXT NOT NULL,
+                chunk_index INTEGER,
+                content TEXT
+            );
+            CREATE INDEX IF NOT EXISTS chunks_source ON chunks (source);
+            CREATE TABLE IF NOT EXISTS concept_hits (
+                concept TEXT NOT NULL,
+                id INTEGER NOT NULL,
+                PRIMARY KEY (concept, id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS concept_hits_id ON concept_hits (id);
+        """)
+        self._seq = self.db.execute("SELECT COALESCE(MAX(seq), 0) FROM chunks").fetchone()[0]
+
+    def close(self):
+        self.db.close()
+        if self._owned_path:
+            os.remove(self._owned_path)
+
+    def add(self, chunks):
+        """Insert chunk rows; a row whose id is already present replaces it in place."""
+        rows = []
+        for chunk in chunks:
+            self._seq += 1
+            rows.append((chunk.get('id'), self._seq, chunk.get('source_transcript', 'unknown'),
+                         chunk.get('chunk_index'), chunk.get('content')))
+        self.db.executemany("""
+            INSERT INTO chunks (id, seq, source, chunk_index, content) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                source = excluded.source, chunk_index = excluded.chunk_index, content = excluded.content
+        """, rows)
+
+    def add_transcripts(self, by_source):
+        """Load organize_by_source() style transcripts (e.g. a previous export)."""
+        for source, transcript in by_source.items():
+            self.add(dict(chunk, source_transcript=source) for chunk in transcript['chunks'])
+
+    def match_concepts(self, chunks, matcher):
+        """Record which concepts each chunk mentions, replacing earlier hits for it."""
+        ids = [(chunk.get('id'),) for chunk in chunks]
+        self.db.executemany("DELETE FROM concept_hits WHERE id = ?", ids)
+        self.db.executemany(
+            "INSERT INTO concept_hits (concept, id) VALUES (?, ?)", matcher.hits(chunks))
+
+    def rematch_concepts(self, matcher, page_size=CONCEPT_SHARD_SIZE * 4):
+        """Recompute the concept hits of every spooled chunk, a page at a time."""
+        page = []
+        for chunk_id, content in self.documents():
+            page.append({'id': chunk_id, 'content': content})
+            if len(page) == page_size:
+                self.match_concepts(page, matcher)
+                page = []
+        if page:
+            self.match_concepts(page, matcher)
 
+    def add_concept_chunks(self, concept_chunks):
+        """Load saved {concept: [chunk id, ...]} hits."""
+        self.db.executemany(
+            "INSERT OR IGNORE INTO concept_hits (concept, id) VALUES (?, ?)",
+            ((concept, chunk_id) for concept, ids in concept_chunks.items() for chunk_id in ids))
+
+    def concept_chunks(self, concepts):
+        """Return {concept: [chunk id, ...]} in id order."""
+        out = {concept: [] for concept in concepts}
+        for concept, chunk_id in self.db.execute(
+                "SELECT h.concept, h.id FROM concept_hits h JOIN chunks c ON c.id = h.id ORDER BY h.concept, h.id"):
+            out.setdefault(concept, []).append(chunk_id)
+        return out
+
+    def concept_stats(self, concepts):
+        """concept_stats as extract_ict_concepts() reports it, sources in first-mention order."""
+        stats = {}
+        for concept in concepts:
+            mentions = self.db.execute("""
+                SELECT COUNT(*), COUNT(DISTINCT c.source)
+                FROM concept_hits h JOIN chunks c ON c.id = h.id WHERE h.concept = ?
+            """, (concept,)).fetchone()
+            sources = [row[0] for row in self.db.execute("""
+                SELECT c.source FROM concept_hits h JOIN chunks c ON c.id = h.id
+                WHERE h.concept = ? GROUP BY c.source ORDER BY MIN(c.id) LIMIT 20
+            """, (concept,))]
+            stats[concept] = {
+                'total_mentions': mentions[0],
+                'unique_sources': mentions[1],
+                'sources': sources,
+            }
+        return stats
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def source_counts(self):
+        """Return [(source, chunk count), ...] in transcript order."""
+        return self.db.execute(
+            "SELECT source, COUNT(*) FROM chunks GROUP BY source ORDER BY MIN(seq)").fetchall()
+
+    def transcripts(self):
+        """Yield (source, transcript) pairs shaped like organize_by_source() values."""
+        for source, count in self.source_counts():
+            chunks = [
+                {'id': chunk_id, 'content': content, 'chunk_index': chunk_index}
+                for chunk_id, content, chunk_index in self.db.execute("""
+                    SELECT id, content, chunk_index FROM chunks WHERE source = ?
+                    ORDER BY COALESCE(chunk_index, 0), seq
+                """, (source,))
+            ]
+            yield source, {'source': source, 'chunks': chunks, 'total_chunks': count}
+
+    def rows(self):
+        """Yield (id, source, chunk_index, content) for every chunk in export order."""
+        for source, transcript in self.transcripts():
+            for chunk in transcript['chunks']:
+                yield chunk['id'], source, chunk['chunk_index'], chunk['content']
+
+    def documents(self):
+        """Yield (id, content) for every chunk in export order."""
+        for chunk_id, _, _, content in self.rows():
+            yield chunk_id, content or ''
+
+
+def write_export(path, extraction_info, concept_stats, transcripts, indent=2):
+    """Stream the ict_wisdom.json document to ``path`` one transcript at a time.
+
+    The bytes match json.dump(output, indent=indent, ensure_ascii=False);
+    ``indent=None`` writes compact JSON with no whitespace.
+    """
+    def dumps(value, depth):
+        if indent is None:
+            return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+        text = json.dumps(value, indent=indent, ensure_ascii=False)
+        return text.replace('\n', '\n' + ' ' * (indent * depth))
+
+    if indent is None:
+        nl, pad, sep = '', '', ':'
+    else:
+        nl, pad, sep = '\n', ' ' * indent, ': '
+
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write('{' + nl)
+        f.write(f"{pad}{dumps('extraction_info', 1)}{sep}{dumps(extraction_info, 1)},{nl}")
+        f.write(f"{pad}{dumps('concept_analysis', 1)}{sep}{dumps(concept_stats, 1)},{nl}")
+        f.write(f"{pad}{dumps('transcripts', 1)}{sep}{{")
+        first = True
+        for source, transcript in transcripts:
+            f.write(('' if first else ',') + nl + pad * 2)
+            f.write(f"{dumps(source, 2)}{sep}{dumps(transcript, 2)}")
+            first = False
+        f.write(('' if first else nl + pad) + '}' + nl + '}')
+    os.replace(tmp, path)
+
+
+def _chunk_rows(chunks):
+    """Yield (chunk id, content) for chunk dicts."""
     for chunk in chunks:
-        content = chunk.get('content', '').lower()
-        source = chunk.get('source_transcript', 'unknown')
+        yield chunk.get('id'), chunk.get('content') or ''
+
+
+def _concept_hits(match, rows):
+    """(concept, chunk id) pairs for (chunk id, content) rows, chunk by chunk in input order."""
+    return [(concept, chunk_id) for chunk_id, content in rows for concept in sorted(match(content))]
+
+
+class ConceptMatcher:
+    """Compiled matcher that finds every concept keyword in one pass per chunk.
+
+    Uses a pyahocorasick automaton when that package is installed. Otherwise
+    all keywords are folded into a single trie-shaped regex: a match on a long
+    keyword implies every keyword it contains, and the few keywords that can
+    start inside a match and run past its end are re-checked at that offset.
+    Either way a chunk is scanned left to right once, and the result is the
+    same as testing ``kw in content`` for every keyword.
+    """
+
+    def __init__(self, keywords=None):
+        keywords = CONCEPT_KEYWORDS if keywords is None else keywords
+        self.concepts = list(keywords)
+
+        owners = {}
+        for concept, kws in keywords.items():
+            for kw in kws:
+                owners.setdefault(kw.lower(), set()).add(concept)
+        words = sorted(owners)
+
+        # Concepts implied by a keyword match: its own plus those of every
+        # keyword it contains.
+        self._implied = {
+            word: frozenset().union(*(owners[w] for w in words if w in word))
+            for word in words
+        }
+        # Keywords that can begin inside a match and extend past its end,
+        # keyed by the matched keyword as (offset into the match, keyword).
+        self._overlaps = {}
+        for word in words:
+            partners = [
+                (i, other) for other in words if other not in word
+                for i in range(1, len(word)) if other.startswith(word[i:])
+            ]
+            if partners:
+                self._overlaps[word] = partners
+
+        self._pattern = re.compile(_trie_pattern(words))
+
+        self._automaton = None
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for word in words:
+                self._automaton.add_word(word, self._implied[word])
+            self._automaton.make_automaton()
+
+    def match(self, content):
+        """Return the set of concepts whose keywords occur in ``content``."""
+        text = content.lower()
+        if self._automaton is not None:
+            return set().union(*(implied for _, implied in self._automaton.iter(text)))
+
+        found = set()
+        for m in self._pattern.finditer(text):
+            word = m.group()
+            found.add(word)
+            for offset, other in self._overlaps.get(word, ()):
+                if text.startswith(other, m.start() + offset):
+                    found.add(other)
+        if not found:
+            return set()
+        return set().union(*(self._implied[word] for word in found))
+
+    def hits(self, chunks):
+        """Return (concept, chunk id) pairs, chunk by chunk in input order."""
+        return _concept_hits(self.match, _chunk_rows(chunks))
+
+
+# The matcher of a ConceptPool worker process, built once by its initializer
+_worker_matcher = None
+
+
+def _init_concept_worker(matcher_class, keywords):
+    global _worker_matcher
+    _worker_matcher = matcher_class(keywords)
+
+
+def _concept_shard_hits(shard):
+    """The worker matcher's hits for a shard of (chunk id, content) rows."""
+    return _concept_hits(_worker_matcher.match, shard)
+
+
+class ConceptPool:
+    """A concept matcher spread across worker processes.
+
+    Chunks are cut into contiguous shards and the per-shard hits are joined
+    back in input order, so the output is the same as a single
+    ``matcher_class`` instance whatever the number of workers. Usable
+    wherever a matcher's ``concepts`` and ``hits`` are.
+    """
+
+    def __init__(self, workers=None, keywords=None, shard_size=CONCEPT_SHARD_SIZE,
+                 matcher_class=None):
+        keywords = CONCEPT_KEYWORDS if keywords is None else keywords
+        self.concepts = list(keywords)
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_size = shard_size
+        # spawn, not fork: the page fetcher's threads may be running
+        self._executor = ProcessPoolExecutor(
+            self.workers, mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_concept_worker, initargs=(matcher_class or TokenConceptMatcher, keywords))
+
+    def hits(self, chunks):
+        """Return (concept, chunk id) pairs, chunk by chunk in input order."""
+        rows = list(_chunk_rows(chunks))
+        size = max(1, min(self.shard_size, -(-len(rows) // self.workers)))
+        shards = [rows[i:i + size] for i in range(0, len(rows), size)]
+        return [pair for pairs in self._executor.map(_concept_shard_hits, shards) for pair in pairs]
 
+    def close(self):
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TokenConceptMatcher:
+    """Concept matcher that only matches whole words.
+
+    Each chunk is split into words once (ASCII letters and digits, with
+    bytes.translate and split rather than a regex, plus ".705"/":50" style
+    number tokens). Single-word keywords are found with one set
+    intersection; a phrase is looked for (as a substring of the space-joined
+    words) only when all of its words occur. An "s" added to a keyword's
+    last word still matches, so "order blocks" matches "order block" (but
+    "stops runs" is not "stop run"); keywords are never shortened, so
+    "juda" is not "judas". "ote" no longer matches "note" nor "dol" "dollar".
+    """
+
+    def __init__(self, keywords=None):
+        keywords = CONCEPT_KEYWORDS if keywords is None else keywords
+        self.concepts = list(keywords)
+
+        denotes = {}
+        self._singles = {}
+        phrases = {}
         for concept, kws in keywords.items():
             for kw in kws:
-                if kw.lower() in content:
-                    concepts[concept].append({
-                        'source': source,
-                        'chunk_id': chunk.get('id'),
-                        'excerpt': chunk.get('content', '')[:500]
-                    })
-                    break
-
-    # Remove duplicates and count
+                words = TOKEN_RE.findall(kw.lower())
+                if not words:
+                    continue
+                words = tuple(w.encode('ascii') for w in words)
+                for word in words:
+                    denotes.setdefault(word, set()).add(word)
+                if _pluralizable(words[-1]):
+                    denotes.setdefault(words[-1] + b's', set()).add(words[-1])
+                if len(words) == 1:
+                    self._singles.setdefault(words[0], set()).add(concept)
+                else:
+                    phrases.setdefault(words, set()).add(concept)
+        self._forms = frozenset(denotes)
+        # Per first word: (all words, space-delimited spellings, concepts) of each phrase
+        starting = {}
+        for words, concepts in phrases.items():
+            last = words[-1]
+            spellings = [b' ' + b' '.join(words) + b' ']
+            if _pluralizable(last):
+                spellings.append(b' ' + b' '.join(words[:-1] + (last + b's',)) + b' ')
+            starting.setdefault(words[0], []).append((frozenset(words), tuple(spellings), frozenset(concepts)))
+        # Every spelling of a keyword word → (words it spells, their single-word concepts, phrases they start)
+        self._lookup = {form: (frozenset(words),
+                               frozenset(c for word in words for c in self._singles.get(word, ())),
+                               tuple(phrase for word in words for phrase in starting.get(word, ())))
+                        for form, words in denotes.items()}
+
+    def match(self, content):
+        """Return the set of concepts whose keywords occur as whole words in ``content``."""
+        data = content.lower().encode('ascii', 'replace')
+        words = data.translate(_WORD_BYTES).split()
+        present = self._forms.intersection(words)
+        if b'.' in data or b':' in data:
+            present |= self._forms.intersection(_NUMBER_TOKEN_RE.findall(data))
+        if not present:
+            return set()
+
+        seen = set()
+        found = set()
+        phrases = []
+        for spelled, concepts, starts in map(self._lookup.__getitem__, present):
+            seen |= spelled
+            found |= concepts
+            if starts:
+                phrases += starts
+
+        joined = None
+        for phrase_words, spellings, concepts in phrases:
+            if phrase_words <= seen and not concepts <= found:
+                if joined is None:
+                    joined = b' ' + b' '.join(words) + b' '
+                if any(spelling in joined for spelling in spellings):
+                    found |= concepts
+        return found
+
+    def hits(self, chunks):
+        """Return (concept, chunk id) pairs, chunk by chunk in input order."""
+        return _concept_hits(self.match, _chunk_rows(chunks))
+
+
+# Byte translation table: letters and digits kept, everything else a word break
+_WORD_BYTES = bytes(c if c in b'abcdefghijklmnopqrstuvwxyz0123456789' else ord(' ') for c in range(256))
+
+# Number tokens such as ".705" or ":50" (the second half of TOKEN_RE)
+_NUMBER_TOKEN_RE = re.compile(rb'[.:][0-9]+')
+
+
+def _pluralizable(word):
+    """Whether ``word + "s"`` is treated as the same word."""
+    return word[-1:].isalpha() and not word.endswith(b's')
+
+
+# Concept matchers by --concept-matcher name
+CONCEPT_MATCHERS = {'token': TokenConceptMatcher, 'substring': ConceptMatcher}
+
+
+def _trie_pattern(words):
+    """Build a regex alternation shaped like a trie (longest match first)."""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            body = '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+def match_concepts(chunks, matcher=None, workers=1):
+    """Return {concept: [chunk id, ...]} for every chunk mentioning each concept.
+
+    Without a matcher and with ``workers`` > 1 the chunks are matched in a
+    ConceptPool; the result is the same.
+    """
+    if matcher is None and workers != 1:
+        with ConceptPool(workers) as pool:
+            return match_concepts(chunks, pool)
+
+    matcher = matcher or TokenConceptMatcher()
+    concept_chunks = {concept: [] for concept in matcher.concepts}
+
+    for concept, chunk_id in matcher.hits(chunks):
+        concept_chunks[concept].append(chunk_id)
+
+    return concept_chunks
+
+
+def summarize_concepts(concept_chunks, source_of):
+    """Build concept_stats from per-concept chunk ids and a chunk id -> source map."""
     concept_stats = {}
-    for concept, matches in concepts.items():
-        unique_sources = list(set([m['source'] for m in matches]))
+    for concept, chunk_ids in concept_chunks.items():
+        matches = [source_of.get(chunk_id, 'unknown') for chunk_id in chunk_ids]
+        unique_sources = list(set(matches))
         concept_stats[concept] = {
             'total_mentions': len(matches),
             'unique_sources': len(unique_sources),
@@ -226,75 +711,405 @@ def extract_ict_concepts(chunks):
     return concept_stats
 
 
-def main():
+def extract_ict_concepts(chunks, matcher=None, workers=1):
+    """Extract and categorize ICT concepts mentioned across all chunks."""
+    source_of = {chunk.get('id'): chunk.get('source_transcript', 'unknown') for chunk in chunks}
+    return summarize_concepts(match_concepts(chunks, matcher, workers), source_of)
+
+
+def build_search_index(source_name, texts):
+    """Build the BM25 index over chunk texts (in corpus order) and save it."""
+    index = BM25Index.build(texts)
+
+    os.makedirs(source_dir(source_name), exist_ok=True)
+    index_path = artifact_path(source_name, BM25_FILE)
+    index.save(index_path)
+    return index_path, index
+
+
+def build_vector_store(source_name, ids, texts, embedder_spec=EMBEDDER, quantize=QUANTIZE_VECTORS,
+                       changed_ids=None):
+    """Embed every chunk and save the matrix next to the BM25 index.
+
+    ``texts`` may be any iterable in the same order as ``ids``; it is
+    consumed in batches. When ``changed_ids`` is given, vectors of all other
+    chunks are copied from the existing store (if it used the same embedder)
+    and only the changed chunks are embedded.
+    """
+    import numpy as np
+
+    embedder = get_embedder(embedder_spec)
+    directory = source_dir(source_name)
+    matrix = np.empty((len(ids), embedder.dim), dtype=np.float32)
+
+    reused = set()
+    if changed_ids is not None and os.path.exists(os.path.join(directory, META_FILE)):
+        store = VectorStore.open(directory)
+        if store.embedder == embedder.name:
+            row_of = {int(chunk_id): row for row, chunk_id in enumerate(store.ids)}
+            reuse = [(doc, row_of[chunk_id]) for doc, chunk_id in enumerate(ids)
+                     if chunk_id not in changed_ids and chunk_id in row_of]
+            if reuse:
+                docs, rows = zip(*reuse)
+                matrix[list(docs)] = store.rows(list(rows))
+            reused = set(d for d, _ in reuse)
+        del store
+
+    embedded = 0
+    docs, batch = [], []
+    for doc, text in enumerate(texts):
+        if doc in reused:
+            continue
+        docs.append(doc)
+        batch.append(text)
+        if len(batch) == EMBED_BATCH_SIZE:
+            matrix[docs] = embedder.embed(batch)
+            embedded += len(docs)
+            docs, batch = [], []
+    if batch:
+        matrix[docs] = embedder.embed(batch)
+        embedded += len(docs)
+
+    write_vectors(directory, matrix, ids, embedder.name, quantize=quantize)
+    return directory, matrix, embedded
+
+
+def build_ann_index(source_name, matrix, nlist=ANN_LISTS):
+    """Train the IVF index over the embedding matrix and save it."""
+    ann = IVFIndex.build(matrix, nlist=nlist)
+    ann_path = artifact_path(source_name, IVF_FILE)
+    ann.save(ann_path)
+    return ann_path, ann
+
+
+def write_artifacts(name, spool, matcher, extraction_info, changed_ids=None):
+    """Write the search artifacts for the spooled chunks, the manifest last.
+
+    Returns the concept hits as ``{concept: [chunk id, ...]}``.
+    """
+    # Columnar copy the web server memory-maps instead of parsing the JSON
+    os.makedirs(source_dir(name), exist_ok=True)
+    corpus_path = artifact_path(name, CORPUS_FILE)
+    write_corpus(corpus_path, spool.rows())
+    print(f"✅ Columnar corpus → {corpus_path} ({os.path.getsize(corpus_path) / (1024 * 1024):.2f} MB)")
+
+    # Which chunks mention each concept, for concept-filtered search
+    concept_chunks = spool.concept_chunks(matcher.concepts)
+    concept_index_path = artifact_path(name, CONCEPT_INDEX_FILE)
+    write_concept_index(concept_index_path, concept_chunks)
+    print(f"✅ Concept index: {sum(map(len, concept_chunks.values())):,} hits → {concept_index_path}")
+
+    # Prebuilt search artifacts for the web server
+    print("\n🗂️ Building search index...")
+    index_path, index = build_search_index(name, (text for _, text in spool.documents()))
+    print(f"✅ Indexed {len(index.terms):,} terms over {len(index):,} chunks → {index_path}")
+    del index
+
+    print(f"\n🧮 Embedding chunks with {EMBEDDER}{' (int8)' if QUANTIZE_VECTORS else ''}...")
+    ids = [chunk_id for chunk_id, _ in spool.documents()]
+    vector_dir, matrix, embedded = build_vector_store(
+        name, ids, (text for _, text in spool.documents()), changed_ids=changed_ids)
+    print(f"✅ Stored {matrix.shape[0]:,} x {matrix.shape[1]} embeddings ({embedded:,} computed) → {vector_dir}")
+
+    if BUILD_ANN:
+        print("\n🧭 Training IVF index...")
+        ann_path, ann = build_ann_index(name, matrix)
+        print(f"✅ {ann.nlist} lists, searched when a request passes nprobe → {ann_path}")
+    else:
+        # An index left by an earlier run would be listed in the manifest next to the new vectors
+        for stale in (artifact_path(name, IVF_FILE), artifact_path(name, IVF_VECTORS_FILE)):
+            if os.path.exists(stale):
+                os.remove(stale)
+                print(f"🧹 Removed stale {stale}")
+
+    # Last, so servers polling for a new version only see complete artifact sets
+    manifest = write_manifest(name, SERVED_ARTIFACTS, chunks=extraction_info['total_chunks'],
+                              mode=extraction_info['mode'], export=extraction_info['timestamp'])
+    print(f"✅ Artifact version {manifest['version']} ({len(manifest['files'])} files)")
+    return concept_chunks
+
+
+def build_from_export(args):
+    """Rebuild a source's search artifacts from its export, without the Cortex.
+
+    Only the export is committed; this runs at deploy time to derive the
+    rest. Nothing is rebuilt while a complete artifact set built from the
+    same export is in place.
+    """
+    if not os.path.exists(args.output):
+        print(f"⚠️ {args.output} is missing; nothing to build")
+        return
+
+    with open(args.output, encoding='utf-8') as f:
+        data = json.load(f)
+    extraction_info = dict(data.get('extraction_info', {}), mode='export')
+    extraction_info.setdefault('timestamp', None)
+    manifest = read_manifest(args.name)
+    if (manifest and extraction_info['timestamp'] and manifest.get('export') == extraction_info['timestamp']
+            and artifact_version(args.name, args.output) is not None):
+        print(f"✅ Artifacts for {args.output} are up to date (version {manifest['version']})")
+        return
+
+    matcher_class = CONCEPT_MATCHERS[args.concept_matcher]
+    if args.concept_workers == 1:
+        matcher = matcher_class()
+    else:
+        matcher = ConceptPool(args.concept_workers, matcher_class=matcher_class)
+    spool = ChunkSpool()
+    try:
+        print(f"\n📂 Loading {args.output}...")
+        spool.add_transcripts(data.pop('transcripts', {}))
+        del data
+        extraction_info['total_chunks'] = len(spool)
+        print(f"✅ {extraction_info['total_chunks']:,} chunks")
+
+        print("\n🔍 Analyzing ICT concepts...")
+        spool.rematch_concepts(matcher)
+        spool.db.commit()
+
+        write_artifacts(args.name, spool, matcher, extraction_info)
+    finally:
+        spool.close()
+        if isinstance(matcher, ConceptPool):
+            matcher.close()
+
+
+def load_state(source_name=SOURCE_NAME, output=None):
+    """Return the saved incremental extraction state, or None.
+
+    Artifacts (the state file among them) are not kept between runs, so
+    without one the watermark recorded in the ``output`` export is used;
+    it carries no concept hits, which are then recomputed.
+    """
+    path = artifact_path(source_name, STATE_FILE)
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    if output and os.path.exists(output):
+        with open(output, encoding='utf-8') as f:
+            info = json.load(f).get('extraction_info', {})
+        if info.get('high_water_mark') is not None:
+            return {key: info[key] for key in ('watermark_column', 'high_water_mark', 'concept_matcher')
+                    if key in info}
+    return None
+
+
+def save_state(state, source_name=SOURCE_NAME):
+    """Persist the incremental extraction state."""
+    os.makedirs(source_dir(source_name), exist_ok=True)
+    with open(artifact_path(source_name, STATE_FILE), 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+
+
+def high_water_mark(chunks, watermark_column, current=None):
+    """Largest ``watermark_column`` value seen so far."""
+    values = [chunk[watermark_column] for chunk in chunks if chunk.get(watermark_column) is not None]
+    if current is not None:
+        values.append(current)
+    return max(values) if values else None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Extract The Cortex into ict_wisdom.json and search artifacts.")
+    parser.add_argument('--incremental', action='store_true',
+                        help="fetch only rows past the saved high-water mark and merge them "
+                             "into the existing output (falls back to a full run without state); "
+                             "deletions, and edits that do not move the watermark, need a full run")
+    parser.add_argument('--watermark-column', default='id',
+                        help="monotonic column for the high-water mark, e.g. id or updated_at")
+    parser.add_argument('--table', default=CHUNK_TABLE, help="chunk table to export")
+    parser.add_argument('--name', default=SOURCE_NAME,
+                        help="source name the server serves it as (artifacts go to cortex_data/<name>)")
+    parser.add_argument('--output', help="output JSON file (default <name>_wisdom.json)")
+    parser.add_argument('--page-size', type=int, default=BATCH_SIZE, help="rows per request")
+    parser.add_argument('--concurrency', type=int, default=1, help="parallel page requests")
+    parser.add_argument('--compact', action='store_true',
+                        help="write the output JSON without indentation (smaller, faster)")
+    parser.add_argument('--concept-workers', type=int, default=1,
+                        help="processes for concept analysis (0 = one per CPU)")
+    parser.add_argument('--concept-matcher', choices=sorted(CONCEPT_MATCHERS), default='token',
+                        help="whole-word keyword matching, or the older substring matching")
+    parser.add_argument('--artifacts-only', action='store_true',
+                        help="rebuild the search artifacts from the existing output JSON, without "
+                             "connecting to the Cortex (run at deploy time)")
+    args = parser.parse_args(argv)
+    args.output = args.output or f'{args.name}_wisdom.json'
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
     print("=" * 60)
     print("🧠 FULL CORTEX EXTRACTION")
     print("   The Complete ICT Knowledge Base")
     print("=" * 60)
 
+    if args.artifacts_only:
+        build_from_export(args)
+        return
+
     if not SUPABASE_URL or not SUPABASE_KEY:
         print("❌ Error: Missing SUPABASE_URL or SUPABASE_KEY")
         return
 
+    from supabase import create_client
+
     print("\n🔌 Connecting to The Cortex...")
     supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+    run_extraction(supabase, args)
+
+
+def run_extraction(supabase, args):
+    """Fetch, organize, analyze and export the Cortex with a connected client.
+
+    Chunks stream page by page into an on-disk ChunkSpool, and the export is
+    written from it one transcript at a time, so chunk text is never all in
+    memory. The search artifacts are not streamed: the BM25 postings (6 bytes
+    each) and the embedding matrix (4 bytes per dimension per chunk) are built
+    in memory, so peak memory still grows with the Cortex, by about 36 MB at
+    20k synthetic chunks and 160 MB at 100k (benchmarks/bench_export.py).
+    """
     # Get total count
     try:
-        stats = supabase.table('ict_chunks').select('*', count='exact').limit(1).execute()
+        stats = supabase.table(args.table).select('id', count='exact').limit(1).execute()
         total_chunks = stats.count if stats.count else 0
         print(f"✅ Connected! Total chunks in Cortex: {total_chunks:,}")
     except Exception as e:
         print(f"⚠️ Could not get exact count: {e}")
         total_chunks = 0
 
-    # Fetch ALL chunks
-    print("\n📥 Extracting ALL chunks from The Cortex...")
-    all_chunks = fetch_all_chunks(supabase)
-    print(f"✅ Extracted {len(all_chunks):,} chunks")
+    state = load_state(args.name, args.output) if args.incremental else None
+    if state and state.get('watermark_column') != args.watermark_column:
+        print(f"⚠️ Saved state tracks '{state.get('watermark_column')}', not '{args.watermark_column}'")
+        state = None
+    if state and state.get('concept_matcher', 'substring') != args.concept_matcher:
+        print(f"⚠️ Saved concept hits come from the '{state.get('concept_matcher', 'substring')}' matcher")
+        state = None
+    if state and not os.path.exists(args.output):
+        print(f"⚠️ {args.output} is missing")
+        state = None
+    if args.incremental and state is None:
+        print("⚠️ No usable incremental state; running a full extraction")
+
+    matcher_class = CONCEPT_MATCHERS[args.concept_matcher]
+    if args.concept_workers == 1:
+        matcher = matcher_class()
+    else:
+        matcher = ConceptPool(args.concept_workers, matcher_class=matcher_class)
+    spool = ChunkSpool()
+    try:
+        if state:
+            mark = state['high_water_mark']
+            print(f"\n📥 Extracting chunks with {args.watermark_column} > {mark}...")
+            pages = iter_chunk_pages(supabase, after=mark, watermark_column=args.watermark_column,
+                                     page_size=args.page_size, concurrency=args.concurrency, table=args.table)
+        else:
+            # Fetch ALL chunks
+            print("\n📥 Extracting ALL chunks from The Cortex...")
+            pages = iter_chunk_pages(supabase, watermark_column=args.watermark_column,
+                                     page_size=args.page_size, concurrency=args.concurrency,
+                                     total=total_chunks, table=args.table)
+
+        fetched_pages = []
+        fetched = 0
+        mark = state['high_water_mark'] if state else None
+        for page in pages:
+            fetched += len(page)
+            mark = high_water_mark(page, args.watermark_column, mark)
+            if state:
+                # The delta is small; hold it until the previous export is loaded
+                fetched_pages.append(page)
+            else:
+                spool.add(page)
+                spool.match_concepts(page, matcher)
+            if fetched % 10000 < len(page):
+                print(f"  Fetched {fetched:,} chunks...")
+        print(f"✅ Extracted {fetched:,} {'new or changed ' if state else ''}chunks")
 
-    # Organize by source
-    print("\n📂 Organizing by source transcript...")
-    by_source = organize_by_source(all_chunks)
-    print(f"✅ Found {len(by_source)} unique sources/transcripts")
+        if state:
+            if not fetched:
+                print("\n✅ Already up to date; nothing to rebuild")
+                return
 
-    # Extract concept statistics
-    print("\n🔍 Analyzing ICT concepts across all chunks...")
-    concept_stats = extract_ict_concepts(all_chunks)
+            print("\n📂 Merging into existing transcripts...")
+            with open(args.output, encoding='utf-8') as f:
+                spool.add_transcripts(json.load(f)['transcripts'])
+            if 'concept_chunks' in state:
+                spool.add_concept_chunks(state['concept_chunks'])
+            else:
+                print("🔍 No saved concept hits; analyzing existing chunks...")
+                spool.rematch_concepts(matcher)
+            before = len(spool)
+            changed_ids = set()
+            for page in fetched_pages:
+                spool.add(page)
+                changed_ids.update(chunk.get('id') for chunk in page)
+            added = len(spool) - before
+            print(f"✅ {added:,} added, {fetched - added:,} updated")
 
-    # Build final output
-    output = {
-        'extraction_info': {
+            print("\n🔍 Analyzing ICT concepts in new chunks...")
+            for page in fetched_pages:
+                spool.match_concepts(page, matcher)
+            del fetched_pages
+        else:
+            changed_ids = None
+
+        spool.db.commit()
+        sources = spool.source_counts()
+        total = sum(count for _, count in sources)
+        print(f"✅ Found {len(sources)} unique sources/transcripts")
+
+        concept_stats = spool.concept_stats(matcher.concepts)
+
+        extraction_info = {
             'timestamp': datetime.now().isoformat(),
-            'total_chunks': len(all_chunks),
-            'total_sources': len(by_source),
-            'source': 'The Cortex - Complete ICT Knowledge Base'
-        },
-        'concept_analysis': concept_stats,
-        'transcripts': by_source
-    }
+            'total_chunks': total,
+            'total_sources': len(sources),
+            'source': 'The Cortex - Complete ICT Knowledge Base',
+            'mode': 'incremental' if state else 'full',
+            'fetched_chunks': fetched,
+            # Lets --incremental resume from the export alone
+            'watermark_column': args.watermark_column,
+            'high_water_mark': mark,
+            'concept_matcher': args.concept_matcher,
+        }
+
+        # Save to file
+        output_file = args.output
+        print(f"\n💾 Saving to {output_file}...")
+        write_export(output_file, extraction_info, concept_stats, spool.transcripts(),
+                     indent=None if args.compact else 2)
 
-    # Save to file
-    output_file = 'ict_wisdom.json'
-    print(f"\n💾 Saving to {output_file}...")
+        file_size = os.path.getsize(output_file) / (1024 * 1024)
+        print(f"✅ Saved! File size: {file_size:.2f} MB")
 
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+        concept_chunks = write_artifacts(args.name, spool, matcher, extraction_info, changed_ids)
 
-    file_size = os.path.getsize(output_file) / (1024 * 1024)
-    print(f"✅ Saved! File size: {file_size:.2f} MB")
+        save_state({
+            'watermark_column': args.watermark_column,
+            'high_water_mark': mark,
+            'concept_matcher': args.concept_matcher,
+            'concept_chunks': concept_chunks,
+        }, args.name)
+    finally:
+        spool.close()
+        if isinstance(matcher, ConceptPool):
+            matcher.close()
 
     # Print summary
     print("\n" + "=" * 60)
     print("📊 EXTRACTION SUMMARY")
     print("=" * 60)
-    print(f"Total chunks extracted: {len(all_chunks):,}")
-    print(f"Total transcripts: {len(by_source)}")
+    print(f"Total chunks extracted: {fetched:,}")
+    print(f"Total chunks in output: {total:,}")
+    print(f"Total transcripts: {len(sources)}")
     print(f"\nTop 10 transcripts by chunk count:")
 
-    sorted_sources = sorted(by_source.items(), key=lambda x: x[1]['total_chunks'], reverse=True)
-    for i, (source, data) in enumerate(sorted_sources[:10], 1):
-        print(f"  {i}. {source}: {data['total_chunks']} chunks")
+    sorted_sources = sorted(sources, key=lambda x: x[1], reverse=True)
+    for i, (source, count) in enumerate(sorted_sources[:10], 1):
+        print(f"  {i}. {source}: {count} chunks")
 
     print("\n🎯 Top ICT concepts by mentions:")
     sorted_concepts = sorted(concept_stats.items(), key=lambda x: x[1]['total_mentions'], reverse=True)